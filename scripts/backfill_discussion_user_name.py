@@ -0,0 +1,46 @@
+import asyncio
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+# 프로젝트의 루트 경로를 시스템 경로에 추가
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+async def main():
+    """
+    MongoDB 'discussions' 컬렉션에서 'user_name' 필드가 없는 문서에
+    'users' 컬렉션의 사용자 이름을 채워 넣습니다. (관리자 목록의 이름 검색/조인 제거용)
+    """
+    print("--- [Migration] 'discussions.user_name' 필드 채우기 스크립트를 시작합니다. ---")
+
+    # 1. .env 파일에서 환경 변수 로드
+    load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / '.env')
+    mongo_url = os.getenv("MONGO_DB_URL")
+    if not mongo_url:
+        print("❌ [오류] .env 파일에 MONGO_DB_URL이 설정되지 않았습니다.")
+        return
+
+    # 2. 데이터베이스 연결
+    client = AsyncIOMotorClient(mongo_url)
+    db_name = mongo_url.split("/")[-1].split("?")[0]
+    database = client[db_name]
+    print(f"✅ MongoDB '{db_name}' 데이터베이스에 연결되었습니다.")
+
+    # 3. 사용자별로 한 번의 update_many로 이름을 채웁니다.
+    updated_total = 0
+    async for user in database["users"].find({}, {"email": 1, "name": 1}):
+        result = await database["discussions"].update_many(
+            {"user_email": user["email"], "user_name": None},
+            {"$set": {"user_name": user["name"]}}
+        )
+        updated_total += result.modified_count
+
+    print("\n--- [Migration] 작업 완료 ---")
+    print(f"✅ 총 {updated_total}개의 토론 문서에 'user_name' 필드를 추가했습니다.")
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(main())
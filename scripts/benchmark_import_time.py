@@ -0,0 +1,83 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# 프로젝트의 src 경로 (app 패키지가 위치한 곳)
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# 서버 시작 시점에 import 되면 안 되는 무거운 의존성 (처음 사용할 때 지연 로드되어야 함)
+FORBIDDEN_AT_STARTUP = [
+    "langchain_google_genai",
+    "langchain_openai",
+    "langchain_anthropic",
+    "langchain_community",
+    "weasyprint",
+    "google.cloud.storage",
+    "tenacity",
+]
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure(target: str) -> tuple[float, dict]:
+    """새 인터프리터에서 target 모듈을 import 하고 (누적 import 시간(ms), 모듈별 누적 시간(us))을 반환합니다."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit(f"❌ [오류] '{target}' import에 실패했습니다.")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules.get(target, 0) / 1000, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="애플리케이션 콜드 스타트 import 시간을 측정합니다.")
+    parser.add_argument("--target", default="app.main", help="측정할 모듈 (기본: app.main)")
+    parser.add_argument("--target-ms", type=float, default=2000.0, help="허용하는 최대 import 시간(ms)")
+    parser.add_argument("--runs", type=int, default=3, help="측정 반복 횟수 (최솟값을 사용)")
+    parser.add_argument("--top", type=int, default=15, help="출력할 상위 모듈 수")
+    args = parser.parse_args()
+
+    print(f"--- [Benchmark] '{args.target}' import 시간 측정 ({args.runs}회) ---")
+    samples = [measure(args.target) for _ in range(args.runs)]
+    best_ms, modules = min(samples, key=lambda sample: sample[0])
+
+    print(f"\n측정값 (ms): {', '.join(f'{ms:.0f}' for ms, _ in samples)}")
+    print(f"최솟값: {best_ms:.0f} ms (목표: {args.target_ms:.0f} ms 이하)")
+
+    # 최상위 패키지 기준으로 누적 시간이 큰 모듈 출력
+    top_level = {name: us for name, us in modules.items() if "." not in name and name != args.target}
+    print(f"\n--- 누적 import 시간 상위 {args.top}개 패키지 ---")
+    for name, us in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{us / 1000:>10.1f} ms  {name}")
+
+    failed = False
+    eager_heavy = [name for name in FORBIDDEN_AT_STARTUP if name in modules]
+    if eager_heavy:
+        failed = True
+        print(f"\n❌ 시작 시점에 지연 로드 대상 모듈이 import 되었습니다: {', '.join(eager_heavy)}")
+    if best_ms > args.target_ms:
+        failed = True
+        print(f"\n❌ import 시간이 목표를 초과했습니다: {best_ms:.0f} ms > {args.target_ms:.0f} ms")
+
+    if failed:
+        sys.exit(1)
+    print("\n✅ 콜드 스타트 import 시간이 목표 이내입니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트의 src 경로 (app 패키지가 위치한 곳)
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from app.core import security  # noqa: E402
+from app.services.login_throttle import login_semaphore  # noqa: E402
+
+HEARTBEAT_INTERVAL = 0.01  # 10ms 마다 깨어나는 코루틴으로 이벤트 루프 지연을 측정
+
+
+async def heartbeat(lags: list, stop: asyncio.Event):
+    """예정보다 늦게 깨어난 시간(ms)을 기록합니다. SSE/폴링 코루틴이 체감하는 지연과 같습니다."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + HEARTBEAT_INTERVAL
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append(max(0.0, loop.time() - expected) * 1000)
+
+
+async def login_inline(password: str, hashed: str):
+    """기존 방식: 이벤트 루프에서 직접 scrypt 검증"""
+    return security.verify_password(password, hashed)
+
+
+async def login_offloaded(password: str, hashed: str):
+    """변경 방식: 동시성 제한 + 전용 스레드 풀에서 scrypt 검증"""
+    async with login_semaphore:
+        return await security.verify_password_async(password, hashed)
+
+
+async def run_storm(mode: str, logins: int, hashed: str) -> dict:
+    lags: list = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(lags, stop))
+    await asyncio.sleep(0.1)  # 기준선 확보
+
+    login = login_inline if mode == "inline" else login_offloaded
+    started = time.perf_counter()
+    results = await asyncio.gather(*[login("benchmark-password", hashed) for _ in range(logins)])
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await monitor
+    assert all(results)
+
+    lags.sort()
+    return {
+        "elapsed_s": elapsed,
+        "p50_ms": statistics.median(lags),
+        "p99_ms": lags[int(len(lags) * 0.99) - 1] if len(lags) > 1 else lags[-1],
+        "max_ms": lags[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로그인 폭주 시 이벤트 루프 지연을 측정합니다.")
+    parser.add_argument("--logins", type=int, default=50, help="동시에 보낼 로그인 수")
+    parser.add_argument("--target-p99-ms", type=float, default=50.0, help="오프로드 방식의 허용 p99 지연(ms)")
+    args = parser.parse_args()
+
+    hashed = security.get_password_hash("benchmark-password")
+    print(f"--- [Benchmark] 동시 로그인 {args.logins}건 처리 중 이벤트 루프 지연 측정 ---\n")
+
+    results = {mode: asyncio.run(run_storm(mode, args.logins, hashed)) for mode in ("inline", "offloaded")}
+    print(f"{'방식':<12}{'총 소요(s)':>12}{'p50 지연(ms)':>16}{'p99 지연(ms)':>16}{'최대 지연(ms)':>16}")
+    for mode, r in results.items():
+        print(f"{mode:<12}{r['elapsed_s']:>12.2f}{r['p50_ms']:>16.1f}{r['p99_ms']:>16.1f}{r['max_ms']:>16.1f}")
+
+    if results["offloaded"]["p99_ms"] > args.target_p99_ms:
+        print(f"\n❌ 오프로드 방식의 p99 지연이 목표를 초과했습니다: {results['offloaded']['p99_ms']:.1f} ms > {args.target_p99_ms:.0f} ms")
+        sys.exit(1)
+    print("\n✅ 로그인 폭주 중에도 이벤트 루프 지연이 목표 이내입니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,45 +9,8 @@ from beanie import init_beanie
 import sys
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 from src.app.models.discussion import AgentSettings, AgentConfig
-
-# --- [신규] 에이전트 특성에 맞는 아이콘을 추천하기 위한 키워드 맵 ---
-ICON_MAP = {
-    # 역할/직업
-    "재판관": "🧑", "분석가": "📊", "경제": "🌍", "산업": "🏭", "재무": "💹",
-    "트렌드": "📈", "비판": "🤔", "전문가": "🧑", "미시": "🛒", "미래학자": "🔭",
-    "물리학": "⚛️", "양자": "🌀", "의학": "⚕️", "심리학": "🧠", "뇌과학": "⚡️",
-    "문학": "✍️", "역사": "🏛️", "생물학": "🧬", "법의학": "🔬", "법률": "⚖️",
-    "회계": "🧾", "인사": "👥", "인류학": "🗿", "IT": "💻", "개발": "👨‍💻",
-    # 고유명사/인물
-    "버핏": "👴", "린치": "👨‍💼", "잡스": "💡", "머스크": "🚀", "베이조스": "📦",
-    "웰치": "🏆", "아인슈타인": "🌌",
-    # 기타 키워드
-    "선정": "📋", "분석": "🔎"
-}
-DEFAULT_ICON = "🧑"
-
-def get_icon_for_agent(agent_data: dict) -> str:
-    """
-    에이전트의 이름과 프롬프트를 기반으로 가장 적합한 아이콘 '하나'를 반환합니다.
-    일치하는 키워드가 여러 개일 경우, 가장 긴 키워드를 우선합니다.
-    """
-    name = agent_data.get("name", "")
-    prompt = agent_data.get("prompt", "")
-
-    # 1순위: 이름에서 가장 길게 일치하는 키워드 찾기
-    name_matches = [keyword for keyword in ICON_MAP if keyword in name]
-    if name_matches:
-        best_match = max(name_matches, key=len)
-        return ICON_MAP[best_match]
-            
-    # 2순위: 프롬프트에서 가장 길게 일치하는 키워드 찾기
-    prompt_matches = [keyword for keyword in ICON_MAP if keyword in prompt]
-    if prompt_matches:
-        best_match = max(prompt_matches, key=len)
-        return ICON_MAP[best_match]
-            
-    # 3순위: 기본 아이콘 반환
-    return DEFAULT_ICON
+# 아이콘 키워드 맵은 앱과 같은 규칙 파일(core/settings/keyword_rules.json)을 사용합니다.
+from src.app.services.keyword_matcher import get_icon_for_agent
 
 async def main():
     """
@@ -0,0 +1,52 @@
+import asyncio
+import os
+from datetime import datetime
+from pathlib import Path
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+# 프로젝트의 루트 경로를 시스템 경로에 추가
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+async def main():
+    """
+    MongoDB 'discussions' 문서에 저장되어 있던 'evidence_index' 필드를
+    'discussion_evidence_indexes' 컬렉션으로 옮기고, 토론 문서에서는 삭제합니다.
+    (토론 목록/상세 조회 시 인덱스가 함께 읽히지 않도록)
+    """
+    print("--- [Migration] 'discussions.evidence_index' 분리 스크립트를 시작합니다. ---")
+
+    # 1. .env 파일에서 환경 변수 로드
+    load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / '.env')
+    mongo_url = os.getenv("MONGO_DB_URL")
+    if not mongo_url:
+        print("❌ [오류] .env 파일에 MONGO_DB_URL이 설정되지 않았습니다.")
+        return
+
+    # 2. 데이터베이스 연결
+    client = AsyncIOMotorClient(mongo_url)
+    db_name = mongo_url.split("/")[-1].split("?")[0]
+    database = client[db_name]
+    print(f"✅ MongoDB '{db_name}' 데이터베이스에 연결되었습니다.")
+
+    # 3. 토론마다 인덱스를 옮긴 뒤 원래 필드를 삭제합니다. (이미 옮겨진 인덱스는 덮어쓰지 않음)
+    moved_total = 0
+    cursor = database["discussions"].find({"evidence_index": {"$exists": True}}, {"discussion_id": 1, "evidence_index": 1})
+    async for discussion in cursor:
+        if discussion.get("evidence_index") is not None:
+            await database["discussion_evidence_indexes"].update_one(
+                {"discussion_id": discussion["discussion_id"]},
+                {"$setOnInsert": {"index": discussion["evidence_index"], "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+            moved_total += 1
+        await database["discussions"].update_one({"_id": discussion["_id"]}, {"$unset": {"evidence_index": ""}})
+
+    print("\n--- [Migration] 작업 완료 ---")
+    print(f"✅ 총 {moved_total}개의 토론 인덱스를 'discussion_evidence_indexes' 컬렉션으로 옮겼습니다.")
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(main())
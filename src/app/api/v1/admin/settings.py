@@ -9,6 +9,7 @@ from app.api.v1.users import get_current_admin_user
 from app.models.user import User as UserModel
 from app import db
 from app.core.config import settings
+from app.services.execution_profiles import EXECUTION_PROFILES_SETTING_KEY, parse_execution_profiles
 
 router = APIRouter()
 
@@ -64,7 +65,14 @@ async def update_setting(
     """
     지정된 key의 시스템 설정을 업데이트합니다.
     만약 해당 key의 설정이 존재하지 않으면 새로 생성합니다.
+    'execution_profiles'는 저장 전에 실행 프로필 설정(JSON)으로 검증합니다.
     """
+    if setting_key == EXECUTION_PROFILES_SETTING_KEY:
+        try:
+            parse_execution_profiles(payload.value)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
     # Beanie 대신 motor 드라이버 사용
     collection = get_settings_collection()
     
@@ -1,61 +1,114 @@
 # src/app/api/v1/discussions.py
 
+import asyncio
 from asyncio.log import logger
 from datetime import datetime
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Form, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Form, UploadFile, File, Header
+from beanie import UpdateResponse
+from beanie.operators import In
 from typing import Dict, List, Optional
 
-from app.services.orchestrator import get_active_agents_from_db, analyze_topic, gather_evidence, select_debate_team
-from app.services.discussion_flow import execute_turn 
+from app.services.discussion_state import get_state, set_state, count_pending_entries
 from app.schemas.orchestration import DebateTeam
 from app.schemas.discussion import DiscussionLogItem, DiscussionLogDetail
 from app.api.v1.users import get_current_user
 from app.db import redis_client
 from app.models.user import User as UserModel
 from app.models.discussion import DiscussionLog, User
+from app.core.config import settings
+from app.core.metrics import ORCHESTRATION_STAGE_SECONDS, observe_duration, track_in_flight
+from app.core.tracing import start_span
+from app.services.profiling import profile_pipeline
+from app.services.execution_profiles import DEFAULT_EXECUTION_PROFILE, get_discussion_profile, get_execution_profiles
+from app.services.turn_admission import acquire_turn_lease, release_turn_lease, claim_idempotency_key, forget_idempotency_key, force_release_turn_lease
+from app.services.job_admission import count_user_jobs, get_queue_status, release_discussion_slots
+from app.services.job_cancellation import request_cancellation, run_background_job
 
 from pydantic import BaseModel
-from app.services.report_generator import generate_report_background
 
 class TurnRequest(BaseModel):
     user_vote: Optional[str] = None
     model_overrides: Optional[Dict[str, str]] = None
+    # 클라이언트가 시작하려는 턴 번호 (지정하면 현재 턴 번호와 다를 때 409를 반환합니다.)
+    turn_number: Optional[int] = None
 
 router = APIRouter(redirect_slashes=False)
 
+async def _ensure_job_capacity(user_email: str) -> None:
+    """사용자의 실행 중 + 대기 중 백그라운드 작업 수가 상한에 도달했으면 429를 반환합니다."""
+    if await count_user_jobs(user_email) >= settings.ADMISSION_MAX_PENDING_PER_USER:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many discussion jobs are running or queued. Please try again after they finish.",
+            headers={"Retry-After": str(settings.ADMISSION_QUEUE_TTL_SECONDS)},
+        )
+
 # --- 백그라운드에서 실행될 오케스트레이션 함수 ---
 async def run_orchestration_background(discussion_id: str, topic: str, file: Optional[UploadFile], user_email: str):
-    """백그라운드에서 오케스트레이션을 실행하는 함수"""
+    """백그라운드에서 오케스트레이션을 실행하는 함수 (작업 슬롯을 얻은 뒤 실행, 취소 가능)"""
+    await run_background_job("orchestration", discussion_id, user_email, _run_orchestration, discussion_id, topic, file)
+
+@track_in_flight("orchestration")
+async def _run_orchestration(discussion_id: str, topic: str, file: Optional[UploadFile]):
+    """run_orchestration_background의 본문. 작업 슬롯 대기 시간을 실행 중 작업 수에서 제외하기 위해 분리되어 있습니다."""
+    # 서비스 모듈(LangChain, 검색 도구 등)은 서버 시작 시간을 줄이기 위해 처음 사용할 때 import 합니다.
+    from app.services.orchestrator import get_active_agents_from_db, analyze_topic, gather_evidence, select_debate_team
+    from app.services.evidence_index import build_evidence_index, save_evidence_index
+
     discussion_log = None
+    evidence_briefing = None
     try:
         discussion_log = await DiscussionLog.find_one(DiscussionLog.discussion_id == discussion_id)
         if not discussion_log:
             return
 
-        special_agents, jury_pool = await get_active_agents_from_db()
-        analysis_report = await analyze_topic(topic, special_agents, discussion_id)
-        files_to_process = [file] if file else []
-        evidence_briefing = await gather_evidence(report=analysis_report, files=files_to_process, topic=topic, discussion_id=discussion_id)
-        debate_team = await select_debate_team(analysis_report, jury_pool, special_agents, discussion_id)
-
-        # 구성된 팀 정보를 DB에 저장합니다.
-        discussion_log.participants = [
-            debate_team.judge.model_dump(),
-            *[agent.model_dump() for agent in debate_team.jury]
-        ]
-
-        # 수집된 증거 자료집을 Pydantic 모델에서 dict로 변환하여 DB에 저장합니다.
-        discussion_log.evidence_briefing = evidence_briefing.model_dump()
-
-        # 오케스트레이션 완료 후 상태를 'ready'로 변경
-        discussion_log.status = "ready"
-        await discussion_log.save()
-
+        with start_span("discussion.orchestration", discussion_id=discussion_id):
+            async with profile_pipeline(discussion_id, "orchestration", enabled=discussion_log.profiling_enabled):
+                special_agents, jury_pool = await get_active_agents_from_db()
+                # 단계 라벨은 _update_progress에서 사용하는 단계 이름과 동일하게 맞춥니다.
+                with start_span("orchestration.stage", stage="주제 분석"), observe_duration(ORCHESTRATION_STAGE_SECONDS, stage="주제 분석"):
+                    analysis_report = await analyze_topic(topic, special_agents, discussion_id)
+                files_to_process = [file] if file else []
+                with start_span("orchestration.stage", stage="자료 수집"), observe_duration(ORCHESTRATION_STAGE_SECONDS, stage="자료 수집"):
+                    evidence_briefing = await gather_evidence(report=analysis_report, files=files_to_process, topic=topic, discussion_id=discussion_id)
+                    evidence_index = await build_evidence_index(evidence_briefing.model_dump())
+                    await save_evidence_index(discussion_id, evidence_index)
+                with start_span("orchestration.stage", stage="전문가 선정"), observe_duration(ORCHESTRATION_STAGE_SECONDS, stage="전문가 선정"):
+                    debate_team = await select_debate_team(
+                        analysis_report, jury_pool, special_agents, discussion_id, get_discussion_profile(discussion_log)
+                    )
+
+        # 구성된 팀 정보와 증거 자료집(Pydantic 모델 -> dict)을 저장하고 상태를 'ready'로 변경합니다.
+        # 오케스트레이션 도중 토론이 취소되었으면('orchestrating'이 아니면) 결과를 기록하지 않습니다.
+        result = await DiscussionLog.get_motor_collection().update_one(
+            {"discussion_id": discussion_id, "status": "orchestrating"},
+            {"$set": {
+                "participants": [
+                    debate_team.judge.model_dump(),
+                    *[agent.model_dump() for agent in debate_team.jury]
+                ],
+                "evidence_briefing": evidence_briefing.model_dump(),
+                "status": "ready"
+            }}
+        )
+        if not result.matched_count:
+            logger.info(f"--- [Orchestration] {discussion_id} was cancelled before the team could be saved. ---")
+
+    except asyncio.CancelledError:
+        # 취소된 경우 상태는 취소 API가 기록하므로, 이미 수집된 증거 자료만 저장합니다.
+        if evidence_briefing is not None:
+            await DiscussionLog.get_motor_collection().update_one(
+                {"discussion_id": discussion_id},
+                {"$set": {"evidence_briefing": evidence_briefing.model_dump()}}
+            )
+        raise
     except Exception as e:
         if discussion_log:
-            discussion_log.status = "failed"
-            await discussion_log.save()
+            await DiscussionLog.get_motor_collection().update_one(
+                {"discussion_id": discussion_id, "status": "orchestrating"},
+                {"$set": {"status": "failed"}}
+            )
         import traceback
         traceback.print_exc()
 
@@ -69,6 +122,7 @@ async def create_discussion(
     background_tasks: BackgroundTasks,
     topic: str = Form(...),
     file: Optional[UploadFile] = File(None),
+    execution_profile: str = Form(DEFAULT_EXECUTION_PROFILE),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
@@ -76,14 +130,27 @@ async def create_discussion(
     1. 토론 ID를 즉시 생성하여 반환합니다.
     2. 오케스트레이션은 백그라운드에서 실행됩니다.
     3. 클라이언트는 /progress API를 폴링하여 진행 상황을 확인합니다.
+    execution_profile로 실행 프로필(fast / balanced / deep 등)을 선택할 수 있습니다.
     """
+    await _ensure_job_capacity(current_user.email)
+
+    profiles = await get_execution_profiles()
+    if execution_profile not in profiles:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown execution profile '{execution_profile}'. Available: {sorted(profiles)}"
+        )
+
     try:
         discussion_id = f"dscn_{uuid.uuid4()}"
         discussion_log = DiscussionLog(
             discussion_id=discussion_id,
             topic=topic,
             user_email=current_user.email,
-            status="orchestrating"
+            user_name=current_user.name,
+            status="orchestrating",
+            execution_profile=execution_profile,
+            execution_profile_config=profiles[execution_profile].model_dump()
         )
         await discussion_log.insert()
 
@@ -97,7 +164,7 @@ async def create_discussion(
         )
 
         # 즉시 discussion_id 반환
-        return {"discussion_id": discussion_id, "status": "orchestrating"}
+        return {"discussion_id": discussion_id, "status": "orchestrating", "execution_profile": execution_profile}
 
     except Exception as e:
         import traceback
@@ -115,11 +182,14 @@ async def execute_discussion_turn(
     discussion_id: str,
     turn_request: TurnRequest, # Pydantic 모델로 user_vote 받기
     background_tasks: BackgroundTasks,
-    current_user: UserModel = Depends(get_current_user)
+    current_user: UserModel = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     특정 토론의 다음 단계를 백그라운드에서 실행합니다.
     사용자가 '토론 시작하기', '다음 라운드 진행' 버튼을 눌렀을 때 호출됩니다.
+    더블 클릭이나 재시도로 같은 턴이 두 번 시작되지 않도록 Idempotency-Key, 턴 lease,
+    MongoDB 조건부 갱신을 차례로 거친 요청만 턴을 시작합니다. (services/turn_admission.py)
     """
     # 1. DB에서 해당 토론 기록을 찾습니다.
     discussion_log = await DiscussionLog.find_one(DiscussionLog.discussion_id == discussion_id)
@@ -130,30 +200,81 @@ async def execute_discussion_turn(
     if discussion_log.user_email != current_user.email:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this discussion.")
 
-    # 3. 토론이 다음 단계를 실행할 수 있는 상태인지 확인합니다.
-    # ('ready', 'turn_complete', 'waiting_for_vote') 상태일 때만 진행 가능합니다.
-    if discussion_log.status not in ["ready", "turn_complete", "waiting_for_vote"]:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT, 
-            detail=f"Cannot start a new turn. Current status is '{discussion_log.status}'."
-        )
+    expected_turn = turn_request.turn_number if turn_request.turn_number is not None else discussion_log.turn_number
+    response = {"message": "Discussion turn execution started in the background.", "turn_number": expected_turn}
 
-    # 4. 토론 상태를 'turn_inprogress'(턴 진행 중)으로 변경하고 DB에 즉시 저장합니다.
-    discussion_log.status = "turn_inprogress"
-    await discussion_log.save()
+    # 3. 같은 Idempotency-Key로 이미 처리된 요청이면 첫 요청의 응답을 그대로 반환합니다.
+    previous_response = await claim_idempotency_key(discussion_id, idempotency_key, response)
+    if previous_response is not None:
+        return previous_response
 
-    # 5. 실제 토론을 진행할 함수를 백그라운드 작업으로 추가합니다.
+    try:
+        await _ensure_job_capacity(current_user.email)
+
+        # 4. 토론이 다음 단계를 실행할 수 있는 상태인지 확인합니다.
+        # ('ready', 'turn_complete', 'waiting_for_vote') 상태일 때만 진행 가능합니다.
+        if discussion_log.status not in ["ready", "turn_complete", "waiting_for_vote"]:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, 
+                detail=f"Cannot start a new turn. Current status is '{discussion_log.status}'."
+            )
+        if discussion_log.turn_number != expected_turn:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Turn {expected_turn} cannot be started. Current turn is {discussion_log.turn_number}."
+            )
+
+        # 5. 턴 lease를 획득합니다. 다른 요청이 이미 이 토론의 턴을 시작했다면 거절합니다.
+        lease_token = await acquire_turn_lease(discussion_id)
+        if lease_token is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A turn is already in progress for this discussion.")
+
+        # 6. 읽은 상태/턴 번호가 그대로일 때만 'turn_inprogress'로 변경합니다. (compare-and-set)
+        admitted_log = await DiscussionLog.find_one(
+            DiscussionLog.discussion_id == discussion_id,
+            In(DiscussionLog.status, ["ready", "turn_complete", "waiting_for_vote"]),
+            DiscussionLog.turn_number == expected_turn
+        ).update({"$set": {"status": "turn_inprogress"}}, response_type=UpdateResponse.NEW_DOCUMENT)
+        if not admitted_log:
+            await release_turn_lease(discussion_id, lease_token)
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A turn is already in progress for this discussion.")
+    except HTTPException:
+        # 턴이 승인되지 않은 요청은 같은 키로 다시 시도할 수 있어야 합니다.
+        await forget_idempotency_key(discussion_id, idempotency_key)
+        raise
+
+    await set_state(
+        discussion_id,
+        status=admitted_log.status,
+        turn_number=admitted_log.turn_number,
+        user_email=admitted_log.user_email
+    )
+
+    # 7. 실제 토론을 진행할 함수를 백그라운드 작업으로 추가합니다.
     # 이 작업은 아래 return 문이 실행된 후에 비동기적으로 처리됩니다.
-    # 백그라운드 작업에 user_vote 전달
+    # 턴이 끝나면 execute_turn이 lease를 해제합니다.
+    from app.services.discussion_flow import execute_turn
     background_tasks.add_task(
         execute_turn, 
-        discussion_log, 
+        admitted_log, 
         turn_request.user_vote,
-        turn_request.model_overrides
+        turn_request.model_overrides,
+        lease_token
     )
 
-    # 6. 클라이언트에게 작업이 백그라운드에서 시작되었음을 즉시 알립니다.
-    return {"message": "Discussion turn execution started in the background."}
+    # 8. 클라이언트에게 작업이 백그라운드에서 시작되었음을 즉시 알립니다.
+    return response
+
+@router.get(
+    "/execution-profiles",
+    summary="선택 가능한 실행 프로필 목록 조회"
+)
+async def list_execution_profiles(
+    current_user: UserModel = Depends(get_current_user)
+):
+    """토론 생성 시 선택할 수 있는 실행 프로필(fast / balanced / deep 및 관리자 정의 프로필)을 반환합니다."""
+    profiles = await get_execution_profiles()
+    return {"default": DEFAULT_EXECUTION_PROFILE, "profiles": [profile.model_dump() for profile in profiles.values()]}
 
 @router.get(
     "/",
@@ -213,9 +334,84 @@ async def get_discussion_detail(
     response_data = discussion.model_dump()
     
     response_data["user_name"] = user_name
+    # UX 패널(결정적 발언, 입장 변화)은 가장 최근 라운드의 요약을 사용합니다.
+    # 지연 계산(lazy) 분석이 비어 있으면 화면에서 라운드 분석 API로 불러옵니다.
+    response_data["round_summary"] = discussion.round_summaries[-1] if discussion.round_summaries else None
     
     return DiscussionLogDetail(**response_data)
 
+# --- 라운드별 분석 조회 (지연 계산) ---
+@router.get(
+    "/{discussion_id}/rounds/{turn_number}/analytics",
+    summary="라운드별 상호작용/입장 변화 분석 조회"
+)
+async def get_discussion_round_analytics(
+    discussion_id: str,
+    turn_number: int,
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    특정 라운드의 결정적 발언, 입장 변화, 상호작용 분석을 반환합니다.
+    아직 계산되지 않은 분석(실행 프로필의 analytics_mode가 lazy인 경우)은 최초 조회 시 계산되어 저장됩니다.
+    """
+    discussion_log = await DiscussionLog.find_one(DiscussionLog.discussion_id == discussion_id)
+    if not discussion_log:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Discussion not found.")
+    if discussion_log.user_email != current_user.email:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this discussion.")
+
+    from app.services.discussion_flow import get_round_analytics
+    analytics = await get_round_analytics(discussion_log, turn_number)
+    if analytics is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Round {turn_number} has not been completed.")
+    return analytics
+
+# --- 진행 중인 작업 취소 ---
+@router.post(
+    "/{discussion_id}/cancel",
+    status_code=status.HTTP_200_OK,
+    summary="진행 중인 오케스트레이션/턴/보고서 생성 취소"
+)
+async def cancel_discussion_job(
+    discussion_id: str,
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    진행 중이거나 슬롯을 기다리는 백그라운드 작업을 취소하고 토론 상태를 'cancelled'로 변경합니다.
+    1. 실행 중인 LLM 호출과 도구 호출을 중단합니다. (다른 워커의 작업은 Redis 취소 요청으로 중단)
+    2. 이미 생성된 발언과 수집된 증거 자료는 저장됩니다.
+    3. 작업 슬롯과 턴 lease를 즉시 반납합니다.
+    """
+    discussion_log = await DiscussionLog.find_one(DiscussionLog.discussion_id == discussion_id)
+    if not discussion_log:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Discussion not found.")
+    if discussion_log.user_email != current_user.email:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized.")
+
+    # 작업이 진행 중인 상태일 때만 'cancelled'로 변경합니다. (compare-and-set)
+    cancelled_log = await DiscussionLog.find_one(
+        DiscussionLog.discussion_id == discussion_id,
+        In(DiscussionLog.status, ["orchestrating", "turn_inprogress", "report_generating"])
+    ).update({"$set": {"status": "cancelled", "completed_at": datetime.utcnow()}}, response_type=UpdateResponse.NEW_DOCUMENT)
+    if not cancelled_log:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"There is no running job to cancel. Current status is '{discussion_log.status}'."
+        )
+
+    cancelled_tasks = await request_cancellation(discussion_id)
+    released_slots = await release_discussion_slots(discussion_id)
+    await force_release_turn_lease(discussion_id)
+    await set_state(
+        discussion_id,
+        status=cancelled_log.status,
+        turn_number=cancelled_log.turn_number,
+        user_email=cancelled_log.user_email
+    )
+    logger.info(f"--- [Cancellation] {discussion_id}: 작업 {cancelled_tasks}개 취소, 슬롯 {released_slots}개 반납 ---")
+
+    return {"message": "Discussion job has been cancelled.", "status": cancelled_log.status}
+
 # 토론 종료 (보고서 생성 없음)
 @router.post(
     "/{discussion_id}/archive",
@@ -272,6 +468,7 @@ async def complete_discussion_and_generate_report(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Discussion not found.")
     if discussion_log.user_email != current_user.email:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized.")
+    await _ensure_job_capacity(current_user.email)
 
     # 3. 상태를 'report_generating'으로 변경하고 완료 시간 기록
     discussion_log.status = "report_generating"
@@ -279,7 +476,8 @@ async def complete_discussion_and_generate_report(
     await discussion_log.save()
 
     # 4. 보고서 생성 파이프라인 함수를 백그라운드 작업으로 등록
-    background_tasks.add_task(generate_report_background, discussion_id)
+    from app.services.report_generator import generate_report_background
+    background_tasks.add_task(generate_report_background, discussion_id, discussion_log.user_email)
     
     # 5. 클라이언트에게 작업이 접수되었음을 즉시 알림
     return {"message": "Discussion completed. Report generation has started in the background."}
@@ -296,10 +494,20 @@ async def get_orchestration_progress(
     """
     Redis에 저장된 오케스트레이션 진행 상황을 조회합니다.
     프론트엔드에서 폴링하여 사용자에게 실시간 피드백을 제공합니다.
+    오케스트레이션/턴/보고서 작업이 슬롯을 기다리는 중이면 대기 순번(queue_position, queue_length)을 반환합니다.
     """
     import json
     from app import db
 
+    queue_status = await get_queue_status(discussion_id)
+    if queue_status:
+        return {
+            "stage": "대기 중",
+            "message": f"다른 작업이 끝나기를 기다리고 있습니다. (대기 순번 {queue_status['queue_position']}/{queue_status['queue_length']})",
+            "progress": 0,
+            **queue_status
+        }
+
     try:
         progress_json = await db.redis_client.get(f"orchestration_progress:{discussion_id}")
 
@@ -318,4 +526,39 @@ async def get_orchestration_progress(
             "stage": "오류",
             "message": f"진행 상황을 가져올 수 없습니다: {str(e)}",
             "progress": 0
-        }
\ No newline at end of file
+        }
+
+# --- 토론 상태 경량 조회 API ---
+@router.get(
+    "/{discussion_id}/status",
+    summary="토론 상태 경량 조회 (Redis 우선)"
+)
+async def get_discussion_status(
+    discussion_id: str,
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    토론의 status와 turn_number만 반환합니다.
+    턴 진행 중에는 Redis의 hot 상태를 우선 사용하여 MongoDB 문서 전체 조회를 피합니다.
+    """
+    state = await get_state(discussion_id)
+    if state.get("user_email") == current_user.email and state.get("status"):
+        return {
+            "discussion_id": discussion_id,
+            "status": state["status"],
+            "turn_number": state.get("turn_number", 0),
+            "pending_messages": await count_pending_entries(discussion_id)
+        }
+
+    discussion_log = await DiscussionLog.find_one(DiscussionLog.discussion_id == discussion_id)
+    if not discussion_log:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Discussion not found.")
+    if discussion_log.user_email != current_user.email:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this discussion.")
+
+    return {
+        "discussion_id": discussion_id,
+        "status": discussion_log.status,
+        "turn_number": discussion_log.turn_number,
+        "pending_messages": 0
+    }
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -8,6 +8,12 @@ from app.core import security
 import logging
 
 from app.crud import user as user_crud
+from app.services.login_throttle import (
+    check_login_throttle,
+    login_semaphore,
+    record_login_failure,
+    reset_login_failures,
+)
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -16,6 +22,7 @@ router = APIRouter()
 
 @router.post("/token", response_model=user_schema.Token)
 async def login_for_access_token(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
@@ -25,10 +32,22 @@ async def login_for_access_token(
     logger.info("--- [LOGIN ATTEMPT] ---")
     logger.info(f"[DEBUG] 1. 로그인 시도 이메일: {form_data.username}")
 
+    # (계정, IP)별 실패 횟수 / IP별 시도 횟수 제한
+    # request.client는 신뢰하는 프록시(TRUSTED_PROXY_IPS)를 거친 경우 X-Forwarded-For의 클라이언트 주소입니다.
+    client_ip = request.client.host if request.client else None
+    retry_after = await check_login_throttle(form_data.username, client_ip)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts. Please try again later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
     # users.json 파일에서 사용자 정보를 이메일로 조회합니다.
     user = await get_user_by_email(email=form_data.username)
 
     if not user:
+        await record_login_failure(form_data.username, client_ip)
         logger.warning(f"[DEBUG] 2. 사용자 찾기 실패: '{form_data.username}' 이메일이 users.json에 없습니다.")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -40,13 +59,16 @@ async def login_for_access_token(
     logger.info(f"[DEBUG] 3. 파일에서 읽어온 Hashed Password: {user.hashed_password}")
     
     # 입력된 비밀번호와 파일에 저장된 해시를 비교합니다.
-    is_password_valid = security.verify_password(
-        form_data.password, user.hashed_password
-    )
+    # scrypt 검증은 전용 스레드 풀에서 실행하며, 워커당 동시 검증 수를 제한합니다.
+    async with login_semaphore:
+        is_password_valid = await security.verify_password_async(
+            form_data.password, user.hashed_password
+        )
     
     logger.info(f"[DEBUG] 4. 비밀번호 검증 결과: {is_password_valid}")
 
     if not is_password_valid:
+        await record_login_failure(user.email, client_ip)
         logger.warning("[DEBUG] 5. 비밀번호 불일치. 로그인 실패 처리합니다.")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -55,13 +77,14 @@ async def login_for_access_token(
         )
     
     logger.info("[DEBUG] 5. 비밀번호 일치. 토큰을 생성합니다.")
+    await reset_login_failures(user.email, client_ip)
 
     await user_crud.update_user_last_login(user) # user 객체를 직접 전달
     logger.info(f"[DEBUG] 6. 사용자 '{user.email}'의 마지막 로그인 시간 업데이트 완료.")
     
     # 인증 성공 시, 액세스 토큰 생성
     access_token = security.create_access_token(
-        data={"sub": user.email, "role": user.role}
+        data={"sub": user.email, "role": user.role, "ver": user.token_version}
     )
     
     logger.info("--- [LOGIN SUCCESS] ---")
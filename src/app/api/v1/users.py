@@ -10,14 +10,18 @@ from app.schemas import user as user_schema
 from app import crud
 
 from app.core import security
+from app.services.principal_cache import get_cached_principal, get_principal_generation, cache_principal
 # from app.models.user import User as UserModel # UserModel 별칭으로 명확하게 임포트
 
 router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/login/token")
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> user_schema.User: # 반환 타입을 Pydantic 스키마로 변경
-    """Decodes the JWT token to get the current user."""
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> user_schema.Principal:
+    """
+    Decodes the JWT token to get the current user.
+    사용자 정보는 principal 캐시에서 조회하며, 캐시에 없을 때만 MongoDB를 조회합니다.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -29,17 +33,34 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> user_schema.U
         )
         email: str = payload.get("sub")
         role: str = payload.get("role")
+        token_version: int = payload.get("ver", 0)
         if email is None or role is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    user = await crud.user.get_user_by_email(email=email)
-    if user is None:
+    principal = await get_cached_principal(email)
+    if principal is None:
+        # 조회 도중 사용자 정보가 바뀌면(권한 변경, 삭제) 조회한 정보를 캐시하지 않도록 세대를 먼저 읽습니다.
+        generation = await get_principal_generation(email)
+        user = await crud.user.get_user_by_email(email=email)
+        if user is None:
+            raise credentials_exception
+        principal = user_schema.Principal(
+            id=str(user.id),
+            email=user.email,
+            name=user.name,
+            role=user.role,
+            token_version=user.token_version,
+        )
+        await cache_principal(principal, generation)
+
+    # 비밀번호/권한 변경 이전에 발급된 토큰은 거부합니다.
+    if principal.token_version != token_version:
         raise credentials_exception
-    return user
+    return principal
 
-async def get_current_admin_user(current_user: user_schema.User = Depends(get_current_user)) -> user_schema.User:
+async def get_current_admin_user(current_user: user_schema.Principal = Depends(get_current_user)) -> user_schema.Principal:
     """Ensures the current user has the 'admin' role."""
     if current_user.role != "admin":
         raise HTTPException(
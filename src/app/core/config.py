@@ -1,7 +1,7 @@
 # app/core/config.py
 
 import logging
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -54,6 +54,91 @@ class Settings(BaseSettings):
     # JWT 서명을 위한 시크릿 키 (실제 운영 시에는 .env에서 관리)
     SECRET_KEY: str = "a_very_secret_key_that_should_be_changed"
 
+    # 보고서 개요/본문 생성 결과 캐시의 유효 시간 (초, 기본 3일)
+    REPORT_CACHE_TTL_SECONDS: int = 259200
+
+    # 턴 진행 중 토론 상태(write-behind 버퍼)를 MongoDB로 flush하는 주기(초)와 배치 크기
+    DISCUSSION_STATE_FLUSH_INTERVAL_SECONDS: float = 5.0
+    DISCUSSION_STATE_FLUSH_BATCH_SIZE: int = 50
+    # flush 잠금의 최대 유지 시간(초)과 턴 세션 소유 표시(heartbeat)의 만료 시간(초)
+    DISCUSSION_STATE_FLUSH_LOCK_TTL_SECONDS: int = 30
+    DISCUSSION_STATE_OWNER_TTL_SECONDS: int = 30
+    # 토론별로 보관할 최대 투표 기록 수
+    VOTE_HISTORY_MAX_LENGTH: int = 50
+
+    # OpenTelemetry 트레이싱 내보내기 방식: "none"(비활성), "console", "otlp"
+    TRACING_EXPORTER: str = "none"
+    # OTLP/HTTP 수집기 주소 (TRACING_EXPORTER가 "otlp"일 때 사용)
+    OTLP_TRACES_ENDPOINT: str = "http://localhost:4318/v1/traces"
+
+    # 백그라운드 파이프라인(오케스트레이션/턴/보고서)을 무작위로 프로파일링할 비율 (0.0 ~ 1.0)
+    PROFILING_SAMPLE_RATE: float = 0.0
+    # pyinstrument 샘플링 간격 (초)
+    PROFILING_INTERVAL_SECONDS: float = 0.01
+
+    # 인증 주체(JWT subject) 캐시: Redis TTL과 워커 프로세스 내 LRU의 TTL/최대 크기
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 300
+    PRINCIPAL_LOCAL_CACHE_TTL_SECONDS: float = 10.0
+    PRINCIPAL_LOCAL_CACHE_MAX_SIZE: int = 1024
+
+    # 비밀번호 해시(scrypt) 전용 스레드 수와 워커당 동시에 처리하는 로그인 수
+    PASSWORD_HASH_MAX_WORKERS: int = 2
+    LOGIN_MAX_CONCURRENCY: int = 4
+    # 로그인 시도 제한: (계정, IP)별 실패 횟수와 IP별 시도 횟수 (LOGIN_THROTTLE_WINDOW_SECONDS 동안)
+    # (계정, IP)별 실패가 LOGIN_FREE_FAILURES회를 넘으면 재시도 대기 시간이 BASE부터 두 배씩 늘어납니다. (최대 MAX)
+    LOGIN_THROTTLE_WINDOW_SECONDS: int = 900
+    LOGIN_FREE_FAILURES: int = 5
+    LOGIN_BACKOFF_BASE_SECONDS: int = 2
+    LOGIN_BACKOFF_MAX_SECONDS: int = 300
+    LOGIN_MAX_ATTEMPTS_PER_IP: int = 30
+    # X-Forwarded-For/X-Forwarded-Proto를 신뢰할 프록시 주소 (쉼표로 구분한 IP/CIDR, gunicorn.conf.py에서도 사용)
+    # 이 주소에서 온 요청만 프록시 헤더로 클라이언트 IP를 결정하므로, 클라이언트가 보낸 헤더로 IP를 위조할 수 없습니다.
+    TRUSTED_PROXY_IPS: str = "127.0.0.1"
+
+    # 배심원별 증거 자료 검색: 상위 passage 수, passage 최대 길이(자)
+    EVIDENCE_TOP_K: int = 5
+    EVIDENCE_PASSAGE_MAX_CHARS: int = 500
+    # 로컬 임베딩 모델 (sentence-transformers, 예: "intfloat/multilingual-e5-small"). 비어 있으면 BM25만 사용
+    EVIDENCE_EMBEDDING_MODEL: Optional[str] = None
+    # 임베딩 유사도 가중치 (0.0 ~ 1.0, 나머지는 BM25)
+    EVIDENCE_EMBEDDING_WEIGHT: float = 0.5
+
+    # 투표 대기 중 선택지별 검색어/검색 결과 선행 조회
+    VOTE_PREFETCH_ENABLED: bool = True
+    VOTE_PREFETCH_TTL_SECONDS: int = 1800
+    # 턴 시작 시 같은 워커에서 진행 중인 선행 조회를 기다리는 최대 시간(초)
+    VOTE_PREFETCH_WAIT_SECONDS: float = 10.0
+
+    # 입장 변화 분석을 한 번의 호출로 묶을 최대 에이전트 수 (0이면 에이전트별로 호출)
+    STANCE_ANALYSIS_BATCH_SIZE: int = 8
+
+    # 라운드 분석 방식: "separate"(결정적 발언/상호작용/입장 변화/투표를 각각 호출) 또는
+    # "composite"(한 번의 구조화된 호출로 모두 생성하고, 검증에 실패한 항목만 개별 호출로 재시도)
+    ROUND_ANALYSIS_MODE: Literal["separate", "composite"] = "separate"
+    # 팩트체커가 'Fact Checker' 에이전트 설정(없음 포함)을 워커 안에 캐시하는 시간(초)
+    FACT_CHECKER_SETTING_CACHE_SECONDS: float = 60.0
+
+    # 턴 실행 승인: 턴 lease 최대 유지 시간(초, 턴이 비정상 종료되어도 이 시간 뒤에는 다시 시작 가능)과
+    # Idempotency-Key 보관 시간(초)
+    TURN_LEASE_TTL_SECONDS: int = 1800
+    TURN_IDEMPOTENCY_TTL_SECONDS: int = 86400
+
+    # 백그라운드 작업(오케스트레이션/턴/보고서) 승인: 동시에 실행할 수 있는 작업 수 (사용자별 / 워커별 / 클러스터 전체)
+    ADMISSION_MAX_JOBS_PER_USER: int = 2
+    ADMISSION_MAX_JOBS_PER_WORKER: int = 8
+    ADMISSION_MAX_JOBS_CLUSTER: int = 32
+    # 사용자별 실행 중 + 대기 중 작업 수 상한 (초과하면 429)
+    ADMISSION_MAX_PENDING_PER_USER: int = 5
+    # 대기 중 슬롯 확인 주기(초), 대기 항목 heartbeat 만료 시간(초),
+    # 실행 중 슬롯 만료 시간(초, 실행 중에는 주기적으로 연장되며 워커가 비정상 종료되면 이 시간 뒤 반납)
+    ADMISSION_POLL_INTERVAL_SECONDS: float = 1.0
+    ADMISSION_QUEUE_TTL_SECONDS: int = 30
+    ADMISSION_SLOT_TTL_SECONDS: int = 300
+
+    # 작업 취소: 다른 워커의 작업이 Redis 취소 요청을 확인하는 주기(초)와 요청 보관 시간(초)
+    CANCEL_POLL_INTERVAL_SECONDS: float = 1.0
+    CANCEL_REQUEST_TTL_SECONDS: int = 600
+
     # --- 환경에 따라 Redis 호스트를 동적으로 결정 ---
     @computed_field
     @property
@@ -0,0 +1,158 @@
+# src/app/core/metrics.py
+
+import functools
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from pymongo import monitoring
+
+# gunicorn 워커 여러 개가 동시에 떠 있으므로, PROMETHEUS_MULTIPROC_DIR이 설정된 경우
+# 각 워커가 기록한 값을 /metrics 요청 시점에 디렉토리에서 모아서 내보냅니다.
+# (이 환경 변수는 prometheus_client가 처음 import 되기 전에 설정되어 있어야 합니다.)
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# LLM 호출/에이전트 발언처럼 수 초~수 분이 걸리는 작업용 버킷
+SLOW_OPERATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# --- 오케스트레이션 / 토론 턴 ---
+ORCHESTRATION_STAGE_SECONDS = Histogram(
+    "ameet_orchestration_stage_seconds",
+    "오케스트레이션 단계별 소요 시간",
+    ["stage"],
+    buckets=SLOW_OPERATION_BUCKETS,
+)
+AGENT_TURN_SECONDS = Histogram(
+    "ameet_agent_turn_seconds",
+    "에이전트 1회 발언 생성 소요 시간 (에이전트 이름은 카디널리티가 무한하므로 모델별로 집계)",
+    ["model"],
+    buckets=SLOW_OPERATION_BUCKETS,
+)
+
+# --- LLM 호출 ---
+LLM_CALL_SECONDS = Histogram(
+    "ameet_llm_call_seconds",
+    "LLM 호출 지연 시간",
+    ["model"],
+    buckets=SLOW_OPERATION_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "ameet_llm_tokens",
+    "LLM 호출에서 사용된 토큰 수",
+    ["model", "direction"],
+)
+
+# --- 외부 도구 API (Tavily, yfinance, FRED) ---
+EXTERNAL_API_SECONDS = Histogram(
+    "ameet_external_api_seconds",
+    "외부 데이터 API 호출 지연 시간",
+    ["api"],
+    buckets=SLOW_OPERATION_BUCKETS,
+)
+
+# --- 데이터 저장소 ---
+MONGO_COMMAND_SECONDS = Histogram(
+    "ameet_mongo_command_seconds",
+    "MongoDB 명령 지연 시간",
+    ["command", "outcome"],
+)
+REDIS_COMMAND_SECONDS = Histogram(
+    "ameet_redis_command_seconds",
+    "Redis 명령 지연 시간",
+    ["command"],
+)
+
+# --- 캐시 ---
+CACHE_REQUESTS = Counter(
+    "ameet_cache_requests",
+    "캐시 조회 결과 (hit/miss)",
+    ["cache", "result"],
+)
+
+# --- 백그라운드 작업 ---
+# livesum: 살아 있는 워커들의 값만 합산합니다. (종료된 워커의 값은 제외)
+BACKGROUND_TASKS_IN_FLIGHT = Gauge(
+    "ameet_background_tasks_in_flight",
+    "현재 실행 중인 백그라운드 작업 수",
+    ["task"],
+    multiprocess_mode="livesum",
+)
+
+# --- 작업 승인 (services/job_admission.py) ---
+ADMISSION_QUEUED_JOBS = Gauge(
+    "ameet_admission_queued_jobs",
+    "슬롯을 기다리며 대기 중인 백그라운드 작업 수",
+    ["job"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "ameet_admission_wait_seconds",
+    "백그라운드 작업이 슬롯을 얻기까지 대기한 시간",
+    ["job"],
+    buckets=SLOW_OPERATION_BUCKETS,
+)
+
+
+@contextmanager
+def observe_duration(histogram: Histogram, **labels):
+    """with 블록의 실행 시간을 주어진 히스토그램에 기록합니다. (예외가 발생해도 기록)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - started)
+
+
+def track_in_flight(task_name: str) -> Callable:
+    """비동기 백그라운드 작업 함수의 동시 실행 수를 게이지로 추적하는 데코레이터."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            gauge = BACKGROUND_TASKS_IN_FLIGHT.labels(task=task_name)
+            gauge.inc()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                gauge.dec()
+        return wrapper
+    return decorator
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """pymongo 명령 이벤트를 받아 MongoDB 명령별 지연 시간을 기록합니다."""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        MONGO_COMMAND_SECONDS.labels(command=event.command_name, outcome="success").observe(event.duration_micros / 1_000_000)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        MONGO_COMMAND_SECONDS.labels(command=event.command_name, outcome="failure").observe(event.duration_micros / 1_000_000)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Prometheus 텍스트 형식의 지표와 Content-Type을 반환합니다."""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: int) -> None:
+    """gunicorn child_exit 훅에서 호출하여, 종료된 워커의 livesum 게이지 파일을 정리합니다."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
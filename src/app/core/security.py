@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -30,4 +32,23 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """비밀번호를 scrypt 해시로 변환합니다."""
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+# --- 비밀번호 해시 전용 실행기 ---
+# scrypt(n=2^14)는 호출당 수십 ms의 CPU를 사용하므로 이벤트 루프에서 직접 실행하면
+# 로그인이 몰릴 때 같은 워커의 SSE/폴링/오케스트레이션 코루틴이 모두 멈춥니다.
+# 크기가 제한된 전용 스레드 풀에서 실행합니다. (hashlib.scrypt는 실행 중 GIL을 해제합니다.)
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+    thread_name_prefix="password-hash",
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password를 비밀번호 해시 전용 스레드 풀에서 실행합니다."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash를 비밀번호 해시 전용 스레드 풀에서 실행합니다."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
@@ -0,0 +1,130 @@
+# src/app/core/tracing.py
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Optional, Tuple, TypeVar
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.trace import Span, SpanKind, Status, StatusCode
+from pymongo import monitoring
+
+from app.core.config import settings, logger
+
+T = TypeVar("T")
+
+# 트레이서 공급자가 설정되지 않으면 OpenTelemetry API가 no-op 트레이서를 반환하므로,
+# TRACING_EXPORTER가 "none"일 때 아래 헬퍼들은 거의 비용 없이 동작합니다.
+tracer = trace.get_tracer("ameet")
+
+
+def setup_tracing() -> None:
+    """설정된 내보내기 방식(console/otlp)으로 전역 TracerProvider를 구성합니다."""
+    exporter_name = settings.TRACING_EXPORTER.lower()
+    if exporter_name == "none":
+        return
+
+    if exporter_name == "console":
+        exporter = ConsoleSpanExporter()
+    elif exporter_name == "otlp":
+        # OTLP 내보내기를 사용할 때만 필요한 의존성이므로 여기서 import 합니다.
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter(endpoint=settings.OTLP_TRACES_ENDPOINT)
+    else:
+        logger.warning(f"--- [Tracing] 알 수 없는 TRACING_EXPORTER 값 '{settings.TRACING_EXPORTER}'. 트레이싱을 비활성화합니다. ---")
+        return
+
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.APP_TITLE}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    logger.info(f"--- [Tracing] OpenTelemetry 트레이싱 활성화 (exporter: {exporter_name}) ---")
+
+
+def shutdown_tracing() -> None:
+    """남아 있는 span을 모두 내보내고 공급자를 종료합니다."""
+    provider = trace.get_tracer_provider()
+    if isinstance(provider, TracerProvider):
+        provider.shutdown()
+
+
+def _clean_attributes(attributes: dict) -> dict:
+    """OpenTelemetry가 허용하는 타입(str/bool/int/float)만 남기고 None은 제외합니다."""
+    return {
+        key: value if isinstance(value, (str, bool, int, float)) else str(value)
+        for key, value in attributes.items() if value is not None
+    }
+
+
+@contextmanager
+def start_span(name: str, **attributes: Any):
+    """현재 컨텍스트의 자식 span을 열고, with 블록 동안 현재 span으로 설정합니다."""
+    with tracer.start_as_current_span(name, attributes=_clean_attributes(attributes)) as span:
+        yield span
+
+
+async def traced(name: str, awaitable: Awaitable[T], **attributes: Any) -> T:
+    """
+    코루틴을 span 안에서 실행합니다. asyncio.gather에 넘기는 작업을 span으로 감쌀 때 사용합니다.
+    (gather가 만드는 Task는 현재 컨텍스트를 복사하므로 부모 span이 그대로 이어집니다.)
+    """
+    with start_span(name, **attributes):
+        return await awaitable
+
+
+def open_span(name: str, **attributes: Any) -> Span:
+    """현재 컨텍스트의 자식 span을 열기만 합니다. (콜백처럼 시작/종료 지점이 분리된 경우용)"""
+    return tracer.start_span(name, attributes=_clean_attributes(attributes))
+
+
+def close_span(span: Optional[Span], error: Optional[BaseException] = None, **attributes: Any) -> None:
+    """open_span으로 연 span에 속성을 추가하고 종료합니다."""
+    if span is None:
+        return
+    span.set_attributes(_clean_attributes(attributes))
+    if error is not None:
+        span.record_exception(error)
+        span.set_status(Status(StatusCode.ERROR, str(error)))
+    span.end()
+
+
+class MongoTracingListener(monitoring.CommandListener):
+    """
+    pymongo 명령마다 span을 생성합니다.
+    Motor는 executor 스레드로 contextvars를 복사해 주므로, span은 호출한 코루틴의 현재 span 아래에 붙습니다.
+    """
+
+    def __init__(self):
+        self._spans: Dict[Tuple[int, Any], Span] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        collection = event.command.get(event.command_name)
+        span = tracer.start_span(
+            f"mongo.{event.command_name}",
+            kind=SpanKind.CLIENT,
+            attributes=_clean_attributes({
+                "db.system": "mongodb",
+                "db.name": event.database_name,
+                "db.operation": event.command_name,
+                "db.mongodb.collection": collection if isinstance(collection, str) else None
+            })
+        )
+        with self._lock:
+            self._spans[(event.request_id, event.connection_id)] = span
+
+    def _finish(self, event, error: Optional[str] = None) -> None:
+        with self._lock:
+            span = self._spans.pop((event.request_id, event.connection_id), None)
+        if span is None:
+            return
+        if error:
+            span.set_status(Status(StatusCode.ERROR, error))
+        span.end()
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, error=str(event.failure))
@@ -7,7 +7,8 @@ from bson import ObjectId  # [수정] MongoDB의 ObjectId를 직접 사용하기
 # Pydantic 스키마와 MongoDB 모델(User)을 모두 사용
 from app.schemas.user import UserCreate, UserUpdate
 from app.models.discussion import User
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
+from app.services.principal_cache import invalidate_principal
 from app import db # [수정] db 모듈 임포트
 from app.core.config import settings
 
@@ -16,6 +17,10 @@ def get_user_collection():
     db_name = settings.MONGO_DB_URL.split("/")[-1].split("?")[0]
     return db.mongo_client[db_name]["users"]
 
+def get_discussion_collection():
+    db_name = settings.MONGO_DB_URL.split("/")[-1].split("?")[0]
+    return db.mongo_client[db_name]["discussions"]
+
 async def get_user_by_email(email: str) -> Optional[User]:
     """이메일로 MongoDB에서 사용자를 조회합니다."""
     collection = get_user_collection()
@@ -35,7 +40,7 @@ async def get_user_by_id(user_id: str) -> Optional[User]:
 async def create_user(user: UserCreate) -> User:
     """새로운 사용자를 생성하여 MongoDB에 저장합니다."""
     collection = get_user_collection()
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     
     # Beanie 모델을 사용하여 데이터 구조를 만들고 dict로 변환
     new_user_model = User(
@@ -85,20 +90,33 @@ async def update_user(user_id: str, user_update: UserUpdate) -> Optional[User]:
     update_data = user_update.model_dump(exclude_unset=True)
 
     if "password" in update_data and update_data["password"]:
-        hashed_password = get_password_hash(update_data["password"])
+        hashed_password = await get_password_hash_async(update_data["password"])
         update_data["hashed_password"] = hashed_password
         del update_data["password"]
 
     if not update_data:
         return await get_user_by_id(user_id) # 변경 사항이 없으면 현재 사용자 정보 반환
 
+    update_ops = {"$set": update_data}
+    # 비밀번호나 권한이 바뀌면 토큰 버전을 올려 기존에 발급된 토큰을 무효화합니다.
+    if "hashed_password" in update_data or "role" in update_data:
+        update_ops["$inc"] = {"token_version": 1}
+
     result = await collection.find_one_and_update(
         {"_id": ObjectId(user_id)},
-        {"$set": update_data},
+        update_ops,
         return_document=True
     )
     if result:
-        return User.model_validate(result)
+        updated_user = User.model_validate(result)
+        await invalidate_principal(updated_user.email)
+        # 토론 문서에 비정규화된 사용자 이름도 함께 갱신합니다.
+        if "name" in update_data:
+            await get_discussion_collection().update_many(
+                {"user_email": updated_user.email},
+                {"$set": {"user_name": updated_user.name}}
+            )
+        return updated_user
     return None
 
 async def delete_user(user_id: str) -> Optional[User]:
@@ -106,5 +124,7 @@ async def delete_user(user_id: str) -> Optional[User]:
     collection = get_user_collection()
     user_to_delete = await collection.find_one_and_delete({"_id": ObjectId(user_id)})
     if user_to_delete:
-        return User.model_validate(user_to_delete)
+        deleted_user = User.model_validate(user_to_delete)
+        await invalidate_principal(deleted_user.email)
+        return deleted_user
     return None
\ No newline at end of file
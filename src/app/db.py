@@ -5,10 +5,34 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 
 from app.core.config import settings, logger
+from app.core.metrics import MongoCommandListener, REDIS_COMMAND_SECONDS, observe_duration
+from app.core.tracing import MongoTracingListener, start_span
 
 redis_client = None
 mongo_client = None
 
+
+class InstrumentedRedis(redis.Redis):
+    """모든 Redis 명령의 지연 시간을 Prometheus 히스토그램에 기록하는 클라이언트."""
+
+    async def execute_command(self, *args, **options):
+        command = str(args[0]).lower() if args else "unknown"
+        with start_span(f"redis.{command}", **{"db.system": "redis", "db.operation": command}):
+            with observe_duration(REDIS_COMMAND_SECONDS, command=command):
+                return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> "InstrumentedPipeline":
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class InstrumentedPipeline(redis.client.Pipeline):
+    """파이프라인은 명령을 모아서 한 번에 보내므로, execute 단위로 지연 시간을 기록합니다."""
+
+    async def execute(self, raise_on_error: bool = True):
+        with start_span("redis.pipeline", **{"db.system": "redis", "db.operation": "pipeline", "db.redis.command_count": len(self.command_stack)}):
+            with observe_duration(REDIS_COMMAND_SECONDS, command="pipeline"):
+                return await super().execute(raise_on_error)
+
 async def init_db_connections():
     """Initializes connections to Redis and MongoDB."""
     global redis_client, mongo_client
@@ -17,7 +41,7 @@ async def init_db_connections():
 
     # --- Redis Initialization ---
     try:
-        redis_client = redis.from_url(f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}", decode_responses=True)
+        redis_client = InstrumentedRedis.from_url(f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}", decode_responses=True)
         await redis_client.ping()
         logger.info("--- [DB-INIT] Redis connection successful. ---")
     except Exception as e:
@@ -26,12 +50,12 @@ async def init_db_connections():
 
     # --- MongoDB and Beanie Initialization ---
     try:
-        from app.models.discussion import AgentSettings, DiscussionLog, User, SystemSettings
+        from app.models.discussion import AgentSettings, DiscussionLog, DiscussionEvidenceIndex, User, SystemSettings, LLMUsage, LLMUsageDaily, ProfileReport
 
         db_name = settings.MONGO_DB_URL.split("/")[-1].split("?")[0]
-        mongo_client = AsyncIOMotorClient(settings.MONGO_DB_URL)
+        mongo_client = AsyncIOMotorClient(settings.MONGO_DB_URL, event_listeners=[MongoCommandListener(), MongoTracingListener()])
         
-        document_models_to_init = [AgentSettings, DiscussionLog, User, SystemSettings]
+        document_models_to_init = [AgentSettings, DiscussionLog, DiscussionEvidenceIndex, User, SystemSettings, LLMUsage, LLMUsageDaily, ProfileReport]
       
         await init_beanie(
             database=mongo_client[db_name],
@@ -6,7 +6,11 @@ from pathlib import Path
 from fastapi import FastAPI
 
 from app.core.config import settings, logger
+from app.core.metrics import render_metrics
+from app.core.tracing import setup_tracing, shutdown_tracing
 from app import db
+from app.services.discussion_state import recover_pending_state
+from app.tools.http_client import close_http_client
 from app.api.v1 import login, users, setup, discussions as discussions_router
 from app.api.v1.admin import (
     agents as admin_agents, 
@@ -15,7 +19,7 @@ from app.api.v1.admin import (
     settings as admin_settings
 )
 
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
@@ -31,11 +35,15 @@ app = FastAPI(title=settings.APP_TITLE)
 
 # --- 기본 설정 및 이벤트 핸들러 ---
 BASE_DIR = Path(__file__).resolve().parent.parent
+app.add_event_handler("startup", setup_tracing)
 app.add_event_handler("startup", db.init_db_connections)
+app.add_event_handler("startup", recover_pending_state)
 app.add_event_handler("shutdown", db.close_db_connections)
+app.add_event_handler("shutdown", close_http_client)
+app.add_event_handler("shutdown", shutdown_tracing)
 
 # --- 미들웨어 설정 ---
-app.add_middleware(ProxyHeadersMiddleware, trusted_hosts="*")
+app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=settings.TRUSTED_PROXY_IPS)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -82,6 +90,12 @@ async def read_admin_page():
     """
     return FileResponse(BASE_DIR / "templates/admin.html")
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 스크레이프용 지표를 반환합니다. (gunicorn 워커 전체 합산)"""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
 @app.get("/api/v1/health-check")
 async def health_check():
     """Checks the status of Redis and MongoDB connections."""
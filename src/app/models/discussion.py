@@ -1,6 +1,7 @@
 # src/app/models/discussion.py
 
 from beanie import Document, Indexed
+from pymongo import IndexModel
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Literal, Optional, Annotated
 from datetime import datetime, timezone
@@ -18,7 +19,8 @@ class DiscussionLog(Document):
         "waiting_for_vote",   # 5. 사용자 투표/피드백 대기 중 
         "report_generating",  # 6. 사용자가 토론을 종료하고, 보고서 생성이 진행 중인 상태
         "completed",          # 7. 모든 토론 및 보고서 생성까지 완료된 상태
-        "failed"              # 8. 오류로 인한 실패 
+        "failed",             # 8. 오류로 인한 실패 
+        "cancelled"           # 9. 사용자가 진행 중인 작업(오케스트레이션/턴/보고서)을 취소한 상태
     ] = "orchestrating"
 
     # --- 토론 참여자 정보를 저장하는 필드 ---
@@ -26,9 +28,12 @@ class DiscussionLog(Document):
 
     # 초기 분석 단계에서 수집된 증거 자료집을 저장할 필드
     evidence_briefing: Optional[Dict[str, Any]] = Field(default=None, description="오케스트레이션 단계에서 수집된 웹/파일 증거 자료집")
+    # 배심원별 증거 자료 검색 인덱스는 목록/상세 조회 시 함께 읽히지 않도록 별도 컬렉션(DiscussionEvidenceIndex)에 저장합니다.
     
     topic: str
     user_email: Annotated[str, Indexed()]
+    # 관리자 목록 조회 시 users 컬렉션 조인을 피하기 위해 비정규화한 사용자 이름
+    user_name: Optional[str] = Field(default=None, description="토론 생성 시점의 사용자 이름 (사용자 정보 수정 시 함께 갱신)")
     turn_number: int = Field(default=0, description="현재 토론 라운드 번호 (0부터 시작)")
     transcript: List[Dict[str, Any]] = Field(default_factory=list)
     
@@ -42,13 +47,43 @@ class DiscussionLog(Document):
 
      # 현재 라운드의 투표 정보를 저장하는 필드
     current_vote: Optional[Dict[str, Any]] = Field(default=None, description="현재 진행 중인 투표의 주제와 선택지")
+    # 사용자가 지금까지 선택한 투표 항목 (오래된 순)
+    vote_history: List[str] = Field(default_factory=list, description="라운드별 사용자 투표 선택 기록")
 
     # --- UX 데이터 필드 ---
     flow_data: Optional[Dict[str, Any]] = Field(default=None, description="라운드별 에이전트 상호작용 데이터")
     round_summaries: List[Dict[str, Any]] = Field(default_factory=list, description="라운드별 요약 데이터 리스트")
+
+    # --- 상태 버퍼(write-behind) 관련 필드 ---
+    stream_flushed_id: Optional[str] = Field(default=None, description="MongoDB에 마지막으로 반영된 Redis Stream 항목 ID (중복 반영 방지용)")
+
+    # --- 실행 프로필 (services/execution_profiles.py) ---
+    execution_profile: str = Field(default="balanced", description="토론 생성 시 선택한 실행 프로필 이름 (fast / balanced / deep 등)")
+    execution_profile_config: Optional[Dict[str, Any]] = Field(default=None, description="토론 생성 시점의 실행 프로필 설정 스냅샷")
+
+    # --- 프로파일링 ---
+    profiling_enabled: bool = Field(default=False, description="True이면 이 토론의 백그라운드 파이프라인을 항상 프로파일링")
     
     class Settings:
         name = "discussions"
+        # 관리자 목록 조회(최신순 정렬 + 상태/이메일/이름 접두어 검색)를 위한 인덱스
+        indexes = [
+            [("created_at", -1)],
+            [("status", 1), ("created_at", -1)],
+            [("user_email", 1), ("created_at", -1)],
+            [("user_name", 1), ("created_at", -1)]
+        ]
+
+
+# --- 토론별 증거 자료 검색 인덱스 ---
+class DiscussionEvidenceIndex(Document):
+    """증거 자료집과 라운드별 검색 결과를 passage 단위로 담은 BM25 인덱스 (services/evidence_index.py)"""
+    discussion_id: Annotated[str, Indexed(unique=True)]
+    index: Dict[str, Any] = Field(description="배심원별 증거 자료 검색용 인덱스 (EvidenceIndex.model_dump())")
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "discussion_evidence_indexes"
 
 
 # --- 에이전트의 실제 설정을 담는 Pydantic 모델 ---
@@ -108,6 +143,8 @@ class User(Document):
     role: Literal["user", "admin"]
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     last_login_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # 비밀번호/권한이 바뀌면 증가합니다. JWT의 'ver' 클레임과 비교하여 이전 토큰을 무효화합니다.
+    token_version: int = 0
 
     class Settings:
         name = "users"
@@ -123,4 +160,69 @@ class SystemSettings(Document):
     description: Optional[str] = Field(default=None, description="설명")
     
     class Settings:
-        name = "system_settings"
\ No newline at end of file
+        name = "system_settings"
+
+# --- LLM 호출 사용량(토큰/비용) 기록 모델 ---
+class LLMUsage(Document):
+    """
+    개별 LLM 호출의 토큰 사용량, 비용, 지연 시간을 저장하는 모델.
+    LangChain 콜백 핸들러(UsageCallbackHandler)가 모든 LLM 호출마다 기록합니다.
+    """
+    discussion_id: Optional[str] = Field(default=None, description="호출이 속한 토론 ID (태그 'discussion_id:...'에서 추출)")
+    stage: str = Field(description="호출 단계 이름 (예: 'stance_analysis', 'Topic Analyst')")
+    agent_name: Optional[str] = Field(default=None, description="호출한 에이전트 이름")
+    turn_number: Optional[int] = Field(default=None, description="토론 라운드 번호 (해당하는 경우)")
+    model_name: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+    # 입력 토큰 중 공급자 프롬프트 캐시에서 읽은/새로 기록한 토큰 수
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    cost_usd: float = 0.0
+    latency_ms: float = 0.0
+    start_time: datetime
+
+    class Settings:
+        name = "llm_usage"
+        indexes = [
+            [("discussion_id", 1), ("start_time", 1)],
+            [("start_time", -1)]
+        ]
+
+class LLMUsageDaily(Document):
+    """일자/모델별로 사전 집계된 LLM 사용량 (관리자 대시보드 요약용)"""
+    date: str = Field(description="UTC 기준 날짜 (YYYY-MM-DD)")
+    model_name: str
+    call_count: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    total_cost_usd: float = 0.0
+
+    class Settings:
+        name = "llm_usage_daily"
+        indexes = [
+            IndexModel([("date", 1), ("model_name", 1)], unique=True)
+        ]
+
+# --- 백그라운드 파이프라인 프로파일링 결과 ---
+class ProfileReport(Document):
+    """오케스트레이션/턴/보고서 생성 파이프라인 1회 실행에 대한 프로파일링 결과"""
+    discussion_id: str
+    pipeline: Literal["orchestration", "turn", "report"]
+    turn_number: Optional[int] = None
+    trigger: Literal["discussion", "sampling"] = Field(description="프로파일링이 켜진 이유 (토론별 설정 또는 샘플링)")
+    duration_seconds: float
+    text_report: str = Field(description="pyinstrument 텍스트 출력 (호출 트리)")
+    # HTML 출력은 수십 MB가 될 수 있어(16MB 문서 제한) gzip으로 압축하여 GridFS('profile_reports' 버킷)에 저장합니다.
+    html_report_file_id: Optional[str] = Field(default=None, description="pyinstrument HTML 출력(gzip)의 GridFS 파일 ID (다운로드용)")
+    task_timings: List[Dict[str, Any]] = Field(default_factory=list, description="파이프라인 중 생성된 asyncio 태스크의 코루틴별 소요 시간 요약")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "profile_reports"
+        indexes = [
+            [("discussion_id", 1), ("created_at", -1)],
+            [("created_at", -1)]
+        ]
@@ -1,7 +1,7 @@
 # src/app/schemas/admin.py
 
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 class TurnUsageDetail(BaseModel):
@@ -37,4 +37,19 @@ class UsageSummaryResponse(BaseModel):
     """대시보드 상단 카드에 표시될 사용량 요약 정보"""
     total_cost_this_month: float
     total_discussions_this_month: int
-    average_cost_per_discussion: float
\ No newline at end of file
+    average_cost_per_discussion: float
+
+class ProfilingToggleRequest(BaseModel):
+    """토론별 프로파일링 설정 변경 요청"""
+    enabled: bool
+
+class ProfileReportItem(BaseModel):
+    """프로파일링 결과 목록 항목 (HTML/텍스트 본문 제외)"""
+    id: str
+    discussion_id: str
+    pipeline: str
+    turn_number: Optional[int] = None
+    trigger: str
+    duration_seconds: float
+    task_timings: List[Dict[str, Any]] = Field(description="코루틴별 asyncio 태스크 소요 시간 요약 (총 소요 시간 내림차순)")
+    created_at: datetime
@@ -37,6 +37,8 @@ class DiscussionLogDetail(DiscussionLogItem):
     flow_data: Optional[Dict[str, Any]] = None
     
     current_vote: Optional[Dict[str, Any]] = Field(default=None, description="현재 진행 중인 투표의 주제와 선택지")
+
+    execution_profile: str = Field(default="balanced", description="토론 생성 시 선택한 실행 프로필 이름")
     
     class Config:
         from_attributes = True
@@ -57,4 +59,13 @@ class Interaction(BaseModel):
 
 class InteractionAnalysisResult(BaseModel):
     """Interaction Analyst의 분석 결과를 담는 모델"""
-    interactions: List[Interaction]
\ No newline at end of file
+    interactions: List[Interaction]
+class FactCheckItem(BaseModel):
+    """발언 하나에 대한 팩트체크 결과"""
+    index: int = Field(description="검증한 발언의 번호 (입력에 표시된 [번호])")
+    status: Literal["검증됨", "주의 필요", "사실과 다름"] = Field(description="검증 결과")
+    reason: str = Field(description="판단 근거를 한두 문장으로 설명합니다.")
+
+class FactCheckResult(BaseModel):
+    """Fact Checker 에이전트가 한 라운드의 발언 전체를 검증한 결과"""
+    items: List[FactCheckItem]
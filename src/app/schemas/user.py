@@ -35,6 +35,8 @@ class User(UserBase):
     # datetime 객체를 직접 받도록 타입 변경
     created_at: Optional[datetime] = None
     last_login_at: Optional[datetime] = None
+    # 비밀번호/권한이 바뀌면 증가하며, 이전 버전으로 발급된 토큰은 거부됩니다.
+    token_version: int = 0
     
     class Config:
         # Beanie/MongoDB 모델 객체를 Pydantic 모델로 변환하기 위한 설정
@@ -51,6 +53,14 @@ class User(UserBase):
 class UserInDB(User):
     pass
 
+class Principal(BaseModel):
+    """인증된 요청의 주체. 요청마다 캐시에서 조회되므로 비밀번호 해시는 포함하지 않습니다."""
+    id: str
+    email: EmailStr
+    name: str
+    role: str
+    token_version: int = 0
+
 # --- 사용자 정보 수정을 위한 스키마 ---
 class UserUpdate(BaseModel):
     # 모든 필드는 선택 사항으로, 값이 제공된 필드만 업데이트합니다.
@@ -2,14 +2,11 @@
 
 import asyncio
 import json
-from typing import Dict, List, Literal, Optional
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
+from typing import Dict, List, Literal, Optional, Tuple
+from app.services.llm_providers import get_chat_model
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from app.tools.search import perform_web_search_async, web_search_tool
 from datetime import datetime
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, SystemMessage
 from app.schemas.orchestration import AgentDetail
 
 from pydantic import BaseModel, ValidationError
@@ -19,8 +16,20 @@ from app.db import redis_client
 
 from app.schemas.orchestration import DebateTeam
 from app.models.discussion import AgentSettings, DiscussionLog
-from app.services.utility_agents import run_snr_agent, run_verifier_agent
-from app.core.config import logger
+from app.services.utility_agents import run_staff_pipeline
+from app.services.discussion_state import TurnStateSession, append_vote, get_vote_history
+from app.core.config import settings, logger
+from beanie.operators import In
+from app.services.vote_prefetch import pop_prefetched_search, schedule_prefetch, store_prefetched_search, wait_for_prefetch
+from app.services.evidence_index import (
+    add_search_results, build_evidence_index, format_evidence, load_evidence_index, retrieve_for_queries, save_evidence_index
+)
+from app.core.metrics import AGENT_TURN_SECONDS, observe_duration, track_in_flight
+from app.core.tracing import start_span, traced
+from app.services.profiling import profile_pipeline
+from app.services.execution_profiles import get_discussion_profile
+from app.services.turn_admission import release_turn_lease
+from app.services.job_cancellation import run_background_job
 
 from app.schemas.orchestration import AgentDetail # AgentDetail 스키마 추가
 from app.schemas.discussion import VoteContent
@@ -29,7 +38,7 @@ import re
 
 # 에이전트 및 도구 실행을 위한 LangChain 모듈 임포트
 from langchain.agents import AgentExecutor, create_tool_calling_agent
-from app.tools.search import available_tools
+from app.tools.registry import DEFAULT_JUROR_TOOLS, get_tools, run_tool
 
 # ReAct 패턴을 적용한 강력한 시스템 레벨 도구 사용 규칙 정의
 SYSTEM_TOOL_INSTRUCTION_BLOCK = """
@@ -39,13 +48,13 @@ SYSTEM_TOOL_INSTRUCTION_BLOCK = """
 You have access to a `web_search` tool. Your decision to use it must follow a strict 2-step process:
 
 **Step 1: Evaluate Provided Information**
-First, thoroughly review the "[중앙 집중식 웹 검색 결과]" and "[참고 자료]" provided in the prompt. This is the baseline information for the current turn.
+First, thoroughly review the "[참고 자료]" section provided in the prompt. It contains the passages from the evidence briefing and this round's web search results that are most relevant to your role. This is the baseline information for the current turn.
 
 **Step 2: Justify and Execute Supplemental Search (If Necessary)**
 You are authorized to use the `web_search` tool **ONLY IF** the provided information is insufficient for you to perform your specific role as an expert.
 
 -   **Justification (Internal Thought):** Before calling the tool, you must internally reason why a supplemental search is critical. For example: "As a Financial Analyst, the general overview of robotaxis is not enough. I need specific, recent financial data."
--   **Execution:** If justified, perform **one, highly-specific** search to acquire the missing information. Do NOT repeat the general search that was already provided.
+-   **Execution:** If justified, perform **one, highly-specific** search to acquire the missing information. Do NOT repeat a search whose results already appear in "[참고 자료]".
 
 **CRITICAL RULES:**
 -   **DO NOT** use the `web_search` tool if the provided information is sufficient.
@@ -59,6 +68,21 @@ class StanceAnalysis(BaseModel):
     change: Literal['유지', '강화', '수정', '약화']
     reason: str
 
+# 여러 에이전트의 입장 변화를 한 번에 분석하기 위한 모델
+class AgentStanceAnalysis(StanceAnalysis):
+    agent_name: str
+
+class BatchStanceAnalysis(BaseModel):
+    analyses: List[AgentStanceAnalysis]
+
+STANCE_ICON_MAP = {"유지": "😐", "강화": "🔼", "수정": "🔄", "약화": "🔽"}
+
+def _with_model(setting: Optional[AgentSettings], model: Optional[str]) -> Optional[AgentSettings]:
+    """실행 프로필에 분석 모델이 지정되어 있으면, 에이전트 설정에서 모델만 바꾼 사본을 반환합니다."""
+    if not setting or not model:
+        return setting
+    return setting.model_copy(update={"config": setting.config.model_copy(update={"model": model})})
+
 # 검색 코디네이터를 호출하는 새로운 내부 함수
 async def _get_search_query(discussion_log: DiscussionLog, user_vote: Optional[str]) -> Optional[str]:
     try:
@@ -78,7 +102,7 @@ async def _get_search_query(discussion_log: DiscussionLog, user_vote: Optional[s
             "위 내용을 바탕으로, 다음 토론에 가장 도움이 될 단 하나의 웹 검색어를 생성해주세요."
         )
 
-        llm = ChatGoogleGenerativeAI(model=coordinator_setting.config.model)
+        llm = get_chat_model(model=coordinator_setting.config.model)
         prompt = ChatPromptTemplate.from_messages([
             ("system", coordinator_setting.config.prompt),
             ("human", "{input}")
@@ -97,15 +121,45 @@ async def _get_search_query(discussion_log: DiscussionLog, user_vote: Optional[s
         logger.error(f"!!! 'Search Coordinator' 실행 중 오류 발생: {e}", exc_info=True)
         return None
 
+async def _search_for_vote(discussion_log: DiscussionLog, vote_option: str) -> List[dict]:
+    """투표 선택지에 맞는 검색어를 생성하고 웹 검색을 수행합니다."""
+    search_query = await traced("turn.search_query", _get_search_query(discussion_log, vote_option))
+    if not search_query:
+        return []
+    # 도구 레지스트리를 통해 실행 (타임아웃/캐시 정책 적용)
+    return await run_tool("web_search", query=search_query)
+
+@track_in_flight("vote_prefetch")
+async def _prefetch_vote_searches(discussion_log: DiscussionLog) -> None:
+    """투표 대기 중에 모든 선택지의 검색어 생성과 웹 검색을 미리 수행하여 저장합니다."""
+    discussion_id = discussion_log.discussion_id
+    turn_number = discussion_log.turn_number
+    options = (discussion_log.current_vote or {}).get("options") or []
+
+    async def _prefetch(option: str) -> None:
+        search_query = await _get_search_query(discussion_log, option)
+        if not search_query:
+            return
+        search_results = await run_tool("web_search", query=search_query)
+        # 빈 결과(오류 포함)는 저장하지 않고, 턴 시작 시 다시 검색하도록 둡니다.
+        if search_results:
+            await store_prefetched_search(discussion_id, turn_number, option, search_query, search_results)
+
+    with start_span("vote.prefetch", discussion_id=discussion_id, turn_number=turn_number, options=len(options)):
+        await asyncio.gather(*[_prefetch(option) for option in options])
+    logger.info(f"--- [Vote Prefetch] {len(options)}개 선택지의 검색 결과를 미리 조회했습니다. (ID: {discussion_id}) ---")
+
 # 개별 에이전트의 입장 변화를 분석하는 AI 호출 함수
 async def _get_single_stance_change(
-    agent_name: str, prev_statement: str, current_statement: str, discussion_id: str, turn_number: int
+    agent_name: str, prev_statement: str, current_statement: str, discussion_id: str, turn_number: int,
+    analyst_setting: Optional[AgentSettings] = None
 ) -> dict:
     logger.info(f"--- [Stance Analysis] Agent: {agent_name}, Turn: {turn_number} 분석 시작 ---")
     try:
-        analyst_setting = await AgentSettings.find_one(
-            AgentSettings.name == "Stance Analyst", AgentSettings.status == "active"
-        )
+        if analyst_setting is None:
+            analyst_setting = await AgentSettings.find_one(
+                AgentSettings.name == "Stance Analyst", AgentSettings.status == "active"
+            )
         # 1. Stance Analyst 에이전트를 DB에서 찾았는지 확인
         if not analyst_setting:
             # logger.warning("!!! [Stance Analysis] 'Stance Analyst' 에이전트를 DB에서 찾을 수 없거나 'active' 상태가 아닙니다.")
@@ -120,7 +174,7 @@ async def _get_single_stance_change(
         # 2. AI에게 전달될 최종 프롬프트 내용을 로그로 출력
         # logger.info(f"--- AI에게 전달될 프롬프트 ---\n{transcript_to_analyze}\n---------------------------")
 
-        analyst_agent = ChatGoogleGenerativeAI(model=analyst_setting.config.model)
+        analyst_agent = get_chat_model(model=analyst_setting.config.model)
         structured_llm = analyst_agent.with_structured_output(StanceAnalysis)
         prompt = ChatPromptTemplate.from_messages([
             ("system", analyst_setting.config.prompt),
@@ -136,28 +190,70 @@ async def _get_single_stance_change(
         # 3. AI의 응답이 성공적으로 파싱되었는지 확인
         # logger.info(f"성공적으로 AI 응답을 파싱했습니다: {analysis}")
         
-        icon_map = {"유지": "😐", "강화": "🔼", "수정": "🔄", "약화": "🔽"}
-        return {"agent_name": agent_name, "change": analysis.change, "icon": icon_map.get(analysis.change, "❓")}
+        return {"agent_name": agent_name, "change": analysis.change, "icon": STANCE_ICON_MAP.get(analysis.change, "❓")}
     
     except Exception as e:
         # 4. 오류 발생 시, 정확한 오류 메시지를 로그로 출력
         logger.error(f"!!! [Stance Analysis] 에러 발생: Agent '{agent_name}'의 입장 분석 중 실패. 에러: {e}", exc_info=True)
         return {"agent_name": agent_name, "change": "분석 불가", "icon": "❓"}
 
-# 모든 참여자의 입장 변화를 병렬로 분석하는 메인 함수
-async def _analyze_stance_changes(transcript: List[dict], jury_members: List[dict], discussion_id: str, turn_number: int) -> List[dict]:
+async def _get_batch_stance_changes(
+    comparisons: List[Tuple[str, str, str]], analyst_setting: AgentSettings, discussion_id: str, turn_number: int
+) -> List[dict]:
     """
-    [고도화 버전] 전체 토론 기록을 바탕으로 각 에이전트의 최신 발언 2개를 정확히 찾아
-    입장 변화를 안정적으로 분석합니다.
+    여러 에이전트의 (이전 발언, 현재 발언)을 한 번의 구조화된 호출로 분석합니다.
+    응답 검증에 실패했거나 누락된 에이전트는 개별 호출로 다시 분석합니다.
     """
-    logger.info(f"--- [Stance Analysis] Robust analysis started for Turn: {turn_number} ---")
+    logger.info(f"--- [Stance Analysis] {len(comparisons)}명 일괄 분석 시작 (Turn: {turn_number}) ---")
+    results: Dict[str, dict] = {}
+    try:
+        transcript_to_analyze = "\n\n---\n\n".join(
+            f"에이전트 이름: {agent_name}\n\n"
+            f"이전 발언: \"{prev_statement}\"\n\n"
+            f"현재 발언: \"{current_statement}\""
+            for agent_name, prev_statement, current_statement in comparisons
+        )
+        analyst_agent = get_chat_model(model=analyst_setting.config.model)
+        structured_llm = analyst_agent.with_structured_output(BatchStanceAnalysis)
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", analyst_setting.config.prompt),
+            ("human",
+             "다음은 여러 에이전트의 이전 발언과 현재 발언입니다. 각 에이전트의 입장 변화를 따로 분석하여, "
+             "에이전트마다 agent_name(위에 표시된 이름 그대로), change, reason을 담은 항목을 하나씩 반환하세요:\n\n{transcript}")
+        ])
+        batch = await (prompt | structured_llm).ainvoke(
+            {"transcript": transcript_to_analyze},
+            config={"tags": [f"discussion_id:{discussion_id}", f"turn:{turn_number}", "task:stance_analysis"]}
+        )
+        expected_names = {agent_name for agent_name, _, _ in comparisons}
+        for analysis in batch.analyses:
+            if analysis.agent_name in expected_names and analysis.agent_name not in results:
+                results[analysis.agent_name] = {
+                    "agent_name": analysis.agent_name,
+                    "change": analysis.change,
+                    "icon": STANCE_ICON_MAP.get(analysis.change, "❓")
+                }
+    except Exception as e:
+        logger.error(f"!!! [Stance Analysis] 일괄 분석 실패, 에이전트별 분석으로 전환합니다. 에러: {e}", exc_info=True)
+
+    # 응답에서 빠졌거나 검증에 실패한 에이전트만 개별 호출로 분석합니다.
+    missing = [comparison for comparison in comparisons if comparison[0] not in results]
+    if missing:
+        logger.warning(f"--- [Stance Analysis] {len(missing)}명은 개별 분석으로 대체합니다: {[name for name, _, _ in missing]} ---")
+        fallbacks = await asyncio.gather(*[
+            _get_single_stance_change(agent_name, prev_statement, current_statement, discussion_id, turn_number, analyst_setting)
+            for agent_name, prev_statement, current_statement in missing
+        ])
+        results.update({result["agent_name"]: result for result in fallbacks})
 
-    # 1. 토론이 최소 1라운드는 진행되어야 비교가 가능하므로 이 조건은 유효합니다.
-    if turn_number < 1:
-        logger.warning(f"Analysis conditions not met (Turn: {turn_number} < 1). Skipping analysis.")
-        return []
+    return [results[agent_name] for agent_name, _, _ in comparisons]
 
-    # 2. [핵심 로직] 전체 transcript를 순회하며 전문가 에이전트들의 발언만 따로 수집합니다.
+def _collect_stance_comparisons(transcript: List[dict], jury_members: List[dict]) -> List[Tuple[str, str, str]]:
+    """
+    전체 transcript에서 전문가 에이전트들의 발언만 모아, 발언이 2개 이상인 에이전트의
+    (에이전트 이름, 뒤에서 두 번째 발언, 가장 최신 발언) 목록을 반환합니다.
+    """
+    # [핵심 로직] 전체 transcript를 순회하며 전문가 에이전트들의 발언만 따로 수집합니다.
     jury_names = {member['name'] for member in jury_members}
     statements_by_agent = {name: [] for name in jury_names}
 
@@ -166,44 +262,81 @@ async def _analyze_stance_changes(transcript: List[dict], jury_members: List[dic
         if agent_name in jury_names:
             statements_by_agent[agent_name].append(turn['message'])
 
-    # 3. 각 에이전트별로 2개 이상의 발언이 쌓였는지 확인하고 분석 작업을 생성합니다.
-    tasks = []
+    # 각 에이전트별로 2개 이상의 발언이 쌓였는지 확인하고 비교 대상을 모읍니다.
+    comparisons = []
     for agent_config in jury_members:
         agent_name = agent_config['name']
         agent_statements = statements_by_agent[agent_name]
 
         # 해당 에이전트의 발언이 2개 이상일 경우에만 분석 목록에 추가합니다.
         if len(agent_statements) >= 2:
-            prev_statement = agent_statements[-2]   # 뒤에서 두 번째 발언
-            current_statement = agent_statements[-1] # 가장 최신 발언
-
-            task = _get_single_stance_change(
-                agent_name,
-                prev_statement,
-                current_statement,
-                discussion_id,
-                turn_number
-            )
-            tasks.append(task)
+            # (에이전트 이름, 뒤에서 두 번째 발언, 가장 최신 발언)
+            comparisons.append((agent_name, agent_statements[-2], agent_statements[-1]))
         else:
             logger.info(f"--- [Stance Analysis] Agent '{agent_name}' has only {len(agent_statements)} statement(s), not enough for comparison yet.")
+    return comparisons
+
+# 모든 참여자의 입장 변화를 병렬로 분석하는 메인 함수
+async def _analyze_stance_changes(
+    transcript: List[dict], jury_members: List[dict], discussion_id: str, turn_number: int, analysis_model: Optional[str] = None
+) -> List[dict]:
+    """
+    [고도화 버전] 전체 토론 기록을 바탕으로 각 에이전트의 최신 발언 2개를 정확히 찾아
+    입장 변화를 안정적으로 분석합니다.
+    """
+    logger.info(f"--- [Stance Analysis] Robust analysis started for Turn: {turn_number} ---")
+
+    # 1. 토론이 최소 1라운드는 진행되어야 비교가 가능하므로 이 조건은 유효합니다.
+    if turn_number < 1:
+        logger.warning(f"Analysis conditions not met (Turn: {turn_number} < 1). Skipping analysis.")
+        return []
+
+    # 2. 에이전트별 (이전 발언, 현재 발언) 비교 대상을 모읍니다.
+    comparisons = _collect_stance_comparisons(transcript, jury_members)
 
-    if not tasks:
+    if not comparisons:
         logger.warning("No agents have enough statements for stance change analysis in this round.")
         return []
 
-    # 4. 생성된 분석 작업들을 병렬로 실행하고 결과를 반환합니다.
-    results = await asyncio.gather(*tasks)
+    results = await _analyze_stance_comparisons(comparisons, discussion_id, turn_number, analysis_model=analysis_model)
     logger.info(f"--- [Stance Analysis] Analysis complete. Returning {len(results)} results. ---")
 
     return results
 
+async def _analyze_stance_comparisons(
+    comparisons: List[Tuple[str, str, str]], discussion_id: str, turn_number: int,
+    analyst_setting: Optional[AgentSettings] = None, analysis_model: Optional[str] = None
+) -> List[dict]:
+    """(에이전트 이름, 이전 발언, 현재 발언) 목록의 입장 변화를 분석합니다."""
+    if analyst_setting is None:
+        analyst_setting = await AgentSettings.find_one(
+            AgentSettings.name == "Stance Analyst", AgentSettings.status == "active"
+        )
+    analyst_setting = _with_model(analyst_setting, analysis_model)
+    if not analyst_setting:
+        return [{"agent_name": agent_name, "change": "분석 불가", "icon": "❓"} for agent_name, _, _ in comparisons]
+
+    # 패널을 STANCE_ANALYSIS_BATCH_SIZE명씩 나누어 묶음마다 한 번의 호출로 분석합니다. (0이면 에이전트별 호출)
+    batch_size = settings.STANCE_ANALYSIS_BATCH_SIZE
+    if batch_size > 0:
+        chunks = [comparisons[i:i + batch_size] for i in range(0, len(comparisons), batch_size)]
+        chunk_results = await asyncio.gather(*[
+            _get_batch_stance_changes(chunk, analyst_setting, discussion_id, turn_number) for chunk in chunks
+        ])
+        results = [result for chunk_result in chunk_results for result in chunk_result]
+    else:
+        results = await asyncio.gather(*[
+            _get_single_stance_change(agent_name, prev_statement, current_statement, discussion_id, turn_number, analyst_setting)
+            for agent_name, prev_statement, current_statement in comparisons
+        ])
+    return results
+
 # 라운드 요약 분석을 위한 Pydantic 모델
 class CriticalUtterance(BaseModel):
     agent_name: str
     message: str
 
-async def _get_round_summary(transcript_str: str, discussion_id: str, turn_number: int) -> dict:
+async def _get_round_summary(transcript_str: str, discussion_id: str, turn_number: int, analysis_model: Optional[str] = None) -> dict:
     """라운드 대화록을 분석하여 결정적 발언을 선정하는 AI 에이전트를 호출합니다."""
     try:
         # DB에서 Round Analyst 에이전트 설정을 가져옵니다.
@@ -211,8 +344,9 @@ async def _get_round_summary(transcript_str: str, discussion_id: str, turn_numbe
             AgentSettings.name == "Round Analyst", AgentSettings.status == "active"
         )
         if not analyst_setting: return None
+        analyst_setting = _with_model(analyst_setting, analysis_model)
 
-        analyst_agent = ChatGoogleGenerativeAI(model=analyst_setting.config.model)
+        analyst_agent = get_chat_model(model=analyst_setting.config.model)
         structured_llm = analyst_agent.with_structured_output(CriticalUtterance)
         
         prompt = ChatPromptTemplate.from_messages([
@@ -230,17 +364,90 @@ async def _get_round_summary(transcript_str: str, discussion_id: str, turn_numbe
         logger.error(f"Error getting round summary: {e}")
         return None
 
+def _build_history_context(discussion_log: DiscussionLog, compaction: str) -> str:
+    """
+    배심원에게 전달할 토론 기록을 실행 프로필의 압축 수준에 맞게 만듭니다.
+    - full: 전체 기록
+    - summarized: 직전 라운드(와 이번 라운드 안내)만 원문, 그 이전 라운드는 라운드별 결정적 발언으로 요약
+    - minimal: 직전 라운드(와 이번 라운드 안내)만 원문
+    """
+    transcript = discussion_log.transcript
+    separator_indexes = [i for i, t in enumerate(transcript) if t.get('agent_name') == "구분선"]
+    if compaction == "full" or len(separator_indexes) < 2:
+        return "\n\n".join([f"{t['agent_name']}: {t['message']}" for t in transcript])
+
+    recent_str = "\n\n".join([f"{t['agent_name']}: {t['message']}" for t in transcript[separator_indexes[-2] + 1:]])
+    if compaction == "minimal":
+        return recent_str
+
+    # 직전 라운드를 제외한 이전 라운드들의 결정적 발언
+    earlier_rounds = len(separator_indexes) - 1
+    summary_lines = []
+    for summary in (discussion_log.round_summaries or [])[:earlier_rounds]:
+        utterance = summary.get('critical_utterance')
+        if not utterance:
+            continue
+        round_name = "모두 변론" if summary.get('turn_number') == 0 else f"{summary.get('turn_number')}차 토론"
+        summary_lines.append(f"- {round_name} 결정적 발언 ({utterance.get('agent_name')}): {utterance.get('message')}")
+    if not summary_lines:
+        return recent_str
+    return "[이전 라운드 요약]\n" + "\n".join(summary_lines) + "\n\n[직전 라운드]\n" + recent_str
+
+def _build_shared_juror_context(topic: str, history: str, special_directive: str) -> str:
+    """
+    이번 라운드의 모든 배심원에게 동일한 컨텍스트(주제, 토론 내용, 특별 지시문)를 만듭니다.
+    프롬프트의 맨 앞(고정 접두부)에 두어 공급자 측 프롬프트 캐시가 배심원 간에 재사용되도록 합니다.
+    """
+    return (
+        f"당신은 다음 토론에 참여하는 AI 에이전트입니다. 주어진 참고 자료와 토론 내용을 바탕으로 당신의 임무를 수행하세요.\n\n"
+        f"### 전체 토론 주제: {topic}\n\n"
+        f"### 지금까지의 토론 내용:\n{history if history else '아직 토론 내용이 없습니다.'}\n\n"
+        f"{special_directive}\n"
+    )
+
+def _build_juror_system_message(model_name: str, shared_context: str, juror_evidence: str, juror_prompt: str) -> SystemMessage:
+    """
+    [공유 컨텍스트] + [배심원별 참고 자료 + 역할 프롬프트] 순서의 시스템 메시지를 만듭니다.
+    - Claude: 공유 컨텍스트 블록에 cache_control을 지정하여 명시적으로 캐시합니다.
+    - Gemini(암시적 캐싱), OpenAI(자동 접두부 캐싱): 동일한 접두부만으로 캐시가 적용됩니다.
+    """
+    juror_part = f"{juror_evidence}\n{juror_prompt}"
+    if model_name.startswith("claude"):
+        return SystemMessage(content=[
+            {"type": "text", "text": shared_context, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": juror_part},
+        ])
+    return SystemMessage(content=f"{shared_context}\n{juror_part}")
+
 async def _run_single_agent_turn(
     agent_config: dict,
-    topic: str,
-    history: str,
-    evidence: str,
-    special_directive: str,
+    shared_context: str,
+    juror_evidence: str,
     discussion_id: str,
-    turn_count: int
+    turn_count: int,
+    tool_budget: Optional[int] = None
 ) -> str:
-    """단일 에이전트의 발언(turn)을 생성합니다. 모든 에이전트는 필요 시 웹 검색 도구를 사용할 수 있습니다."""
+    """
+    단일 에이전트의 발언(turn)을 생성합니다. 에이전트 설정에 명시된 도구만 사용할 수 있습니다.
+    tool_budget은 이번 발언에서 호출할 수 있는 도구 횟수입니다. (None이면 제한 없음, 0이면 도구 없이 발언)
+    """
     agent_name = agent_config.get("name", "Unknown Agent")
+    model_name = agent_config.get("model", "gemini-2.5-flash")
+    # 에이전트 이름은 Jury Selector가 동적으로 만들므로 지표 라벨이 아닌 span 속성으로만 기록합니다.
+    with start_span("juror.run", discussion_id=discussion_id, turn_number=turn_count, agent_name=agent_name, model=model_name), \
+            observe_duration(AGENT_TURN_SECONDS, model=model_name):
+        return await _generate_agent_message(agent_config, agent_name, shared_context, juror_evidence, discussion_id, turn_count, tool_budget)
+
+async def _generate_agent_message(
+    agent_config: dict,
+    agent_name: str,
+    shared_context: str,
+    juror_evidence: str,
+    discussion_id: str,
+    turn_count: int,
+    tool_budget: Optional[int] = None
+) -> str:
+    """_run_single_agent_turn의 본문. 발언 생성 시간은 호출부에서 지표로 기록됩니다."""
     logger.info(f"--- [Flow] Running turn for agent: {agent_name} (Discussion: {discussion_id}, Turn: {turn_count}) ---")
 
     try:
@@ -258,36 +465,40 @@ async def _run_single_agent_turn(
             if turn_count == 0 else
             f"지금은 '{turn_count + 1}차 토론' 시간입니다. 이전의 에이전트들의 의견을 고려하여 다른 에이전트의 주장을 반박하거나 다른 에이전트의 의견에 적극 동조하거나 아니면 다른 에이전트의 의견을 수렴하여 의견을 수정한 당신의 의견을 주장합니다. 다른 에이전트의 논리적 모순이나 사실에 위배되는 주장이 있다고 생각한다면 적극적으로 반박하십시요. 다른 에이전트가 생각하지 못하는 새로운 아이디어, 독창적인 주장, 그리고 토론의 주제를 심화할 수 있다고 생각되는 내용을 적극적으로 주장합니다. 또한, 이전 토론 차수에서 주장한 내용을 바탕으로 자신의 주장중에 보다 구체적인 대안, 구체적인 방안등으로 자신의 주장을 심화 발전하는 것이 중요합니다. 토론의 차수가 높아질수록 이전 자신의 주장을 동어반복하기 보단 보다 구체적인 대안을 주장합니다. 주장은 최소 100자 최대 300자 이내로 추가해주세요."
         )
+        # 배심원별로 달라지는 부분(역할 프롬프트)은 공유 컨텍스트 뒤에, 임무 지시는 human 메시지에 둡니다.
+        final_human_prompt = f"### 당신의 임무\n{human_instruction}"
 
-        final_human_prompt = (
-            f"당신은 다음 토론에 참여하는 AI 에이전트입니다. 주어진 참고 자료와 토론 내용을 바탕으로 당신의 임무를 수행하세요.\n\n"
-            f"### 전체 토론 주제: {topic}\n\n"
-            f"### 참고 자료 (초기 분석 정보)\n{evidence}\n"
-            f"### 지금까지의 토론 내용:\n{history if history else '아직 토론 내용이 없습니다.'}\n\n"
-            f"{special_directive}\n"
-            f"### 당신의 임무\n{human_instruction}"
-        )
-
-        logger.info(f"--- [Flow] Agent '{agent_name}' will now decide on tool usage autonomously. ---")
-        
         original_system_prompt = agent_config.get("prompt", "You are a helpful assistant.")
-        tool_system_prompt = SYSTEM_TOOL_INSTRUCTION_BLOCK + "\n\n" + original_system_prompt
-
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", tool_system_prompt),
-            ("human", "{input}"),
-            MessagesPlaceholder(variable_name="agent_scratchpad"),
-        ])
-        
-        tools = [web_search_tool]
-        agent = create_tool_calling_agent(llm, tools, prompt)
-        agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
-        
-        response = await agent_executor.ainvoke(
-            {"input": final_human_prompt},
-            config={"tags": [f"discussion_id:{discussion_id}", f"agent_name:{agent_name}", f"turn:{turn_count}"]}
-        )
-        output = response.get("output", "오류: 응답을 생성하지 못했습니다.")
+        run_config = {"tags": [f"discussion_id:{discussion_id}", f"agent_name:{agent_name}", f"turn:{turn_count}"]}
+
+        # 기본 도구(web_search)와 에이전트 설정(AgentConfig.tools)의 도구를, 실행 프로필의 도구 사용 한도 안에서 제공합니다.
+        tool_names = list(dict.fromkeys([*DEFAULT_JUROR_TOOLS, *(agent_config.get("tools") or [])]))
+        tools = get_tools(tool_names, max_calls=tool_budget) if tool_budget != 0 else []
+
+        if tools:
+            logger.info(f"--- [Flow] Agent '{agent_name}' will now decide on tool usage autonomously. (tools: {[tool.name for tool in tools]}) ---")
+            # 웹 검색 사용 규칙은 web_search 도구가 있을 때만 프롬프트에 포함합니다.
+            juror_prompt = (
+                SYSTEM_TOOL_INSTRUCTION_BLOCK + "\n\n" + original_system_prompt
+                if any(tool.name == "web_search" for tool in tools) else original_system_prompt
+            )
+            prompt = ChatPromptTemplate.from_messages([
+                _build_juror_system_message(model_name, shared_context, juror_evidence, juror_prompt),
+                ("human", "{input}"),
+                MessagesPlaceholder(variable_name="agent_scratchpad"),
+            ])
+            agent = create_tool_calling_agent(llm, tools, prompt)
+            agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+
+            response = await agent_executor.ainvoke({"input": final_human_prompt}, config=run_config)
+            output = response.get("output", "오류: 응답을 생성하지 못했습니다.")
+        else:
+            # 도구가 없는 에이전트는 AgentExecutor 없이 단일 LLM 호출로 발언을 생성합니다.
+            prompt = ChatPromptTemplate.from_messages([
+                _build_juror_system_message(model_name, shared_context, juror_evidence, original_system_prompt),
+                ("human", "{input}"),
+            ])
+            output = await (prompt | llm).ainvoke({"input": final_human_prompt}, config=run_config)
         
         # 1. LangChain 응답이 AIMessage 같은 객체일 경우, .content 속성을 먼저 추출합니다.
         if isinstance(output, BaseMessage):
@@ -310,8 +521,35 @@ async def _run_single_agent_turn(
         logger.error(f"--- [Flow Error] Agent '{agent_name}' turn failed: {e} ---", exc_info=True)
         return f"({agent_name} 발언 생성 중 오류 발생)"
     
+def _prioritize_interactions(interactions_list: List[dict]) -> List[dict]:
+    """같은 (from, to) 관계가 여러 번 나오면 하나만 남깁니다. ('disagreement'를 'agreement'보다 우선)"""
+    # --- 중복된 상호작용을 제거하는 로직 추가 ---
+    # (from, to)를 키로 사용하는 딕셔너리를 사용하여 관계를 관리합니다.
+    prioritized_interactions = {}
+
+    for interaction in interactions_list:
+        # (from, to) 쌍을 고유 키로 사용합니다.
+        interaction_key = (interaction['from'], interaction['to'])
+        
+        # 1. 이 관계가 처음 발견된 경우, 사전에 추가합니다.
+        if interaction_key not in prioritized_interactions:
+            prioritized_interactions[interaction_key] = interaction
+        else:
+            # 2. 이미 관계가 존재할 경우, 우선순위 규칙을 적용합니다.
+            existing_type = prioritized_interactions[interaction_key]['type']
+            new_type = interaction['type']
+            
+            # 기존 관계가 'agreement'이고 새로운 관계가 'disagreement'일 때만 교체합니다.
+            if existing_type == 'agreement' and new_type == 'disagreement':
+                prioritized_interactions[interaction_key] = interaction
+
+    # 최종적으로 필터링된 상호작용 목록을 딕셔너리의 값들로 생성합니다.
+    return list(prioritized_interactions.values())
+
 # 토론 흐름도 분석을 위한 헬퍼 함수
-async def _analyze_flow_data(transcript: List[dict], jury_members: List[dict], discussion_id: str, turn_number: int) -> dict:
+async def _analyze_flow_data(
+    transcript: List[dict], jury_members: List[dict], discussion_id: str, turn_number: int, analysis_model: Optional[str] = None
+) -> dict:
     """
     LLM 기반 'Interaction Analyst'를 사용하여 토론의 상호작용을 분석합니다.
     """
@@ -330,9 +568,10 @@ async def _analyze_flow_data(transcript: List[dict], jury_members: List[dict], d
         if not analyst_setting:
             logger.error("!!! [Flow Analysis] 'Interaction Analyst' 에이전트를 DB에서 찾을 수 없습니다.")
             return {"interactions": []}
+        analyst_setting = _with_model(analyst_setting, analysis_model)
 
         # 3. LLM 및 체인 구성
-        llm = ChatGoogleGenerativeAI(model=analyst_setting.config.model, temperature=analyst_setting.config.temperature)
+        llm = get_chat_model(model=analyst_setting.config.model, temperature=analyst_setting.config.temperature)
         structured_llm = llm.with_structured_output(InteractionAnalysisResult)
         
         prompt = ChatPromptTemplate.from_messages([
@@ -358,28 +597,7 @@ async def _analyze_flow_data(transcript: List[dict], jury_members: List[dict], d
             for interaction in analysis_result.interactions
         ]
 
-        # --- 중복된 상호작용을 제거하는 로직 추가 ---
-        # (from, to)를 키로 사용하는 딕셔너리를 사용하여 관계를 관리합니다.
-        prioritized_interactions = {}
-
-        for interaction in interactions_list:
-            # (from, to) 쌍을 고유 키로 사용합니다.
-            interaction_key = (interaction['from'], interaction['to'])
-            
-            # 1. 이 관계가 처음 발견된 경우, 사전에 추가합니다.
-            if interaction_key not in prioritized_interactions:
-                prioritized_interactions[interaction_key] = interaction
-            else:
-                # 2. 이미 관계가 존재할 경우, 우선순위 규칙을 적용합니다.
-                existing_type = prioritized_interactions[interaction_key]['type']
-                new_type = interaction['type']
-                
-                # 기존 관계가 'agreement'이고 새로운 관계가 'disagreement'일 때만 교체합니다.
-                if existing_type == 'agreement' and new_type == 'disagreement':
-                    prioritized_interactions[interaction_key] = interaction
-
-        # 최종적으로 필터링된 상호작용 목록을 딕셔너리의 값들로 생성합니다.
-        final_interactions = list(prioritized_interactions.values())
+        final_interactions = _prioritize_interactions(interactions_list)
         
         logger.info(f"--- [Flow Analysis] Analysis complete. Found {len(interactions_list)} interactions, returning {len(final_interactions)} prioritized interactions. ---")
         return {"interactions": final_interactions} # 우선순위가 적용된 최종 리스트를 반환
@@ -389,7 +607,9 @@ async def _analyze_flow_data(transcript: List[dict], jury_members: List[dict], d
         return {"interactions": []}
 
 # 투표 생성을 위한 별도의 헬퍼 함수
-async def _generate_vote_options(transcript_str: str, discussion_id: str, turn_number: int, vote_history: List[str], topic: str) -> Optional[dict]:
+async def _generate_vote_options(
+    transcript_str: str, discussion_id: str, turn_number: int, vote_history: List[str], topic: str, analysis_model: Optional[str] = None
+) -> Optional[dict]:
     """
     대화록과 토론 주제를 분석하여 새로운 투표 주제와 선택지를 생성합니다.
     - TypeError 방지를 위해 topic 인자를 받습니다.
@@ -407,6 +627,7 @@ async def _generate_vote_options(transcript_str: str, discussion_id: str, turn_n
         if not vote_caster_setting:
             logger.error("!!! [Vote Generation] 'Vote Caster' 에이전트를 DB에서 찾을 수 없습니다.")
             return None
+        vote_caster_setting = _with_model(vote_caster_setting, analysis_model)
 
         # 이전 투표 기록 섹션 생성
         history_prompt_section = "아직 사용자의 이전 투표 기록이 없습니다."
@@ -428,7 +649,7 @@ async def _generate_vote_options(transcript_str: str, discussion_id: str, turn_n
         )
 
         # LLM 호출
-        vote_caster_agent = ChatGoogleGenerativeAI(
+        vote_caster_agent = get_chat_model(
             model=vote_caster_setting.config.model,
             temperature=vote_caster_setting.config.temperature,
             model_kwargs={"response_mime_type": "application/json"}
@@ -471,14 +692,344 @@ async def _generate_vote_options(transcript_str: str, discussion_id: str, turn_n
     except Exception as e:
         logger.error(f"!!! [Vote Generation] 투표 생성 중 알 수 없는 오류 발생: {e}", exc_info=True)
         return None
-    
-async def execute_turn(discussion_log: DiscussionLog, user_vote: Optional[str] = None, model_overrides: Optional[Dict[str, str]] = None):
+
+# 통합 라운드 분석(ROUND_ANALYSIS_MODE="composite")의 항목
+# 결과 키: (응답 JSON 키, 분석 에이전트, 출력 형식 안내)
+COMPOSITE_SECTIONS = {
+    "round_summary": (
+        "critical_utterance", "Round Analyst",
+        '{"agent_name": str, "message": str}  (the single most decisive utterance of THIS round)'
+    ),
+    "flow_data": (
+        "interactions", "Interaction Analyst",
+        '[{"from": str, "to": str, "type": "agreement" | "disagreement"}, ...]  (interactions in THIS round)'
+    ),
+    "stance_changes": (
+        "stance_changes", "Stance Analyst",
+        '[{"agent_name": str, "change": "유지" | "강화" | "수정" | "약화", "reason": str}, ...]  (one item per agent listed for stance analysis)'
+    ),
+    "current_vote": (
+        "vote", "Vote Caster",
+        '{"topic": str, "options": [str, ...]}  (the next vote with 2-4 options)'
+    ),
+}
+
+async def _analyze_round_composite(
+    discussion_log: DiscussionLog,
+    jury_members: List[dict],
+    round_transcript_str: str,
+    full_history_str: str,
+    vote_history: List[str],
+    analyses: List[str],
+    analysis_model: Optional[str] = None
+) -> dict:
+    """
+    결정적 발언, 상호작용, 입장 변화, 다음 투표를 한 번의 구조화된 호출로 생성합니다.
+    응답은 항목별로 따로 검증하며, 검증에 실패한 항목만 기존의 개별 분석 함수로 다시 생성합니다.
+    analyses에 없는 분석 항목은 요청하지 않습니다. (투표는 항상 생성)
+    반환값의 키: round_summary, stance_changes, flow_data, current_vote
+    """
+    discussion_id = discussion_log.discussion_id
+    turn_number = discussion_log.turn_number
+    sections = {key: spec for key, spec in COMPOSITE_SECTIONS.items() if key == "current_vote" or key in analyses}
+    comparisons = (
+        _collect_stance_comparisons(discussion_log.transcript, jury_members)
+        if "stance_changes" in sections and turn_number >= 1 else []
+    )
+
+    analyst_settings = {
+        setting.name: _with_model(setting, analysis_model)
+        for setting in await AgentSettings.find(
+            In(AgentSettings.name, [name for _, name, _ in sections.values()]), AgentSettings.status == "active"
+        ).to_list()
+    }
+
+    # 1. 통합 호출: 각 분석 에이전트의 프롬프트를 작업별로 이어 붙이고, 하나의 JSON 응답을 요청합니다.
+    #    모델은 첫 번째 항목(보통 Round Analyst)의 에이전트 설정을 사용합니다.
+    parsed: dict = {}
+    raw_response = ""
+    base_setting = next((analyst_settings[name] for _, name, _ in sections.values() if name in analyst_settings), None)
+    if base_setting:
+        task_sections = "\n\n".join(
+            f"## Task: {json_key}\n{analyst_settings[name].config.prompt}"
+            for json_key, name, _ in sections.values() if name in analyst_settings
+        )
+        output_guide = (
+            "---\n### Output Format (VERY IMPORTANT)\n"
+            "Perform ALL of the tasks above in a single response and return ONLY one JSON object with these keys:\n"
+            + "\n".join(f'- "{json_key}": {guide}' for json_key, _, guide in sections.values())
+            + "\n---"
+        )
+        stance_targets = "\n\n".join(
+            f"에이전트 이름: {agent_name}\n이전 발언: \"{prev_statement}\"\n현재 발언: \"{current_statement}\""
+            for agent_name, prev_statement, current_statement in comparisons
+        ) or "입장 변화를 분석할 에이전트가 없습니다."
+        history_items = "\n".join(f"- '{item}'" for item in vote_history) or "아직 사용자의 이전 투표 기록이 없습니다."
+
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", "{task_sections}\n\n{output_guide}"),
+            ("human",
+             "### Key Terms (Use these exact Korean spellings):\n- '{topic}'\n\n"
+             "### 이전 투표에서 사용자가 선택한 항목들:\n{history_items}\n\n"
+             "### 현재 라운드까지의 전체 토론 대화록:\n{full_history}\n\n"
+             "### 이번 라운드 발언 (결정적 발언과 상호작용 분석 대상):\n{round_transcript}\n\n"
+             "### 입장 변화 분석 대상:\n{stance_targets}")
+        ])
+        llm = get_chat_model(
+            model=base_setting.config.model,
+            temperature=base_setting.config.temperature,
+            model_kwargs={"response_mime_type": "application/json"}
+        )
+        try:
+            response = await (prompt | llm).ainvoke(
+                {
+                    "task_sections": task_sections,
+                    "output_guide": output_guide,
+                    "topic": discussion_log.topic,
+                    "history_items": history_items,
+                    "full_history": full_history_str,
+                    "round_transcript": round_transcript_str,
+                    "stance_targets": stance_targets,
+                },
+                config={"tags": [f"discussion_id:{discussion_id}", f"turn:{turn_number}", "task:composite_analysis"]}
+            )
+            raw_response = response.content if isinstance(response.content, str) else str(response.content)
+            match = re.search(r"```(json)?\s*({.*?})\s*```", raw_response, re.DOTALL)
+            parsed = json.loads(match.group(2) if match else raw_response)
+            if not isinstance(parsed, dict):
+                raise ValueError("응답이 JSON 객체가 아닙니다.")
+        except Exception as e:
+            logger.error(f"!!! [Composite Analysis] 통합 분석 호출/파싱 실패, 모든 항목을 개별 분석합니다. 에러: {e}\n원본 응답: {raw_response}", exc_info=True)
+            parsed = {}
+    else:
+        logger.warning("--- [Composite Analysis] 활성화된 분석 에이전트가 없어 항목별 분석으로 진행합니다. ---")
+
+    # 2. 항목별 검증. 실패한 항목은 retries에 개별 분석 작업으로 등록합니다.
+    results: dict = {"round_summary": None, "flow_data": None}
+    retries: dict = {}
+
+    if "round_summary" in sections:
+        try:
+            results["round_summary"] = CriticalUtterance.model_validate(parsed["critical_utterance"]).model_dump()
+        except (KeyError, TypeError, ValidationError) as e:
+            logger.warning(f"--- [Composite Analysis] critical_utterance 검증 실패: {e!r} ---")
+            retries["round_summary"] = _get_round_summary(round_transcript_str, discussion_id, turn_number, analysis_model)
+
+    if "flow_data" in sections:
+        try:
+            interactions = InteractionAnalysisResult.model_validate({"interactions": parsed["interactions"]}).interactions
+            results["flow_data"] = {"interactions": _prioritize_interactions([
+                {"from": interaction.from_agent, "to": interaction.to_agent, "type": interaction.interaction_type}
+                for interaction in interactions
+            ])}
+        except (KeyError, TypeError, ValidationError) as e:
+            logger.warning(f"--- [Composite Analysis] interactions 검증 실패: {e!r} ---")
+            retries["flow_data"] = _analyze_flow_data(discussion_log.transcript, jury_members, discussion_id, turn_number, analysis_model)
+
+    # 입장 변화는 에이전트 단위로 검증하여, 빠졌거나 잘못된 에이전트만 다시 분석합니다.
+    stance_results: Dict[str, dict] = {}
+    if comparisons and "Stance Analyst" in analyst_settings:
+        expected_names = {agent_name for agent_name, _, _ in comparisons}
+        stance_items = parsed.get("stance_changes")
+        for item in stance_items if isinstance(stance_items, list) else []:
+            try:
+                analysis = AgentStanceAnalysis.model_validate(item)
+            except ValidationError:
+                continue
+            if analysis.agent_name in expected_names and analysis.agent_name not in stance_results:
+                stance_results[analysis.agent_name] = {
+                    "agent_name": analysis.agent_name,
+                    "change": analysis.change,
+                    "icon": STANCE_ICON_MAP.get(analysis.change, "❓")
+                }
+    missing_stances = [comparison for comparison in comparisons if comparison[0] not in stance_results]
+    if missing_stances:
+        logger.warning(f"--- [Composite Analysis] stance_changes {len(missing_stances)}명 누락/검증 실패 ---")
+        retries["stance_changes"] = _analyze_stance_comparisons(
+            missing_stances, discussion_id, turn_number, analyst_settings.get("Stance Analyst"), analysis_model
+        )
+
+    try:
+        results["current_vote"] = VoteContent.model_validate(parsed["vote"]).model_dump()
+    except (KeyError, TypeError, ValidationError) as e:
+        logger.warning(f"--- [Composite Analysis] vote 검증 실패: {e!r} ---")
+        retries["current_vote"] = _generate_vote_options(
+            full_history_str, discussion_id, turn_number, vote_history, discussion_log.topic, analysis_model
+        )
+
+    # 3. 실패한 항목만 동시에 재시도합니다.
+    if retries:
+        logger.info(f"--- [Composite Analysis] 개별 분석으로 재시도하는 항목: {list(retries.keys())} ---")
+        retry_results = await asyncio.gather(*[
+            traced(f"analysis.{name}", task, discussion_id=discussion_id, turn_number=turn_number)
+            for name, task in retries.items()
+        ])
+        results.update(zip(retries.keys(), retry_results))
+
+    for result in results.pop("stance_changes", None) or []:
+        stance_results[result["agent_name"]] = result
+    results["stance_changes"] = (
+        [stance_results[agent_name] for agent_name, _, _ in comparisons if agent_name in stance_results]
+        if "stance_changes" in sections else None
+    )
+
+    logger.info(f"--- [Composite Analysis] Turn {turn_number} 분석 완료 (재시도 항목 {len(retries)}개) ---")
+    return results
+
+# --- 라운드별 분석(상호작용/입장 변화)의 지연 계산 ---
+# 실행 프로필의 analytics_mode가 lazy이면 턴 종료 시 계산하지 않고,
+# GET /discussions/{id}/rounds/{n}/analytics 최초 조회 시 계산하여 round_summaries[n]에 저장합니다.
+ROUND_ANALYTICS = ("stance_changes", "flow_data")
+# 라운드 요약에 계산을 마친 분석 이름을 기록하는 필드.
+# 분석 결과가 빈 목록이거나 실패(None)여도 다시 계산하지 않도록, 값이 아닌 이 목록으로 계산 여부를 판단합니다.
+ANALYTICS_COMPUTED_FIELD = "analytics_computed"
+
+# 이 워커에서 진행 중인 라운드 분석 계산 (같은 라운드에 대한 동시 조회는 한 번만 계산합니다)
+_analytics_tasks: Dict[Tuple[str, int], asyncio.Task] = {}
+
+def _split_rounds(transcript: List[dict]) -> List[List[dict]]:
+    """transcript를 '구분선' 기준으로 완료된 라운드별로 나눕니다. (i번째 항목이 turn_number i 라운드)"""
+    rounds, current = [], []
+    for entry in transcript:
+        if entry.get('agent_name') == "구분선":
+            rounds.append(current)
+            current = []
+        else:
+            current.append(entry)
+    return rounds
+
+async def _compute_round_analytics(
+    discussion_log: DiscussionLog, turn_number: int, summary_index: int, rounds: List[List[dict]], names: List[str]
+) -> dict:
+    """라운드 분석 중 names에 해당하는 항목을 계산하여 DB(round_summaries)에 저장하고 반환합니다."""
+    discussion_id = discussion_log.discussion_id
+    analysis_model = get_discussion_profile(discussion_log).models.get("analysis")
+    jury_members = [p for p in discussion_log.participants if p.get('name') not in ["재판관", "사회자"]]
+    jury_names = {member['name'] for member in jury_members}
+
+    tasks = {}
+    if "stance_changes" in names:
+        # 라운드 n까지의 기록에서 에이전트별 마지막 두 발언(라운드 n-1, n)을 비교합니다.
+        transcript_until_round = [entry for round_entries in rounds[:turn_number + 1] for entry in round_entries]
+        tasks["stance_changes"] = _analyze_stance_changes(transcript_until_round, jury_members, discussion_id, turn_number, analysis_model)
+    if "flow_data" in names:
+        round_statements = [entry for entry in rounds[turn_number] if entry.get('agent_name') in jury_names]
+        tasks["flow_data"] = _analyze_flow_data(round_statements, jury_members, discussion_id, turn_number, analysis_model)
+
+    with start_span("analysis.round_analytics", discussion_id=discussion_id, turn_number=turn_number, analyses=",".join(names)):
+        results = dict(zip(tasks.keys(), await asyncio.gather(*tasks.values())))
+
+    fields = {f"round_summaries.{summary_index}.{name}": value for name, value in results.items()}
+    # 가장 최근 라운드의 상호작용은 기존 flow_data 필드에도 반영합니다.
+    if "flow_data" in results and summary_index == len(discussion_log.round_summaries) - 1:
+        fields["flow_data"] = results["flow_data"]
+    await DiscussionLog.get_motor_collection().update_one(
+        {"discussion_id": discussion_id, f"round_summaries.{summary_index}.turn_number": turn_number},
+        {
+            "$set": fields,
+            "$addToSet": {f"round_summaries.{summary_index}.{ANALYTICS_COMPUTED_FIELD}": {"$each": list(results)}}
+        }
+    )
+    logger.info(f"--- [Round Analytics] {discussion_id} 라운드 {turn_number} 분석 계산 및 저장 완료: {names} ---")
+    return results
+
+async def get_round_analytics(discussion_log: DiscussionLog, turn_number: int) -> Optional[dict]:
+    """
+    라운드(turn_number)의 결정적 발언, 입장 변화, 상호작용 분석을 반환합니다.
+    저장된 결과가 있으면 그대로 반환하고, 없는 항목만 지금 계산하여 저장합니다.
+    완료되지 않은 라운드이면 None을 반환합니다.
+    """
+    summaries = discussion_log.round_summaries or []
+    summary_index = next((i for i, summary in enumerate(summaries) if summary.get("turn_number") == turn_number), None)
+    rounds = _split_rounds(discussion_log.transcript)
+    if summary_index is None or turn_number >= len(rounds):
+        return None
+
+    summary = summaries[summary_index]
+    profile = get_discussion_profile(discussion_log)
+    # 계산 여부 기록이 없는 이전 라운드는 값이 있는지로 판단합니다.
+    computed_names = set(
+        summary[ANALYTICS_COMPUTED_FIELD] if ANALYTICS_COMPUTED_FIELD in summary
+        else [name for name in ROUND_ANALYTICS if summary.get(name) is not None]
+    )
+    missing = [name for name in ROUND_ANALYTICS if name in profile.analyses and name not in computed_names]
+    computed = False
+    if missing:
+        key = (discussion_log.discussion_id, turn_number)
+        task = _analytics_tasks.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(
+                _compute_round_analytics(discussion_log, turn_number, summary_index, rounds, missing)
+            )
+            _analytics_tasks[key] = task
+            task.add_done_callback(lambda _: _analytics_tasks.pop(key, None))
+        # 요청이 끊겨도 계산은 끝까지 진행하여 저장합니다.
+        summary = {**summary, **await asyncio.shield(task)}
+        computed = True
+
+    return {
+        "turn_number": turn_number,
+        "critical_utterance": summary.get("critical_utterance"),
+        "stance_changes": summary.get("stance_changes"),
+        "flow_data": summary.get("flow_data"),
+        "computed": computed
+    }
+
+async def execute_turn(
+    discussion_log: DiscussionLog,
+    user_vote: Optional[str] = None,
+    model_overrides: Optional[Dict[str, str]] = None,
+    lease_token: Optional[str] = None
+):
     """
     백그라운드에서 단일 토론 턴을 실행하고, 결과를 DB에 기록합니다.
     사용자의 투표 기록은 Redis를 통해 세션으로 관리합니다.
+    턴 진행 중의 transcript는 TurnStateSession(write-behind 버퍼)을 통해 Redis에 먼저 기록되고,
+    설정된 주기와 턴 완료 시점에 MongoDB로 배치 반영됩니다.
+    lease_token은 턴 승인 시 획득한 턴 lease이며, 턴이 끝나면(실패 포함) 해제합니다.
+    턴은 작업 슬롯(services/job_admission.py)을 얻은 뒤 실행되며, POST /discussions/{id}/cancel로 취소할 수 있습니다.
+    취소되더라도 이미 생성된 발언은 TurnStateSession 종료 시 MongoDB에 반영됩니다.
     """
+    try:
+        await run_background_job(
+            "turn", discussion_log.discussion_id, discussion_log.user_email,
+            _execute_turn, discussion_log, user_vote, model_overrides
+        )
+    finally:
+        await release_turn_lease(discussion_log.discussion_id, lease_token)
+
+@track_in_flight("turn")
+async def _execute_turn(discussion_log: DiscussionLog, user_vote: Optional[str], model_overrides: Optional[Dict[str, str]]):
+    """execute_turn의 본문. 작업 슬롯 대기/취소, 턴 lease 해제와 분리하기 위해 나뉘어 있습니다."""
     logger.info(f"--- [BG Task] Executing turn for Discussion ID: {discussion_log.discussion_id} ---")
 
+    # 턴 전체를 부모 span으로 두고, 하위 작업(배심원 발언, 도구, 분석, 투표 생성, DB 쓰기)을 자식 span으로 기록합니다.
+    with start_span(
+        "discussion.turn",
+        discussion_id=discussion_log.discussion_id,
+        turn_number=discussion_log.turn_number,
+        has_user_vote=bool(user_vote)
+    ):
+        async with profile_pipeline(
+            discussion_log.discussion_id,
+            "turn",
+            turn_number=discussion_log.turn_number,
+            enabled=discussion_log.profiling_enabled
+        ), TurnStateSession(discussion_log) as state:
+            await state.set_status("turn_inprogress")
+            await _execute_turn_with_state(discussion_log, state, user_vote, model_overrides)
+
+async def _execute_turn_with_state(
+    discussion_log: DiscussionLog,
+    state: TurnStateSession,
+    user_vote: Optional[str],
+    model_overrides: Optional[Dict[str, str]]
+):
+    """execute_turn의 본문. transcript 추가와 최종 저장은 state 세션을 통해 이루어집니다."""
+    # 토론 생성 시 선택한 실행 프로필 (배심원 도구 한도, 중앙 검색, 기록 압축, 라운드 분석 종류/모델)
+    profile = get_discussion_profile(discussion_log)
+    analysis_model = profile.models.get("analysis")
+
      # --- 사용자 선택 모델 적용 로직 ---
     if model_overrides:
         logger.info(f"--- [BG Task] Applying model overrides: {model_overrides} ---")
@@ -512,57 +1063,38 @@ async def execute_turn(discussion_log: DiscussionLog, user_vote: Optional[str] =
             "message": moderator_message, 
             "timestamp": datetime.utcnow()
         }
-        discussion_log.transcript.append(moderator_turn_data)
+        await state.append(moderator_turn_data)
     
-    redis_key = f"vote_history:{discussion_log.discussion_id}"
-    vote_history = []
-    try:
-        history_json = await db.redis_client.get(redis_key)
-        if history_json:
-            vote_history = json.loads(history_json)
-    except Exception as e:
-        logger.error(f"!!! [Redis Error] Redis에서 투표 기록을 가져오는 중 오류 발생: {e}", exc_info=True)
-
+    # 투표 기록은 토론 컨텍스트 API를 통해 Redis List와 DiscussionLog에 함께 기록됩니다.
     if user_vote:
-        vote_history.append(user_vote)
-        try:
-            await db.redis_client.set(redis_key, json.dumps(vote_history), ex=86400)
-            logger.info(f"--- [BG Task] 사용자 투표 '{user_vote}'를 Redis에 기록했습니다. 현재 기록: {vote_history} ---")
-        except Exception as e:
-            logger.error(f"!!! [Redis Error] Redis에 투표 기록을 저장하는 중 오류 발생: {e}", exc_info=True)
+        vote_history = await append_vote(discussion_log, user_vote)
+    else:
+        vote_history = await get_vote_history(discussion_log)
+
+    # 증거 자료 인덱스 (저장된 인덱스가 없는 토론은 자료집으로 지금 생성합니다.)
+    evidence_index = await load_evidence_index(discussion_log.discussion_id)
+    evidence_index_changed = evidence_index is None
+    if evidence_index is None:
+        evidence_index = await build_evidence_index(discussion_log.evidence_briefing)
 
     # --- 중앙 검색 로직 시작 ---
-    central_search_results_str = ""
-    # 첫 턴(모두 변론)이 아니면서 사용자 투표가 있을 때만 검색 수행
-    if discussion_log.turn_number > 0 and user_vote:
-        search_query = await _get_search_query(discussion_log, user_vote)
-        if search_query:
-            # search.py의 비동기 함수 사용
-            search_results = await perform_web_search_async(search_query)
-            if search_results:
-                formatted_results = "\n".join([
-                    f"- 출처: {res['url']}\n- 요약: {res['content']}" 
-                    for res in search_results
-                ])
-                central_search_results_str = f"--- [중앙 집중식 웹 검색 결과]\n{formatted_results}\n---"
+    # 첫 턴(모두 변론)이 아니면서 사용자 투표가 있을 때만 검색 수행 (실행 프로필에서 끌 수 있습니다.)
+    if discussion_log.turn_number > 0 and user_vote and profile.central_search:
+        # 투표 대기 중에 미리 조회해 둔 결과가 있으면 검색어 생성/웹 검색을 생략합니다.
+        await wait_for_prefetch(discussion_log.discussion_id)
+        prefetched = await pop_prefetched_search(discussion_log.discussion_id, discussion_log.turn_number, user_vote)
+        if prefetched:
+            logger.info(f"--- [BG Task] 선행 조회된 검색 결과를 사용합니다. (검색어: {prefetched['query']}) ---")
+            search_results = prefetched["results"]
+        else:
+            search_results = await _search_for_vote(discussion_log, user_vote)
+        if search_results:
+            # 검색 결과는 프롬프트에 그대로 넣지 않고 인덱스에 추가하여 배심원별 검색 대상에 포함합니다.
+            evidence_index = await add_search_results(evidence_index, search_results)
+            evidence_index_changed = True
 
     current_turn = discussion_log.turn_number
-    history_str = "\n\n".join([f"{t['agent_name']}: {t['message']}" for t in discussion_log.transcript])
-
-    # DB에 저장된 증거 자료를 불러와 프롬프트에 포함할 문자열로 만듭니다.
-    evidence_str = ""
-    if discussion_log.evidence_briefing:
-        web_evidence = "\n".join([f"- {item['summary']} (출처: {item['source']})" for item in discussion_log.evidence_briefing.get('web_evidence', [])])
-        file_evidence = "\n".join([f"- {item['summary']} (출처: {item['source']})" for item in discussion_log.evidence_briefing.get('file_evidence', [])])
-        
-        evidence_str += "--- [참고 자료: 웹 검색 결과 요약] ---\n"
-        evidence_str += web_evidence + "\n" if web_evidence else "관련 웹 검색 결과가 없습니다.\n"
-        evidence_str += "--- [참고 자료: 제출 파일 요약] ---\n"
-        evidence_str += file_evidence + "\n" if file_evidence else "제출된 파일이 없습니다.\n"
-
-    # 중앙 검색 결과를 기존 evidence_str에 추가합니다.
-    if central_search_results_str:
-        evidence_str += "\n\n" + central_search_results_str
+    history_str = _build_history_context(discussion_log, profile.history_compaction)
 
     special_directive = ""
     if user_vote:
@@ -579,53 +1111,37 @@ async def execute_turn(discussion_log: DiscussionLog, user_vote: Optional[str] =
 
     # --- 에이전트 발언을 순차 실행에서 동시 실행으로 변경 ---
 
-    # 1. 모든 에이전트의 비동기 작업을 담을 리스트를 생성합니다.
-    tasks = []
-    for agent_config in jury_members:
-        # 2. await로 즉시 실행하는 대신, 실행할 작업(코루틴)을 만들어 tasks 리스트에 추가합니다.
-        task = _run_single_agent_turn(
-            agent_config, 
-            discussion_log.topic, 
-            history_str, 
-            evidence_str,  # 증거 자료 전달
-            special_directive,
-            discussion_log.discussion_id,
-            current_turn
+    # 1. 모든 배심원이 공유하는 컨텍스트는 한 번만 만들어 프롬프트의 고정 접두부로 사용합니다.
+    shared_context = _build_shared_juror_context(discussion_log.topic, history_str, special_directive)
+
+    # 2. 배심원별로 역할 프롬프트와 이번 라운드 지시(투표 선택)에 맞는 참고 자료만 검색합니다.
+    evidence_queries = [
+        f"{agent_config.get('name', '')} {agent_config.get('prompt', '')} {user_vote or ''} {discussion_log.topic}"
+        for agent_config in jury_members
+    ]
+    juror_evidence = await retrieve_for_queries(evidence_index, evidence_queries, settings.EVIDENCE_TOP_K)
+
+    tasks = [
+        _run_single_agent_turn(
+            agent_config, shared_context, format_evidence(evidence), discussion_log.discussion_id, current_turn, profile.tool_budget
         )
-        tasks.append(task)
+        for agent_config, evidence in zip(jury_members, juror_evidence)
+    ]
 
     # 3. asyncio.gather를 사용해 모든 작업을 동시에 실행하고, 모든 결과가 도착할 때까지 기다립니다.
     logger.info(f"--- [BG Task] {len(tasks)}명의 에이전트 발언을 동시에 생성 시작... (ID: {discussion_log.discussion_id})")
     messages = await asyncio.gather(*tasks)
     logger.info(f"--- [BG Task] 모든 에이전트 발언 생성 완료. (ID: {discussion_log.discussion_id})")
 
-    # 4. 이제 모든 답변이 도착했으므로, 결과를 순서대로 transcript에 추가합니다.
+    # 4. Staff 에이전트(SNR 전문가, 정보 검증부 등)가 라운드 발언 전체를 한 번에 평가합니다.
+    staff_entries = await run_staff_pipeline(messages, discussion_log.discussion_id, current_turn, profile.analyses)
+
+    # 5. 전문가 발언과 그에 대한 Staff 평가를 순서대로 모아 transcript에 한 번에 기록합니다.
+    round_entries = []
     for i, message in enumerate(messages):
-        agent_name = jury_members[i]['name']
-        
-        # 1. 전문가의 메인 발언을 추가합니다.
-        main_turn_data = {"agent_name": agent_name, "message": message, "timestamp": datetime.utcnow()}
-        discussion_log.transcript.append(main_turn_data)
-
-        # 2. 메인 발언에 대해 Staff 에이전트들을 동기적으로 실행합니다.
-        # (asyncio.to_thread를 사용해 non-blocking 방식으로 호출)
-        snr_result = await asyncio.to_thread(run_snr_agent, message)
-        if snr_result:
-            snr_turn_data = {
-                "agent_name": "SNR 전문가", 
-                "message": json.dumps(snr_result, ensure_ascii=False), # 결과를 JSON 문자열로 저장
-                "timestamp": datetime.utcnow()
-            }
-            discussion_log.transcript.append(snr_turn_data)
-
-        verifier_result = await asyncio.to_thread(run_verifier_agent, message)
-        if verifier_result:
-            verifier_turn_data = {
-                "agent_name": "정보 검증부", 
-                "message": json.dumps(verifier_result, ensure_ascii=False), # 결과를 JSON 문자열로 저장
-                "timestamp": datetime.utcnow()
-            }
-            discussion_log.transcript.append(verifier_turn_data)
+        round_entries.append({"agent_name": jury_members[i]['name'], "message": message, "timestamp": datetime.utcnow()})
+        round_entries.extend(staff_entries[i])
+    await state.extend(round_entries)
 
     # --- 라운드 종료 구분선 추가] ---
     round_name_for_separator = "모두 변론" if discussion_log.turn_number == 0 else f"{discussion_log.turn_number}차 토론"
@@ -635,66 +1151,102 @@ async def execute_turn(discussion_log: DiscussionLog, user_vote: Optional[str] =
         "message": separator_message, 
         "timestamp": datetime.utcnow()
     }
-    discussion_log.transcript.append(separator_turn_data)
+    await state.append(separator_turn_data)
     
     logger.info(f"--- [BG Task] 라운드 {current_turn} 완료. 분석을 시작합니다... (ID: {discussion_log.discussion_id})")
     
-    # 분석에 필요한 최신 대화록 문자열 생성 (이번 라운드 발언만)
-    final_transcript_str = "\n\n".join([f"{t['agent_name']}: {t['message']}" for t in discussion_log.transcript[-len(jury_members):]])
-    
-    analysis_tasks = {
-        "round_summary": _get_round_summary(final_transcript_str, discussion_log.discussion_id, discussion_log.turn_number),
-        "stance_changes": _analyze_stance_changes(discussion_log.transcript, jury_members, discussion_log.discussion_id, discussion_log.turn_number),
-        "flow_data": _analyze_flow_data(discussion_log.transcript, jury_members, discussion_log.discussion_id, discussion_log.turn_number)
-    }
+    # 분석에 필요한 최신 대화록 문자열 생성 (이번 라운드 배심원 발언만, Staff 평가와 구분선 제외)
+    final_transcript_str = "\n\n".join([f"{agent_config['name']}: {message}" for agent_config, message in zip(jury_members, messages)])
     
-    analysis_results = await asyncio.gather(*analysis_tasks.values())
-    analysis_map = dict(zip(analysis_tasks.keys(), analysis_results))
+    full_history_str = "\n\n".join([f"{t['agent_name']}: {t['message']}" for t in discussion_log.transcript])
+
+    # analytics_mode가 lazy이면 상호작용/입장 변화 분석은 건너뛰고, 라운드 분석 API 최초 조회 시 계산합니다.
+    eager_analyses = [
+        analysis for analysis in profile.analyses
+        if profile.analytics_mode == "eager" or analysis not in ROUND_ANALYTICS
+    ]
+
+    if (profile.round_analysis_mode or settings.ROUND_ANALYSIS_MODE) == "composite":
+        # 결정적 발언/상호작용/입장 변화/다음 투표를 한 번의 호출로 생성합니다. (실패한 항목만 개별 재시도)
+        analysis_map = await traced(
+            "analysis.composite",
+            _analyze_round_composite(
+                discussion_log, jury_members, final_transcript_str, full_history_str, vote_history, eager_analyses, analysis_model
+            ),
+            discussion_id=discussion_log.discussion_id,
+            turn_number=discussion_log.turn_number
+        )
+        current_vote = analysis_map.get("current_vote")
+    else:
+        # 실행 프로필에서 선택한 분석만 실행합니다.
+        analysis_tasks = {}
+        if "round_summary" in eager_analyses:
+            analysis_tasks["round_summary"] = _get_round_summary(final_transcript_str, discussion_log.discussion_id, discussion_log.turn_number, analysis_model)
+        if "stance_changes" in eager_analyses:
+            analysis_tasks["stance_changes"] = _analyze_stance_changes(discussion_log.transcript, jury_members, discussion_log.discussion_id, discussion_log.turn_number, analysis_model)
+        if "flow_data" in eager_analyses:
+            analysis_tasks["flow_data"] = _analyze_flow_data(discussion_log.transcript, jury_members, discussion_log.discussion_id, discussion_log.turn_number, analysis_model)
+
+        analysis_results = await asyncio.gather(*[
+            traced(f"analysis.{name}", task, discussion_id=discussion_log.discussion_id, turn_number=discussion_log.turn_number)
+            for name, task in analysis_tasks.items()
+        ])
+        analysis_map = dict(zip(analysis_tasks.keys(), analysis_results))
+
+        # 다음 라운드를 위한 투표 생성
+        with start_span("turn.vote_generation", discussion_id=discussion_log.discussion_id, turn_number=discussion_log.turn_number):
+            current_vote = await _generate_vote_options(
+                full_history_str, 
+                discussion_log.discussion_id, 
+                discussion_log.turn_number,
+                vote_history,
+                discussion_log.topic,
+                analysis_model
+            )
 
     # 라운드 요약을 round_summaries 리스트에 추가
     current_round_summary = {
         "turn_number": discussion_log.turn_number,
         "critical_utterance": analysis_map.get("round_summary"),
-        "stance_changes": analysis_map.get("stance_changes")
+        "stance_changes": analysis_map.get("stance_changes"),
+        # 라운드별 분석 API(get_round_analytics)에서 재사용하도록 라운드마다 보관합니다.
+        "flow_data": analysis_map.get("flow_data"),
+        # 이번 턴에 계산한 분석은 실패했더라도 라운드 분석 API에서 다시 계산하지 않습니다.
+        ANALYTICS_COMPUTED_FIELD: [name for name in ROUND_ANALYTICS if name in eager_analyses]
     }
-    if discussion_log.round_summaries is None:
-        discussion_log.round_summaries = []
-    discussion_log.round_summaries.append(current_round_summary)
-
-    discussion_log.flow_data = analysis_map.get("flow_data")
+    round_summaries = list(discussion_log.round_summaries or [])
+    round_summaries.append(current_round_summary)
 
     logger.info(f"--- [BG Task] 분석 완료. 결과를 DB에 저장합니다. (ID: {discussion_log.discussion_id})")
+
+    # 문서 전체를 save하는 대신, transcript는 배치 flush로, 나머지 변경 필드는 단일 $set으로 기록합니다.
+    # 턴 도중 토론이 취소되었으면(status가 더 이상 turn_inprogress가 아니면) 결과를 기록하지 않습니다.
+    committed = await state.commit({
+        "participants": discussion_log.participants,
+        "round_summaries": round_summaries,
+        "flow_data": analysis_map.get("flow_data"),
+        "current_vote": current_vote,
+        "status": "waiting_for_vote",
+        "turn_number": discussion_log.turn_number + 1
+    }, expected_status="turn_inprogress")
+    if not committed:
+        logger.info(f"--- [BG Task] Turn for {discussion_log.discussion_id} was cancelled before it could be committed. ---")
+        return
     
-    # 다음 라운드를 위한 투표 생성
-    full_history_str = "\n\n".join([f"{t['agent_name']}: {t['message']}" for t in discussion_log.transcript])
-    discussion_log.current_vote = await _generate_vote_options(
-        full_history_str, 
-        discussion_log.discussion_id, 
-        discussion_log.turn_number,
-        vote_history,
-        discussion_log.topic
-    )
-    
-    discussion_log.status = "waiting_for_vote"
-    discussion_log.turn_number += 1
-    
-    await discussion_log.save()
-    
+    if evidence_index_changed:
+        await save_evidence_index(discussion_log.discussion_id, evidence_index)
+
     logger.info(f"--- [BG Task] Turn completed for {discussion_log.discussion_id}. New status: '{discussion_log.status}' ---")
 
+    # 사용자가 투표하는 동안 선택지별 검색을 미리 수행합니다. (중앙 검색을 하지 않는 프로필은 제외)
+    if current_vote and profile.central_search:
+        schedule_prefetch(discussion_log.discussion_id, _prefetch_vote_searches(discussion_log))
+
 # 모델 이름에 따라 적절한 LLM 클라이언트를 반환하는 헬퍼 함수 추가
 def get_llm_client(model_name: str, temperature: float):
     """모델 이름을 기반으로 올바른 LangChain LLM 클라이언트 인스턴스를 생성합니다."""
 
     logger.info(f"--- [LLM Client] Creating client for model: '{model_name}' with temp: {temperature} ---")
 
-    if model_name.startswith("gemini"):
-        return ChatGoogleGenerativeAI(model=model_name, temperature=temperature)
-    elif model_name.startswith("gpt"):
-        return ChatOpenAI(model=model_name, temperature=temperature)
-    elif model_name.startswith("claude"):
-        return ChatAnthropic(model=model_name, temperature=temperature)
-    else:
-        # 알 수 없는 모델 이름일 경우, 기본 모델로 대체하여 오류 방지
-        logger.warning(f"Unrecognized model name '{model_name}'. Falling back to Gemini 1.5 pro.")
-        return ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=temperature)
\ No newline at end of file
+    # 공급자 SDK는 llm_providers 레지스트리를 통해 처음 사용할 때 import 됩니다.
+    return get_chat_model(model=model_name, temperature=temperature)
\ No newline at end of file
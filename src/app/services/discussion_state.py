@@ -0,0 +1,401 @@
+# src/app/services/discussion_state.py
+
+import asyncio
+import json
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app import db
+from app.core.config import settings, logger
+from app.core.tracing import start_span
+from app.models.discussion import DiscussionLog
+
+# --- Redis 키 규칙 ---
+# discussion_state:{id}  : 토론의 hot 상태 (status, turn_number, 마지막 flush 위치 등) Hash
+# discussion_stream:{id} : 아직 MongoDB에 반영되지 않은 transcript 항목 Stream
+# discussion_state:dirty : flush 대기 중인 항목이 있는 토론 ID 집합 (장애 복구용)
+# discussion_votes:{id}  : 사용자 투표 기록 List (투표마다 RPUSHX + LTRIM, 만료되었으면 문서의 기록으로 다시 채움, 최대 VOTE_HISTORY_MAX_LENGTH개)
+# discussion_stream_lock:{id}  : Stream flush 잠금 (같은 토론의 flush는 한 번에 하나만 실행)
+# discussion_stream_owner:{id} : 턴 세션이 살아 있는 동안 갱신되는 소유 표시 (장애 복구 대상에서 제외)
+STATE_KEY = "discussion_state:{discussion_id}"
+STREAM_KEY = "discussion_stream:{discussion_id}"
+DIRTY_SET_KEY = "discussion_state:dirty"
+VOTE_HISTORY_KEY = "discussion_votes:{discussion_id}"
+STREAM_LOCK_KEY = "discussion_stream_lock:{discussion_id}"
+STREAM_OWNER_KEY = "discussion_stream_owner:{discussion_id}"
+
+# 잠금을 잡은 flusher의 토큰과 일치할 때만 삭제합니다.
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# hot 상태는 토론이 방치되어도 영구히 남지 않도록 TTL을 둡니다. (1일)
+STATE_TTL_SECONDS = 86400
+
+
+def _serialize_entry(entry: Dict[str, Any]) -> str:
+    """transcript 항목을 Stream에 저장할 수 있도록 JSON 문자열로 변환합니다."""
+    return json.dumps(
+        entry,
+        ensure_ascii=False,
+        default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v)
+    )
+
+
+def _deserialize_entry(raw: str) -> Dict[str, Any]:
+    """Stream에서 읽은 JSON 문자열을 transcript 항목으로 복원합니다. (timestamp는 datetime으로 복원)"""
+    entry = json.loads(raw)
+    timestamp = entry.get("timestamp")
+    if isinstance(timestamp, str):
+        try:
+            entry["timestamp"] = datetime.fromisoformat(timestamp)
+        except ValueError:
+            pass
+    return entry
+
+
+async def set_state(discussion_id: str, **fields: Any) -> None:
+    """토론의 hot 상태(status, turn_number 등)를 Redis Hash에 기록합니다."""
+    if not db.redis_client or not fields:
+        return
+    key = STATE_KEY.format(discussion_id=discussion_id)
+    try:
+        mapping = {k: v if isinstance(v, str) else json.dumps(v, default=str) for k, v in fields.items()}
+        mapping["updated_at"] = datetime.utcnow().isoformat()
+        await db.redis_client.hset(key, mapping=mapping)
+        await db.redis_client.expire(key, STATE_TTL_SECONDS)
+    except Exception as e:
+        logger.error(f"!!! [Discussion State] 상태 기록 중 오류 발생 ({discussion_id}): {e}")
+
+
+async def get_state(discussion_id: str) -> Dict[str, Any]:
+    """Redis에 저장된 토론의 hot 상태를 조회합니다. 없거나 오류 시 빈 딕셔너리를 반환합니다."""
+    if not db.redis_client:
+        return {}
+    try:
+        state = await db.redis_client.hgetall(STATE_KEY.format(discussion_id=discussion_id))
+        if state.get("turn_number") is not None:
+            state["turn_number"] = int(state["turn_number"])
+        return state
+    except Exception as e:
+        logger.error(f"!!! [Discussion State] 상태 조회 중 오류 발생 ({discussion_id}): {e}")
+        return {}
+
+
+async def count_pending_entries(discussion_id: str) -> int:
+    """아직 MongoDB에 반영되지 않은 transcript 항목 수를 반환합니다."""
+    if not db.redis_client:
+        return 0
+    try:
+        return await db.redis_client.xlen(STREAM_KEY.format(discussion_id=discussion_id))
+    except Exception:
+        return 0
+
+
+# --- 토론 컨텍스트 API: 투표 기록 ---
+async def append_vote(discussion_log: DiscussionLog, vote: str) -> List[str]:
+    """
+    사용자 투표를 기록합니다.
+    Redis List가 있으면 RPUSHX + LTRIM으로 이번 투표만 덧붙입니다. (최대 VOTE_HISTORY_MAX_LENGTH개)
+    List가 만료되어 없을 때만 문서의 기록(이번 투표 포함)으로 다시 채웁니다.
+    (만료된 뒤 RPUSH만 하면 최신 투표 하나만 남은 List가 전체 기록처럼 조회되기 때문입니다.)
+    MongoDB 문서에는 $push/$slice로 영구 저장합니다. 갱신된 투표 기록을 반환합니다.
+    """
+    max_length = settings.VOTE_HISTORY_MAX_LENGTH
+    discussion_id = discussion_log.discussion_id
+
+    discussion_log.vote_history = (list(discussion_log.vote_history or []) + [vote])[-max_length:]
+
+    if db.redis_client:
+        key = VOTE_HISTORY_KEY.format(discussion_id=discussion_id)
+        try:
+            async with db.redis_client.pipeline(transaction=True) as pipe:
+                # RPUSHX는 List가 있을 때만 추가하므로, 만료된 List에 최신 투표 하나만 남지 않습니다.
+                pipe.rpushx(key, vote)
+                pipe.ltrim(key, -max_length, -1)
+                pipe.expire(key, STATE_TTL_SECONDS)
+                pushed_length, _, _ = await pipe.execute()
+            if not pushed_length:
+                async with db.redis_client.pipeline(transaction=True) as pipe:
+                    pipe.delete(key)
+                    pipe.rpush(key, *discussion_log.vote_history)
+                    pipe.expire(key, STATE_TTL_SECONDS)
+                    await pipe.execute()
+        except Exception as e:
+            logger.error(f"!!! [Redis Error] Redis에 투표 기록을 저장하는 중 오류 발생: {e}", exc_info=True)
+
+    await DiscussionLog.get_motor_collection().update_one(
+        {"discussion_id": discussion_id},
+        {"$push": {"vote_history": {"$each": [vote], "$slice": -max_length}}}
+    )
+    logger.info(f"--- [Discussion State] 사용자 투표 '{vote}'를 기록했습니다. 현재 기록: {discussion_log.vote_history} ---")
+    return discussion_log.vote_history
+
+
+async def get_vote_history(discussion_log: DiscussionLog) -> List[str]:
+    """
+    토론의 투표 기록을 반환합니다.
+    Redis List를 우선 조회하고, 만료되었거나 Redis를 사용할 수 없으면 MongoDB에 저장된 기록을 사용합니다.
+    """
+    if db.redis_client:
+        key = VOTE_HISTORY_KEY.format(discussion_id=discussion_log.discussion_id)
+        try:
+            history = await db.redis_client.lrange(key, 0, -1)
+            if history:
+                return history
+            if discussion_log.vote_history:
+                # Redis 기록이 만료된 경우 문서의 기록으로 다시 채워 둡니다.
+                async with db.redis_client.pipeline(transaction=True) as pipe:
+                    pipe.rpush(key, *discussion_log.vote_history)
+                    pipe.expire(key, STATE_TTL_SECONDS)
+                    await pipe.execute()
+        except Exception as e:
+            logger.error(f"!!! [Redis Error] Redis에서 투표 기록을 가져오는 중 오류 발생: {e}", exc_info=True)
+
+    return list(discussion_log.vote_history or [])
+
+
+@asynccontextmanager
+async def _stream_flush_lock(discussion_id: str):
+    """
+    토론의 Stream flush 잠금을 잡을 때까지 기다립니다.
+    두 flusher가 서로 다른 길이의 배치를 읽어 같은 항목을 두 번 $push 하지 않도록 flush를 직렬화합니다.
+    (잠금을 잡은 워커가 비정상 종료되어도 DISCUSSION_STATE_FLUSH_LOCK_TTL_SECONDS 뒤에는 만료됩니다.)
+    """
+    key = STREAM_LOCK_KEY.format(discussion_id=discussion_id)
+    token = uuid.uuid4().hex
+    while not await db.redis_client.set(key, token, nx=True, ex=settings.DISCUSSION_STATE_FLUSH_LOCK_TTL_SECONDS):
+        await asyncio.sleep(0.05)
+    try:
+        yield
+    finally:
+        try:
+            await db.redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, key, token)
+        except Exception as e:
+            logger.error(f"!!! [Discussion State] flush 잠금 해제 중 오류 발생 ({discussion_id}): {e}")
+
+
+async def flush_stream(discussion_id: str, discussion_log: Optional[DiscussionLog] = None) -> int:
+    """
+    Redis Stream에 쌓인 transcript 항목을 배치 단위로 MongoDB에 $push 합니다.
+    같은 토론의 flush는 잠금으로 직렬화되며, 마지막으로 반영한 Stream ID를 문서에 함께 기록하여
+    flush 도중 장애가 나더라도 같은 배치가 두 번 반영되지 않도록 합니다.
+    """
+    if not db.redis_client:
+        return 0
+
+    async with _stream_flush_lock(discussion_id):
+        return await _flush_stream_locked(discussion_id, discussion_log)
+
+
+async def _flush_stream_locked(discussion_id: str, discussion_log: Optional[DiscussionLog]) -> int:
+    """flush_stream의 본문. flush 잠금을 잡은 상태에서 호출됩니다."""
+    stream_key = STREAM_KEY.format(discussion_id=discussion_id)
+    collection = DiscussionLog.get_motor_collection()
+    flushed = 0
+
+    while True:
+        batch = await db.redis_client.xrange(
+            stream_key, min="-", max="+", count=settings.DISCUSSION_STATE_FLUSH_BATCH_SIZE
+        )
+        if not batch:
+            break
+
+        last_stream_id = batch[-1][0]
+        entries = [_deserialize_entry(fields["entry"]) for _, fields in batch]
+
+        # 같은 배치가 이미 반영된 경우(stream_flushed_id가 동일) 업데이트는 매칭되지 않습니다.
+        await collection.update_one(
+            {"discussion_id": discussion_id, "stream_flushed_id": {"$ne": last_stream_id}},
+            {
+                "$push": {"transcript": {"$each": entries}},
+                "$set": {"stream_flushed_id": last_stream_id}
+            }
+        )
+        await db.redis_client.xdel(stream_key, *[stream_id for stream_id, _ in batch])
+        if discussion_log is not None:
+            discussion_log.stream_flushed_id = last_stream_id
+        flushed += len(entries)
+
+    if flushed:
+        logger.info(f"--- [Discussion State] {discussion_id}: transcript {flushed}건을 MongoDB에 반영했습니다. ---")
+    await db.redis_client.srem(DIRTY_SET_KEY, discussion_id)
+    return flushed
+
+
+class TurnStateSession:
+    """
+    한 턴 동안의 토론 상태를 관리하는 write-behind 세션.
+
+    - transcript 항목은 메모리(discussion_log)와 Redis Stream에 동시에 기록됩니다.
+    - 백그라운드 flusher가 설정된 주기마다 Stream을 MongoDB로 배치 반영합니다.
+    - 세션 종료(턴 완료) 시 남은 항목을 모두 flush 합니다.
+    - Redis를 사용할 수 없으면 메모리에 모아 두었다가 flush 시점에 직접 MongoDB에 반영합니다.
+
+    사용 예:
+        async with TurnStateSession(discussion_log) as state:
+            await state.append({...})
+            await state.commit({"status": "waiting_for_vote"}, expected_status="turn_inprogress")
+    """
+
+    def __init__(self, discussion_log: DiscussionLog):
+        self.discussion_log = discussion_log
+        self.discussion_id = discussion_log.discussion_id
+        self._local_pending: List[Dict[str, Any]] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "TurnStateSession":
+        await self._mark_owner()
+        self._flusher = asyncio.create_task(self._periodic_flush())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+        # 턴이 실패하더라도 이미 생성된 발언은 보존합니다.
+        try:
+            await self.flush()
+        finally:
+            await self._mark_owner(release=True)
+
+    async def _mark_owner(self, release: bool = False) -> None:
+        """이 세션이 Stream을 flush하고 있음을 표시(또는 해제)합니다. 표시가 살아 있는 토론은 장애 복구에서 제외됩니다."""
+        if not db.redis_client:
+            return
+        key = STREAM_OWNER_KEY.format(discussion_id=self.discussion_id)
+        try:
+            if release:
+                await db.redis_client.delete(key)
+            else:
+                # 표시는 flush 주기마다 갱신되므로, 만료 시간은 flush 주기보다 충분히 길어야 합니다.
+                ttl = max(settings.DISCUSSION_STATE_OWNER_TTL_SECONDS, int(settings.DISCUSSION_STATE_FLUSH_INTERVAL_SECONDS * 3))
+                await db.redis_client.set(key, 1, ex=ttl)
+        except Exception as e:
+            logger.error(f"!!! [Discussion State] 세션 소유 표시 갱신 중 오류 발생 ({self.discussion_id}): {e}")
+
+    async def _periodic_flush(self) -> None:
+        interval = settings.DISCUSSION_STATE_FLUSH_INTERVAL_SECONDS
+        while True:
+            await asyncio.sleep(interval)
+            await self._mark_owner()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"!!! [Discussion State] 주기적 flush 중 오류 발생 ({self.discussion_id}): {e}", exc_info=True)
+
+    async def append(self, entry: Dict[str, Any]) -> None:
+        """transcript 항목을 추가합니다. MongoDB 반영은 flush 시점에 배치로 이루어집니다."""
+        self.discussion_log.transcript.append(entry)
+
+        if db.redis_client:
+            try:
+                await db.redis_client.xadd(
+                    STREAM_KEY.format(discussion_id=self.discussion_id),
+                    {"entry": _serialize_entry(entry)}
+                )
+                await db.redis_client.sadd(DIRTY_SET_KEY, self.discussion_id)
+                return
+            except Exception as e:
+                logger.error(f"!!! [Discussion State] Stream 기록 실패, 메모리 버퍼로 대체합니다 ({self.discussion_id}): {e}")
+
+        self._local_pending.append(entry)
+
+    async def extend(self, entries: List[Dict[str, Any]]) -> None:
+        """여러 transcript 항목을 한 번의 Redis 왕복(파이프라인)으로 추가합니다."""
+        if not entries:
+            return
+        self.discussion_log.transcript.extend(entries)
+
+        if db.redis_client:
+            try:
+                stream_key = STREAM_KEY.format(discussion_id=self.discussion_id)
+                async with db.redis_client.pipeline(transaction=False) as pipe:
+                    for entry in entries:
+                        pipe.xadd(stream_key, {"entry": _serialize_entry(entry)})
+                    pipe.sadd(DIRTY_SET_KEY, self.discussion_id)
+                    await pipe.execute()
+                return
+            except Exception as e:
+                logger.error(f"!!! [Discussion State] Stream 기록 실패, 메모리 버퍼로 대체합니다 ({self.discussion_id}): {e}")
+
+        self._local_pending.extend(entries)
+
+    async def flush(self) -> int:
+        """대기 중인 transcript 항목을 MongoDB에 반영합니다."""
+        async with self._lock:
+            with start_span("discussion_state.flush", discussion_id=self.discussion_id) as span:
+                flushed = 0
+                if self._local_pending:
+                    pending, self._local_pending = self._local_pending, []
+                    await DiscussionLog.get_motor_collection().update_one(
+                        {"discussion_id": self.discussion_id},
+                        {"$push": {"transcript": {"$each": pending}}}
+                    )
+                    flushed += len(pending)
+                if db.redis_client:
+                    try:
+                        flushed += await flush_stream(self.discussion_id, self.discussion_log)
+                    except Exception as e:
+                        logger.error(f"!!! [Discussion State] Stream flush 중 오류 발생 ({self.discussion_id}): {e}", exc_info=True)
+                span.set_attribute("flushed_entries", flushed)
+                return flushed
+
+    async def set_status(self, status: str) -> None:
+        """MongoDB 쓰기 없이 Redis의 hot 상태만 갱신합니다."""
+        await set_state(self.discussion_id, status=status, turn_number=self.discussion_log.turn_number)
+
+    async def commit(self, fields: Dict[str, Any], expected_status: Optional[str] = None) -> bool:
+        """
+        턴 완료 시 호출합니다. 남은 transcript를 flush한 뒤, transcript를 제외한
+        변경 필드만 단일 $set 업데이트로 MongoDB에 기록합니다. (문서 전체 save 대체)
+        expected_status를 지정하면 문서의 status가 그 값일 때만 기록합니다.
+        (턴 도중 토론이 취소되어 'cancelled'로 바뀐 경우 덮어쓰지 않도록)
+        기록되지 않았으면 False를 반환하고, Redis의 hot 상태도 갱신하지 않습니다.
+        """
+        await self.flush()
+        query: Dict[str, Any] = {"discussion_id": self.discussion_id}
+        if expected_status is not None:
+            query["status"] = expected_status
+        with start_span("discussion_state.commit", discussion_id=self.discussion_id, fields=",".join(fields)):
+            result = await DiscussionLog.get_motor_collection().update_one(query, {"$set": fields})
+        if not result.matched_count:
+            logger.warning(f"--- [Discussion State] {self.discussion_id}: status가 '{expected_status}'가 아니므로 턴 결과를 기록하지 않습니다. ---")
+            return False
+        for field_name, value in fields.items():
+            setattr(self.discussion_log, field_name, value)
+        await set_state(
+            self.discussion_id,
+            status=self.discussion_log.status,
+            turn_number=self.discussion_log.turn_number
+        )
+        return True
+
+
+async def recover_pending_state() -> None:
+    """
+    서버 시작 시 호출됩니다. 이전 프로세스가 비정상 종료되어 Redis Stream에 남아 있는
+    transcript 항목들을 MongoDB에 반영합니다.
+    살아 있는 턴 세션이 소유한 토론(소유 표시가 만료되지 않은 토론)은 그 세션이 flush하므로 건너뜁니다.
+    """
+    if not db.redis_client or not db.mongo_client:
+        return
+    try:
+        dirty_ids = await db.redis_client.smembers(DIRTY_SET_KEY)
+        for discussion_id in dirty_ids:
+            if await db.redis_client.exists(STREAM_OWNER_KEY.format(discussion_id=discussion_id)):
+                logger.info(f"--- [Discussion State] 복구 건너뜀: {discussion_id} (진행 중인 턴 세션이 있음) ---")
+                continue
+            recovered = await flush_stream(discussion_id)
+            logger.info(f"--- [Discussion State] 복구 완료: {discussion_id} ({recovered}건) ---")
+    except Exception as e:
+        logger.error(f"!!! [Discussion State] 미반영 상태 복구 중 오류 발생: {e}", exc_info=True)
@@ -0,0 +1,240 @@
+# src/app/services/evidence_index.py
+
+import asyncio
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Literal, Optional
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from app.core.config import settings, logger
+from app.models.discussion import DiscussionEvidenceIndex
+
+# --- 토론별 증거 자료 검색 인덱스 ---
+# 오케스트레이션에서 수집한 웹/파일 요약과 라운드마다 추가되는 중앙 검색 결과를 passage 단위로 나누어
+# BM25 인덱스로 보관합니다. (DiscussionEvidenceIndex 컬렉션, 토론 문서와 분리하여 목록/상세 조회 시 읽지 않음)
+# 각 배심원은 자신의 역할 프롬프트와 이번 라운드 지시문으로 상위 k개 passage만 받으므로,
+# 자료가 아무리 쌓여도 배심원당 프롬프트 크기는 일정하게 유지됩니다.
+# settings.EVIDENCE_EMBEDDING_MODEL을 지정하면 로컬 임베딩(sentence-transformers) 유사도를 함께 사용합니다.
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-zA-Z0-9]+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?다요])\s+|\n+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    BM25용 토큰화. 영문/숫자는 소문자 단어 단위로, 한글은 조사·어미 변화에 강하도록
+    음절 바이그램(2글자) 단위로 나눕니다. (한 글자 한글 단어는 그대로 사용)
+    """
+    tokens = []
+    for word in _TOKEN_PATTERN.findall(text or ""):
+        if "가" <= word[0] <= "힣":
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word.lower())
+    return tokens
+
+
+def split_passages(text: str, max_chars: int) -> List[str]:
+    """긴 요약문을 문장 경계 기준으로 max_chars 이하의 passage로 나눕니다."""
+    text = (text or "").strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    passages, current = [], ""
+    for sentence in _SENTENCE_SPLIT.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            passages.append(current)
+            current = ""
+        current = f"{current} {sentence}".strip()
+        # 한 문장이 max_chars보다 긴 경우 강제로 자릅니다.
+        while len(current) > max_chars:
+            passages.append(current[:max_chars])
+            current = current[max_chars:]
+    if current:
+        passages.append(current)
+    return passages
+
+
+class EvidencePassage(BaseModel):
+    kind: Literal["web", "file", "search"]
+    source: str
+    text: str
+    terms: Dict[str, int] = Field(default_factory=dict)
+    length: int = 0
+    embedding: Optional[List[float]] = None
+
+
+class EvidenceIndex(BaseModel):
+    """passage 목록과 BM25 통계(문서 빈도, 전체 길이)를 함께 보관합니다."""
+    passages: List[EvidencePassage] = Field(default_factory=list)
+    doc_freq: Dict[str, int] = Field(default_factory=dict)
+    total_length: int = 0
+    embedding_model: Optional[str] = None
+
+    def add(self, kind: str, source: str, text: str) -> List[EvidencePassage]:
+        """자료를 passage로 나누어 인덱스에 추가합니다. 이미 있는 passage는 건너뜁니다."""
+        existing = {(p.source, p.text) for p in self.passages}
+        added = []
+        for chunk in split_passages(text, settings.EVIDENCE_PASSAGE_MAX_CHARS):
+            if (source, chunk) in existing:
+                continue
+            terms = Counter(tokenize(chunk))
+            passage = EvidencePassage(kind=kind, source=source, text=chunk, terms=dict(terms), length=sum(terms.values()))
+            for term in terms:
+                self.doc_freq[term] = self.doc_freq.get(term, 0) + 1
+            self.total_length += passage.length
+            self.passages.append(passage)
+            existing.add((source, chunk))
+            added.append(passage)
+        return added
+
+    def bm25_scores(self, query: str) -> List[float]:
+        n = len(self.passages)
+        if not n:
+            return []
+        avg_length = self.total_length / n or 1.0
+        query_terms = set(tokenize(query))
+        idf = {
+            term: math.log(1 + (n - self.doc_freq[term] + 0.5) / (self.doc_freq[term] + 0.5))
+            for term in query_terms if term in self.doc_freq
+        }
+        scores = []
+        for passage in self.passages:
+            score = 0.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * passage.length / avg_length)
+            for term, weight in idf.items():
+                tf = passage.terms.get(term)
+                if tf:
+                    score += weight * tf * (BM25_K1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+    def search(self, query: str, top_k: int, query_embedding: Optional[List[float]] = None) -> List[EvidencePassage]:
+        """BM25 점수(임베딩이 있으면 코사인 유사도와 가중 합산)로 상위 top_k개 passage를 반환합니다."""
+        scores = self.bm25_scores(query)
+        if not scores:
+            return []
+
+        max_score = max(scores) or 1.0
+        scores = [score / max_score for score in scores]
+        if query_embedding is not None:
+            weight = settings.EVIDENCE_EMBEDDING_WEIGHT
+            scores = [
+                (1 - weight) * score + weight * _dot(query_embedding, passage.embedding)
+                if passage.embedding else score
+                for score, passage in zip(scores, self.passages)
+            ]
+
+        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        return [self.passages[i] for i in ranked[:top_k] if scores[i] > 0]
+
+
+def _dot(a: List[float], b: List[float]) -> float:
+    # 임베딩은 정규화되어 저장되므로 내적이 곧 코사인 유사도입니다.
+    return sum(x * y for x, y in zip(a, b))
+
+
+@lru_cache(maxsize=1)
+def _load_embedding_model(model_name: str):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+async def _embed(texts: List[str]) -> Optional[List[List[float]]]:
+    """설정된 로컬 임베딩 모델로 텍스트를 임베딩합니다. 모델이 없으면 None을 반환합니다."""
+    model_name = settings.EVIDENCE_EMBEDDING_MODEL
+    if not model_name or not texts:
+        return None
+    try:
+        model = await asyncio.to_thread(_load_embedding_model, model_name)
+        vectors = await asyncio.to_thread(model.encode, texts, normalize_embeddings=True)
+        return [vector.tolist() for vector in vectors]
+    except ImportError:
+        logger.warning("--- [Evidence Index] sentence-transformers가 설치되어 있지 않아 BM25만 사용합니다. ---")
+    except Exception as e:
+        logger.error(f"!!! [Evidence Index] 임베딩 생성 중 오류 발생: {e}", exc_info=True)
+    return None
+
+
+async def _embed_passages(index: EvidenceIndex, passages: List[EvidencePassage]) -> None:
+    vectors = await _embed([p.text for p in passages])
+    if vectors:
+        for passage, vector in zip(passages, vectors):
+            passage.embedding = vector
+        index.embedding_model = settings.EVIDENCE_EMBEDDING_MODEL
+
+
+async def build_evidence_index(evidence_briefing: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """오케스트레이션에서 수집한 증거 자료집으로 인덱스를 만듭니다. (save_evidence_index로 저장할 dict)"""
+    index = EvidenceIndex()
+    added = []
+    for kind, field in (("web", "web_evidence"), ("file", "file_evidence")):
+        for item in (evidence_briefing or {}).get(field, []):
+            added.extend(index.add(kind, item.get("source", ""), item.get("summary", "")))
+    await _embed_passages(index, added)
+    logger.info(f"--- [Evidence Index] {len(index.passages)}개 passage로 인덱스를 생성했습니다. ---")
+    return index.model_dump()
+
+
+async def add_search_results(index_data: Dict[str, Any], search_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """라운드 중 수행한 웹 검색 결과를 인덱스에 추가합니다."""
+    index = EvidenceIndex.model_validate(index_data)
+    added = []
+    for result in search_results:
+        added.extend(index.add("search", result.get("url", ""), result.get("content", "")))
+    await _embed_passages(index, added)
+    return index.model_dump()
+
+
+async def retrieve_for_queries(index_data: Dict[str, Any], queries: List[str], top_k: int) -> List[List[Dict[str, Any]]]:
+    """여러 질의(배심원별)에 대해 상위 top_k개 passage를 한 번에 검색합니다."""
+    index = EvidenceIndex.model_validate(index_data)
+    query_embeddings = None
+    if index.embedding_model and index.embedding_model == settings.EVIDENCE_EMBEDDING_MODEL:
+        query_embeddings = await _embed(queries)
+
+    results = []
+    for i, query in enumerate(queries):
+        passages = index.search(query, top_k, query_embeddings[i] if query_embeddings else None)
+        results.append([{"kind": p.kind, "source": p.source, "text": p.text} for p in passages])
+    return results
+
+
+async def load_evidence_index(discussion_id: str) -> Optional[Dict[str, Any]]:
+    """저장된 토론의 인덱스를 불러옵니다. 없으면 None을 반환합니다."""
+    document = await DiscussionEvidenceIndex.get_motor_collection().find_one(
+        {"discussion_id": discussion_id}, {"index": 1}
+    )
+    return document["index"] if document else None
+
+
+async def save_evidence_index(discussion_id: str, index_data: Dict[str, Any]) -> None:
+    """토론의 인덱스를 저장(교체)합니다."""
+    await DiscussionEvidenceIndex.get_motor_collection().update_one(
+        {"discussion_id": discussion_id},
+        {"$set": {"index": index_data, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+
+def format_evidence(passages: List[Dict[str, Any]]) -> str:
+    """검색된 passage를 프롬프트에 넣을 문자열로 만듭니다."""
+    if not passages:
+        return "--- [참고 자료] ---\n관련 참고 자료가 없습니다.\n"
+    labels = {"web": "웹 자료", "file": "제출 파일", "search": "웹 검색 결과"}
+    lines = [f"- [{labels[p['kind']]}] {p['text']} (출처: {p['source']})" for p in passages]
+    return "--- [참고 자료: 당신의 역할과 관련성이 높은 자료] ---\n" + "\n".join(lines) + "\n"
@@ -0,0 +1,123 @@
+# src/app/services/execution_profiles.py
+
+import json
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+from app import db
+from app.core.config import settings, logger
+
+# --- 토론 실행 프로필 (fast / balanced / deep) ---
+# 토론 생성 시 선택한 프로필이 패널 규모, 역할별 모델, 도구 사용량, 라운드 분석 종류,
+# 토론 기록 압축 수준, 보고서 방식을 결정합니다.
+# 선택한 프로필의 설정은 토론 생성 시점에 DiscussionLog.execution_profile_config로 복사되므로,
+# 관리자가 프로필을 수정해도 진행 중인 토론에는 영향을 주지 않습니다.
+# 관리자는 SystemSettings의 'execution_profiles' 키에 JSON으로 프로필을 추가하거나
+# 기본 프로필의 일부 항목을 덮어쓸 수 있습니다. (예: {"fast": {"max_jurors": 2}, "custom": {...}})
+EXECUTION_PROFILES_SETTING_KEY = "execution_profiles"
+DEFAULT_EXECUTION_PROFILE = "balanced"
+
+RoundAnalysis = Literal["round_summary", "stance_changes", "flow_data", "fact_check"]
+
+
+class ExecutionProfile(BaseModel):
+    name: str
+    description: str = ""
+    # 배심원단 규모 (Jury Selector가 선택할 전문가 수)
+    min_jurors: int = Field(default=4, ge=1)
+    max_jurors: int = Field(default=6, ge=1)
+    # 역할별 모델 ("juror", "analysis", "report"). 지정하지 않은 역할은 에이전트 설정의 모델을 사용합니다.
+    models: Dict[Literal["juror", "analysis", "report"], str] = Field(default_factory=dict)
+    # 배심원 한 명이 한 라운드에 호출할 수 있는 도구 횟수 (None이면 제한 없음, 0이면 도구 사용 안 함)
+    tool_budget: Optional[int] = Field(default=None, ge=0)
+    # 투표 선택에 따른 라운드 시작 시 중앙 웹 검색 수행 여부
+    central_search: bool = True
+    # 라운드마다 실행할 분석 (투표 생성은 항상 실행합니다.)
+    analyses: List[RoundAnalysis] = Field(default_factory=lambda: ["round_summary", "stance_changes", "flow_data", "fact_check"])
+    # 상호작용(flow_data)/입장 변화(stance_changes) 분석 시점
+    #   eager: 매 라운드 종료 시 계산 / lazy: GET /discussions/{id}/rounds/{n}/analytics 최초 조회 시 계산하여 저장
+    analytics_mode: Literal["eager", "lazy"] = "eager"
+    # 라운드 분석 방식 (None이면 settings.ROUND_ANALYSIS_MODE)
+    round_analysis_mode: Optional[Literal["separate", "composite"]] = None
+    # 배심원에게 전달하는 토론 기록의 압축 수준
+    #   full: 전체 기록 / summarized: 직전 라운드만 원문, 이전 라운드는 결정적 발언 요약 / minimal: 직전 라운드만
+    history_compaction: Literal["full", "summarized", "minimal"] = "full"
+    # 보고서 방식 (full: LLM이 인포그래픽 HTML 작성 / summary: 개요만 생성하여 고정 템플릿으로 렌더링)
+    report_mode: Literal["full", "summary"] = "full"
+
+
+BUILTIN_EXECUTION_PROFILES: Dict[str, Dict[str, Any]] = {
+    "fast": {
+        "description": "소규모 패널과 최소 분석으로 빠르게 결론을 얻습니다.",
+        "min_jurors": 2,
+        "max_jurors": 3,
+        "models": {"juror": "gemini-2.5-flash", "analysis": "gemini-2.5-flash", "report": "gemini-2.5-flash"},
+        "tool_budget": 0,
+        "central_search": False,
+        "analyses": ["round_summary", "stance_changes", "flow_data"],
+        "analytics_mode": "lazy",
+        "round_analysis_mode": "composite",
+        "history_compaction": "minimal",
+        "report_mode": "summary",
+    },
+    "balanced": {
+        "description": "기본 토론 방식입니다.",
+    },
+    "deep": {
+        "description": "큰 패널과 충분한 도구 사용으로 깊이 있게 토론합니다.",
+        "min_jurors": 5,
+        "max_jurors": 8,
+        "tool_budget": 5,
+        "round_analysis_mode": "separate",
+    },
+}
+
+
+def parse_execution_profiles(value: Optional[str]) -> Dict[str, ExecutionProfile]:
+    """
+    기본 프로필에 관리자 설정(JSON 문자열)을 덮어써서 전체 프로필 목록을 만듭니다.
+    설정이 올바르지 않으면 ValueError를 발생시킵니다.
+    """
+    overrides: Dict[str, Any] = {}
+    if value:
+        try:
+            overrides = json.loads(value)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"실행 프로필 설정이 올바른 JSON이 아닙니다: {e}")
+        if not isinstance(overrides, dict) or not all(isinstance(v, dict) for v in overrides.values()):
+            raise ValueError("실행 프로필 설정은 {프로필 이름: {설정}} 형태의 JSON 객체여야 합니다.")
+
+    profiles = {}
+    for name in {**BUILTIN_EXECUTION_PROFILES, **overrides}:
+        merged = {**BUILTIN_EXECUTION_PROFILES.get(name, {}), **overrides.get(name, {}), "name": name}
+        try:
+            profile = ExecutionProfile.model_validate(merged)
+        except ValidationError as e:
+            raise ValueError(f"실행 프로필 '{name}'의 설정이 올바르지 않습니다: {e}")
+        if profile.min_jurors > profile.max_jurors:
+            raise ValueError(f"실행 프로필 '{name}'의 min_jurors가 max_jurors보다 큽니다.")
+        profiles[name] = profile
+    return profiles
+
+
+async def get_execution_profiles() -> Dict[str, ExecutionProfile]:
+    """관리자 설정이 반영된 실행 프로필 목록을 반환합니다. (설정이 잘못되었으면 기본 프로필만 사용)"""
+    value = None
+    try:
+        db_name = settings.MONGO_DB_URL.split("/")[-1].split("?")[0]
+        setting = await db.mongo_client[db_name]["system_settings"].find_one({"key": EXECUTION_PROFILES_SETTING_KEY})
+        value = setting.get("value") if setting else None
+        return parse_execution_profiles(value)
+    except ValueError as e:
+        logger.error(f"!!! [Execution Profile] 관리자 프로필 설정을 무시합니다: {e}")
+    except Exception as e:
+        logger.error(f"!!! [Execution Profile] 프로필 설정 조회 중 오류 발생: {e}", exc_info=True)
+    return parse_execution_profiles(None)
+
+
+def get_discussion_profile(discussion_log) -> ExecutionProfile:
+    """토론에 저장된 프로필 스냅샷을 반환합니다. (프로필 도입 이전 토론은 기본 프로필)"""
+    if discussion_log.execution_profile_config:
+        return ExecutionProfile.model_validate(discussion_log.execution_profile_config)
+    return parse_execution_profiles(None)[DEFAULT_EXECUTION_PROFILE]
@@ -0,0 +1,342 @@
+# src/app/services/job_admission.py
+
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from app import db
+from app.core.config import settings, logger
+from app.core.metrics import ADMISSION_QUEUED_JOBS, ADMISSION_WAIT_SECONDS
+
+# --- 백그라운드 작업 승인 (오케스트레이션 / 턴 / 보고서) ---
+# 작업 하나가 여러 LLM 호출을 동시에 수행하므로, 실행 중인 작업 수를 세 단계로 제한합니다.
+#   - 사용자별: ADMISSION_MAX_JOBS_PER_USER
+#   - 워커별: ADMISSION_MAX_JOBS_PER_WORKER
+#   - 클러스터 전체: ADMISSION_MAX_JOBS_CLUSTER (Redis로 공유)
+# 자리가 없으면 작업은 대기열에서 기다립니다. 대기열은 공정 분배(fair-share) 순서를 따릅니다.
+# 사용자의 (실행 중인 작업 수 + 그 사용자의 앞선 대기 작업 수)가 작은 작업이 먼저 실행됩니다.
+# 같은 값이면 먼저 들어온 작업이 먼저 실행됩니다.
+# 따라서 작업을 많이 올린 사용자가 있어도 다른 사용자의 첫 작업이 뒤로 밀리지 않습니다.
+# 대기 순번은 ADMISSION_QUEUE_STATUS_KEY에 기록되고 /discussions/{id}/progress로 조회됩니다.
+# Redis를 사용할 수 없으면 같은 규칙을 워커 내부에서만 적용합니다. (클러스터 제한 없음)
+ADMISSION_RUNNING_KEY = "admission:running"        # ZSET: job_id -> 슬롯 만료 시각
+ADMISSION_QUEUE_KEY = "admission:queue"            # ZSET: job_id -> 대기 heartbeat 만료 시각
+ADMISSION_JOBS_KEY = "admission:jobs"              # HASH: job_id -> 작업 정보(JSON)
+ADMISSION_QUEUE_STATUS_KEY = "admission_queue:{discussion_id}"
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# 만료된 슬롯/대기 항목을 정리합니다. (워커가 비정상 종료되어 해제하지 못한 항목)
+_PURGE_EXPIRED = """
+local now = tonumber(ARGV[1])
+for _, key in ipairs({KEYS[1], KEYS[2]}) do
+    for _, id in ipairs(redis.call('zrangebyscore', key, '-inf', now)) do
+        redis.call('zrem', key, id)
+        redis.call('hdel', KEYS[3], id)
+    end
+end
+local function job_info(id)
+    local info = cjson.decode(redis.call('hget', KEYS[3], id) or '{}')
+    return {
+        id = id,
+        user = info.user or '',
+        worker = info.worker or '',
+        worker_cap = tonumber(info.worker_cap) or 0,
+        enqueued_at = tonumber(info.enqueued_at) or now
+    }
+end
+"""
+
+# KEYS: running, queue, jobs / ARGV: now, job_id, job_info, slot_ttl, queue_ttl, cluster_cap, user_cap
+# 반환: {승인 여부(1/0), 대기 순번(1부터), 대기열 길이}
+_ADMIT_SCRIPT = _PURGE_EXPIRED + """
+local job_id = ARGV[2]
+if redis.call('zscore', KEYS[1], job_id) then
+    return {1, 0, redis.call('zcard', KEYS[2])}
+end
+redis.call('hset', KEYS[3], job_id, ARGV[3])
+redis.call('zadd', KEYS[2], now + tonumber(ARGV[5]), job_id)
+
+local user_running, worker_running = {}, {}
+local running = redis.call('zrange', KEYS[1], 0, -1)
+for _, id in ipairs(running) do
+    local job = job_info(id)
+    user_running[job.user] = (user_running[job.user] or 0) + 1
+    worker_running[job.worker] = (worker_running[job.worker] or 0) + 1
+end
+
+local queued = {}
+for _, id in ipairs(redis.call('zrange', KEYS[2], 0, -1)) do
+    table.insert(queued, job_info(id))
+end
+local function by_arrival(a, b)
+    if a.enqueued_at ~= b.enqueued_at then return a.enqueued_at < b.enqueued_at end
+    return a.id < b.id
+end
+table.sort(queued, by_arrival)
+local user_index = {}
+for _, job in ipairs(queued) do
+    local index = user_index[job.user] or 0
+    job.rank = (user_running[job.user] or 0) + index
+    user_index[job.user] = index + 1
+end
+table.sort(queued, function(a, b)
+    if a.rank ~= b.rank then return a.rank < b.rank end
+    return by_arrival(a, b)
+end)
+
+-- 앞선 작업 중 지금 실행 가능한 작업이 먼저 자리를 차지한다고 보고, 남은 자리로 승인 여부를 판단합니다.
+local cluster_cap, user_cap = tonumber(ARGV[6]), tonumber(ARGV[7])
+local taken = #running
+for position, job in ipairs(queued) do
+    local eligible = taken < cluster_cap
+        and (user_running[job.user] or 0) < user_cap
+        and (worker_running[job.worker] or 0) < job.worker_cap
+    if job.id == job_id then
+        if eligible then
+            redis.call('zrem', KEYS[2], job_id)
+            redis.call('zadd', KEYS[1], now + tonumber(ARGV[4]), job_id)
+            return {1, 0, #queued - 1}
+        end
+        return {0, position, #queued}
+    end
+    if eligible then
+        taken = taken + 1
+        user_running[job.user] = (user_running[job.user] or 0) + 1
+        worker_running[job.worker] = (worker_running[job.worker] or 0) + 1
+    end
+end
+return {0, #queued, #queued}
+"""
+
+# KEYS: running, queue, jobs / ARGV: now, user
+_COUNT_USER_JOBS_SCRIPT = _PURGE_EXPIRED + """
+local count = 0
+for _, id in ipairs(redis.call('hkeys', KEYS[3])) do
+    if job_info(id).user == ARGV[2] then count = count + 1 end
+end
+return count
+"""
+
+_ADMISSION_KEYS = [ADMISSION_RUNNING_KEY, ADMISSION_QUEUE_KEY, ADMISSION_JOBS_KEY]
+
+# Redis를 사용할 수 없을 때의 워커 내부 상태
+_local_running: Dict[str, Dict[str, Any]] = {}
+_local_queue: Dict[str, Dict[str, Any]] = {}
+# 이 워커의 대기 작업별 순번 (discussion_id -> 상태)
+_local_queue_status: Dict[str, Dict[str, Any]] = {}
+# 이 워커에서 작업이 끝나면 대기 중인 작업을 바로 깨웁니다.
+_slot_released = asyncio.Event()
+
+
+def _local_try_admit(job_id: str) -> List[int]:
+    """_ADMIT_SCRIPT와 같은 규칙으로 워커 내부 대기열에서 승인 여부를 판단합니다."""
+    user_running: Dict[str, int] = {}
+    for job in _local_running.values():
+        user_running[job["user"]] = user_running.get(job["user"], 0) + 1
+
+    queued = sorted(_local_queue.items(), key=lambda item: (item[1]["enqueued_at"], item[0]))
+    user_index: Dict[str, int] = {}
+    ranked = []
+    for queued_id, job in queued:
+        index = user_index.get(job["user"], 0)
+        ranked.append((user_running.get(job["user"], 0) + index, job["enqueued_at"], queued_id, job))
+        user_index[job["user"]] = index + 1
+    ranked.sort(key=lambda item: item[:3])
+
+    taken = len(_local_running)
+    for position, (_, _, queued_id, job) in enumerate(ranked, start=1):
+        eligible = (
+            taken < settings.ADMISSION_MAX_JOBS_PER_WORKER
+            and user_running.get(job["user"], 0) < settings.ADMISSION_MAX_JOBS_PER_USER
+        )
+        if queued_id == job_id:
+            if eligible:
+                _local_running[job_id] = _local_queue.pop(job_id)
+                return [1, 0, len(ranked) - 1]
+            return [0, position, len(ranked)]
+        if eligible:
+            taken += 1
+            user_running[job["user"]] = user_running.get(job["user"], 0) + 1
+    return [0, len(ranked), len(ranked)]
+
+
+async def _try_admit(job_id: str, job: Dict[str, Any]) -> List[int]:
+    """작업을 대기열에 올리고(또는 heartbeat를 갱신하고) 실행 가능하면 슬롯을 차지합니다."""
+    if db.redis_client and not job.get("local"):
+        try:
+            result = await db.redis_client.eval(
+                _ADMIT_SCRIPT, len(_ADMISSION_KEYS), *_ADMISSION_KEYS,
+                time.time(), job_id, json.dumps(job, ensure_ascii=False),
+                settings.ADMISSION_SLOT_TTL_SECONDS, settings.ADMISSION_QUEUE_TTL_SECONDS,
+                settings.ADMISSION_MAX_JOBS_CLUSTER, settings.ADMISSION_MAX_JOBS_PER_USER
+            )
+            return [int(value) for value in result]
+        except Exception as e:
+            # Redis 오류로 작업이 영원히 대기하지 않도록 워커 내부 대기열로 전환합니다.
+            logger.error(f"!!! [Admission] 슬롯 승인 중 Redis 오류 발생 ({job_id}), 워커 내부 대기열을 사용합니다: {e}")
+            job["local"] = True
+    _local_queue.setdefault(job_id, job)
+    return _local_try_admit(job_id)
+
+
+async def _release(job_id: str, job: Dict[str, Any]) -> None:
+    """슬롯(또는 대기열 자리)을 반납하고, 이 워커의 대기 작업을 깨웁니다."""
+    global _slot_released
+    _local_running.pop(job_id, None)
+    _local_queue.pop(job_id, None)
+    if db.redis_client and not job.get("local"):
+        try:
+            async with db.redis_client.pipeline(transaction=False) as pipe:
+                pipe.zrem(ADMISSION_RUNNING_KEY, job_id)
+                pipe.zrem(ADMISSION_QUEUE_KEY, job_id)
+                pipe.hdel(ADMISSION_JOBS_KEY, job_id)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"!!! [Admission] 슬롯 반납 중 오류 발생 ({job_id}): {e}")
+    _slot_released.set()
+    _slot_released = asyncio.Event()
+
+
+async def _set_queue_status(discussion_id: str, status: Optional[Dict[str, Any]]) -> None:
+    """대기 순번을 기록합니다. (None이면 삭제)"""
+    if status is None:
+        _local_queue_status.pop(discussion_id, None)
+    else:
+        _local_queue_status[discussion_id] = status
+    if not db.redis_client:
+        return
+    key = ADMISSION_QUEUE_STATUS_KEY.format(discussion_id=discussion_id)
+    try:
+        if status is None:
+            await db.redis_client.delete(key)
+        else:
+            await db.redis_client.set(key, json.dumps(status, ensure_ascii=False), ex=settings.ADMISSION_QUEUE_TTL_SECONDS)
+    except Exception as e:
+        logger.error(f"!!! [Admission] 대기 순번 기록 중 오류 발생 ({discussion_id}): {e}")
+
+
+async def get_queue_status(discussion_id: str) -> Optional[Dict[str, Any]]:
+    """토론의 작업이 대기 중이면 대기 순번 정보를 반환합니다. (대기 중이 아니면 None)"""
+    if discussion_id in _local_queue_status:
+        return _local_queue_status[discussion_id]
+    if not db.redis_client:
+        return None
+    try:
+        status = await db.redis_client.get(ADMISSION_QUEUE_STATUS_KEY.format(discussion_id=discussion_id))
+    except Exception as e:
+        logger.error(f"!!! [Admission] 대기 순번 조회 중 오류 발생 ({discussion_id}): {e}")
+        return None
+    return json.loads(status) if status else None
+
+
+async def count_user_jobs(user_email: str) -> int:
+    """사용자의 실행 중이거나 대기 중인 작업 수를 반환합니다."""
+    local_count = sum(1 for job in [*_local_running.values(), *_local_queue.values()] if job["user"] == user_email)
+    if not db.redis_client:
+        return local_count
+    try:
+        redis_count = await db.redis_client.eval(_COUNT_USER_JOBS_SCRIPT, len(_ADMISSION_KEYS), *_ADMISSION_KEYS, time.time(), user_email)
+    except Exception as e:
+        logger.error(f"!!! [Admission] 사용자 작업 수 조회 중 오류 발생 ({user_email}): {e}")
+        return local_count
+    return int(redis_count) + local_count
+
+
+async def release_discussion_slots(discussion_id: str) -> int:
+    """
+    토론의 작업이 차지한 슬롯과 대기열 자리를 즉시 반납합니다. (작업 취소 시)
+    다른 워커에서 실행 중이거나 비정상 종료된 작업의 슬롯이 만료 시간까지 남지 않도록 합니다.
+    """
+    global _slot_released
+    marker = f":{discussion_id}:"
+    released = [job_id for job_id in [*_local_running, *_local_queue] if marker in job_id]
+    for job_id in released:
+        _local_running.pop(job_id, None)
+        _local_queue.pop(job_id, None)
+    if db.redis_client:
+        try:
+            redis_jobs = [job_id for job_id in await db.redis_client.hkeys(ADMISSION_JOBS_KEY) if marker in job_id]
+            if redis_jobs:
+                async with db.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.zrem(ADMISSION_RUNNING_KEY, *redis_jobs)
+                    pipe.zrem(ADMISSION_QUEUE_KEY, *redis_jobs)
+                    pipe.hdel(ADMISSION_JOBS_KEY, *redis_jobs)
+                    await pipe.execute()
+                released.extend(redis_jobs)
+        except Exception as e:
+            logger.error(f"!!! [Admission] 토론 슬롯 반납 중 오류 발생 ({discussion_id}): {e}")
+    await _set_queue_status(discussion_id, None)
+    _slot_released.set()
+    _slot_released = asyncio.Event()
+    return len(released)
+
+
+async def _keep_slot_alive(job_id: str) -> None:
+    """실행 중인 작업의 슬롯 만료 시각을 주기적으로 연장합니다."""
+    interval = settings.ADMISSION_SLOT_TTL_SECONDS / 3
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await db.redis_client.zadd(ADMISSION_RUNNING_KEY, {job_id: time.time() + settings.ADMISSION_SLOT_TTL_SECONDS}, xx=True)
+        except Exception as e:
+            logger.error(f"!!! [Admission] 슬롯 연장 중 오류 발생 ({job_id}): {e}")
+
+
+@asynccontextmanager
+async def admission_slot(job_type: str, discussion_id: str, user_email: str):
+    """
+    작업 슬롯을 얻을 때까지 대기한 뒤 with 블록을 실행하고, 블록이 끝나면(실패/취소 포함) 슬롯을 반납합니다.
+    대기 중에는 대기 순번을 기록하여 /progress에서 조회할 수 있게 합니다.
+    """
+    job_id = f"{job_type}:{discussion_id}:{uuid.uuid4().hex[:8]}"
+    job = {
+        "user": user_email,
+        "worker": WORKER_ID,
+        "worker_cap": settings.ADMISSION_MAX_JOBS_PER_WORKER,
+        "enqueued_at": time.time(),
+        "job_type": job_type,
+        "discussion_id": discussion_id,
+    }
+    if not db.redis_client:
+        job["local"] = True
+
+    keepalive = None
+    queued_gauge = ADMISSION_QUEUED_JOBS.labels(job=job_type)
+    try:
+        with queued_gauge.track_inprogress():
+            started = time.perf_counter()
+            while True:
+                released = _slot_released
+                admitted, position, queue_length = await _try_admit(job_id, job)
+                if admitted:
+                    break
+                await _set_queue_status(discussion_id, {
+                    "job": job_type,
+                    "queue_position": position,
+                    "queue_length": queue_length,
+                    "waiting_seconds": round(time.perf_counter() - started, 1),
+                })
+                try:
+                    await asyncio.wait_for(released.wait(), timeout=settings.ADMISSION_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            waited = time.perf_counter() - started
+            ADMISSION_WAIT_SECONDS.labels(job=job_type).observe(waited)
+
+        if waited >= settings.ADMISSION_POLL_INTERVAL_SECONDS:
+            logger.info(f"--- [Admission] {job_type} 작업 승인 ({discussion_id}, 대기 {waited:.1f}초) ---")
+        await _set_queue_status(discussion_id, None)
+        if not job.get("local"):
+            keepalive = asyncio.create_task(_keep_slot_alive(job_id))
+        yield
+    finally:
+        if keepalive:
+            keepalive.cancel()
+        await _set_queue_status(discussion_id, None)
+        await _release(job_id, job)
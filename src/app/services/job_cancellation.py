@@ -0,0 +1,94 @@
+# src/app/services/job_cancellation.py
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Set
+
+from app import db
+from app.core.config import settings, logger
+from app.services.job_admission import admission_slot
+
+# --- 백그라운드 작업 취소 ---
+# 오케스트레이션/턴/보고서 작업은 별도의 asyncio 태스크로 실행되고, 토론 ID별로 등록됩니다.
+# POST /discussions/{id}/cancel 요청은 다음 두 방식으로 작업을 취소합니다.
+#   - 같은 워커에서 실행 중인 작업: 태스크를 바로 취소합니다.
+#   - 다른 워커에서 실행 중인 작업: Redis에 취소 요청 시각을 기록합니다.
+#     각 작업은 CANCEL_POLL_INTERVAL_SECONDS마다 이 값을 확인하고, 작업 시작 이후에 기록된 요청이면 스스로 취소합니다.
+# 취소는 대기 중인 LLM 호출(AgentExecutor, 도구 호출 포함)에 CancelledError로 전달됩니다.
+# 작업 슬롯과 턴 lease는 각 작업의 finally 블록에서 반납됩니다.
+CANCEL_REQUEST_KEY = "cancel_requested:{discussion_id}"
+
+# 이 워커에서 실행 중인 작업 태스크 (discussion_id -> 태스크 목록)
+_active_jobs: Dict[str, Set[asyncio.Task]] = {}
+
+
+def _cancel_task(task: asyncio.Task) -> bool:
+    """아직 취소 요청을 받지 않은 태스크만 취소합니다. (정리 작업 도중 다시 취소되지 않도록)"""
+    if task.done() or task.cancelling():
+        return False
+    task.cancel()
+    return True
+
+
+async def _watch_cancel_request(discussion_id: str, task: asyncio.Task, started_at: float) -> None:
+    """다른 워커에서 들어온 취소 요청을 주기적으로 확인합니다."""
+    key = CANCEL_REQUEST_KEY.format(discussion_id=discussion_id)
+    while not task.done():
+        await asyncio.sleep(settings.CANCEL_POLL_INTERVAL_SECONDS)
+        try:
+            requested_at = await db.redis_client.get(key)
+        except Exception as e:
+            logger.error(f"!!! [Cancellation] 취소 요청 확인 중 오류 발생 ({discussion_id}): {e}")
+            continue
+        if requested_at and float(requested_at) >= started_at:
+            logger.info(f"--- [Cancellation] 다른 워커의 취소 요청으로 작업을 취소합니다 ({discussion_id}) ---")
+            _cancel_task(task)
+            return
+
+
+async def run_background_job(job_type: str, discussion_id: str, user_email: str, func: Callable[..., Awaitable], *args) -> bool:
+    """
+    작업 슬롯을 얻은 뒤 func(*args)를 취소 가능한 태스크로 실행합니다.
+    작업이 끝까지 실행되면 True, 취소 요청으로 중단되면 False를 반환합니다.
+    """
+    async def admitted_job():
+        async with admission_slot(job_type, discussion_id, user_email):
+            await func(*args)
+
+    started_at = time.time()
+    task = asyncio.create_task(admitted_job())
+    _active_jobs.setdefault(discussion_id, set()).add(task)
+    watcher = asyncio.create_task(_watch_cancel_request(discussion_id, task, started_at)) if db.redis_client else None
+    try:
+        await task
+        return True
+    except asyncio.CancelledError:
+        # 이 함수를 실행한 쪽이 취소된 경우(서버 종료 등)에는 그대로 전파합니다.
+        if asyncio.current_task().cancelling():
+            raise
+        logger.info(f"--- [Cancellation] {job_type} 작업이 취소되었습니다 ({discussion_id}) ---")
+        return False
+    finally:
+        if watcher:
+            watcher.cancel()
+        jobs = _active_jobs.get(discussion_id)
+        if jobs is not None:
+            jobs.discard(task)
+            if not jobs:
+                _active_jobs.pop(discussion_id, None)
+
+
+async def request_cancellation(discussion_id: str) -> int:
+    """
+    토론의 실행 중/대기 중인 작업을 취소합니다.
+    이 워커에서 바로 취소한 작업 수를 반환합니다. (다른 워커의 작업은 Redis 취소 요청으로 중단됩니다.)
+    """
+    if db.redis_client:
+        try:
+            await db.redis_client.set(
+                CANCEL_REQUEST_KEY.format(discussion_id=discussion_id), time.time(),
+                ex=settings.CANCEL_REQUEST_TTL_SECONDS
+            )
+        except Exception as e:
+            logger.error(f"!!! [Cancellation] 취소 요청 기록 중 오류 발생 ({discussion_id}): {e}")
+    return sum(_cancel_task(task) for task in list(_active_jobs.get(discussion_id, ())))
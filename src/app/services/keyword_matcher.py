@@ -0,0 +1,103 @@
+# src/app/services/keyword_matcher.py
+
+import json
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+# 키워드/점수/아이콘 규칙 파일 (SNR 전문가, 정보 검증부, 에이전트 아이콘이 공유)
+# 이 모듈은 마이그레이션 스크립트에서도 import 하므로 app 내부 모듈에 의존하지 않습니다.
+KEYWORD_RULES_PATH = Path(__file__).resolve().parent.parent / "core" / "settings" / "keyword_rules.json"
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick 오토마톤 기반의 다중 키워드 매처.
+    생성 시 한 번만 오토마톤을 빌드하며, 이후 텍스트를 한 번 훑는 것으로
+    등록된 모든 키워드의 포함 여부를 찾습니다.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        # 중복을 제거하되 등록 순서는 유지합니다. (동점 처리 시 등록 순서를 우선)
+        self.keywords: List[str] = list(dict.fromkeys(k for k in keywords if k))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[int]] = [set()]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(set())
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state].add(index)
+
+        # BFS로 실패 링크를 만들고, 실패 경로의 출력을 미리 합쳐 둡니다.
+        # (루트의 자식 노드는 실패 링크가 루트이므로 그 다음 깊이부터 계산합니다.)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> List[str]:
+        """text에 포함된 키워드 목록을 등록 순서대로 반환합니다. (각 키워드는 한 번만)"""
+        if not text or not self.keywords:
+            return []
+        found: Set[int] = set()
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+                if len(found) == len(self.keywords):
+                    break
+        return [self.keywords[index] for index in sorted(found)]
+
+    def find_many(self, texts: Iterable[str]) -> List[List[str]]:
+        """여러 텍스트를 한 번에 검사합니다."""
+        return [self.find(text) for text in texts]
+
+
+@lru_cache(maxsize=1)
+def load_keyword_rules() -> dict:
+    """규칙 파일을 (최초 1회) 읽어 반환합니다."""
+    with open(KEYWORD_RULES_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=1)
+def get_icon_matcher() -> KeywordMatcher:
+    return KeywordMatcher(load_keyword_rules()["icons"]["map"])
+
+
+def get_icon_for_agent(agent_data: dict) -> str:
+    """
+    에이전트의 이름과 프롬프트를 기반으로 가장 적합한 아이콘 '하나'를 반환합니다.
+    일치하는 키워드가 여러 개일 경우, 가장 긴 키워드를 우선합니다.
+    """
+    icons = load_keyword_rules()["icons"]
+    matcher = get_icon_matcher()
+
+    # 1순위: 이름, 2순위: 프롬프트에서 가장 길게 일치하는 키워드
+    for text in (agent_data.get("name", ""), agent_data.get("prompt", "")):
+        matches = matcher.find(text)
+        if matches:
+            return icons["map"][max(matches, key=len)]
+
+    # 3순위: 기본 아이콘 반환
+    return icons["default"]
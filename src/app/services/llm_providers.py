@@ -0,0 +1,43 @@
+# src/app/services/llm_providers.py
+
+import importlib
+from typing import Any, Dict, Tuple
+
+from app.core.config import logger
+
+# --- LLM 공급자 레지스트리 ---
+# 모델 이름 접두어 -> (모듈 경로, 클래스 이름)
+# 공급자 SDK(LangChain 통합 패키지)는 무겁기 때문에, 해당 공급자의 모델이 처음 필요할 때 import 합니다.
+PROVIDER_REGISTRY: Dict[str, Tuple[str, str]] = {
+    "gemini": ("langchain_google_genai", "ChatGoogleGenerativeAI"),
+    "gpt": ("langchain_openai", "ChatOpenAI"),
+    "claude": ("langchain_anthropic", "ChatAnthropic"),
+}
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+_loaded_classes: Dict[str, Any] = {}
+
+
+def _load_provider_class(prefix: str):
+    """접두어에 해당하는 채팅 모델 클래스를 (최초 1회) import 하여 반환합니다."""
+    if prefix not in _loaded_classes:
+        # LLM을 처음 사용하는 시점에 사용량 기록 콜백 훅도 함께 등록합니다.
+        import app.services.usage_tracker  # noqa: F401
+
+        module_path, class_name = PROVIDER_REGISTRY[prefix]
+        _loaded_classes[prefix] = getattr(importlib.import_module(module_path), class_name)
+        logger.info(f"--- [LLM Providers] '{module_path}' 공급자를 로드했습니다. ---")
+    return _loaded_classes[prefix]
+
+
+def get_chat_model(model: str, **kwargs: Any):
+    """
+    모델 이름을 기반으로 올바른 LangChain 채팅 모델 인스턴스를 생성합니다.
+    알 수 없는 모델 이름이면 기본 모델(gemini-2.5-flash)을 사용합니다.
+    """
+    for prefix in PROVIDER_REGISTRY:
+        if model.startswith(prefix):
+            return _load_provider_class(prefix)(model=model, **kwargs)
+
+    logger.warning(f"--- [LLM Providers] 알 수 없는 모델 '{model}'. 기본 모델({DEFAULT_MODEL})을 사용합니다. ---")
+    return _load_provider_class("gemini")(model=DEFAULT_MODEL, **kwargs)
@@ -0,0 +1,92 @@
+# src/app/services/login_throttle.py
+
+import asyncio
+from typing import Optional
+
+from app import db
+from app.core.config import settings, logger
+
+# --- 로그인 시도 제한 ---
+# 실패 횟수는 (계정, 클라이언트 IP) 쌍마다 LOGIN_THROTTLE_WINDOW_SECONDS 동안 셉니다.
+# 허용 횟수(LOGIN_FREE_FAILURES)를 넘기면 그 쌍에 대해서만 재시도 대기 시간이 지수적으로 늘어나므로,
+# 다른 곳에서 실패를 반복해도 정상 사용자의 로그인은 막히지 않습니다.
+# IP별로는 전체 시도 횟수를 고정 윈도우로 셉니다. (클라이언트 IP는 TRUSTED_PROXY_IPS의 프록시 헤더로 확인합니다.)
+# Redis를 사용할 수 없으면 제한 없이 통과시킵니다.
+FAILURES_KEY = "login_failures:{email}:{ip}"
+BACKOFF_KEY = "login_backoff:{email}:{ip}"
+IP_ATTEMPTS_KEY = "login_attempts:ip:{ip}"
+
+# 워커당 동시에 비밀번호 검증을 수행하는 로그인 요청 수
+login_semaphore = asyncio.Semaphore(settings.LOGIN_MAX_CONCURRENCY)
+
+
+def _pair_keys(email: str, ip: Optional[str]):
+    values = {"email": email.lower(), "ip": ip or "unknown"}
+    return FAILURES_KEY.format(**values), BACKOFF_KEY.format(**values)
+
+
+def _backoff_seconds(failures: int) -> int:
+    """허용 횟수를 넘긴 실패마다 대기 시간을 두 배로 늘립니다. (최대 LOGIN_BACKOFF_MAX_SECONDS)"""
+    excess = failures - settings.LOGIN_FREE_FAILURES
+    if excess <= 0:
+        return 0
+    return min(settings.LOGIN_BACKOFF_BASE_SECONDS * 2 ** min(excess - 1, 16), settings.LOGIN_BACKOFF_MAX_SECONDS)
+
+
+async def check_login_throttle(email: str, ip: Optional[str]) -> Optional[int]:
+    """
+    이번 로그인 시도를 기록하고, 제한을 초과했다면 재시도까지 남은 시간(초)을 반환합니다.
+    제한 이내이면 None을 반환합니다.
+    """
+    if not db.redis_client:
+        return None
+
+    _, backoff_key = _pair_keys(email, ip)
+    ip_key = IP_ATTEMPTS_KEY.format(ip=ip or "unknown")
+    window = settings.LOGIN_THROTTLE_WINDOW_SECONDS
+    try:
+        async with db.redis_client.pipeline(transaction=False) as pipe:
+            # 윈도우 시작 시점에만 TTL이 설정되도록 SET NX 후 INCR 합니다.
+            pipe.set(ip_key, 0, ex=window, nx=True)
+            pipe.incr(ip_key)
+            pipe.ttl(backoff_key)
+            pipe.ttl(ip_key)
+            _, ip_attempts, backoff_ttl, ip_ttl = await pipe.execute()
+    except Exception as e:
+        logger.error(f"!!! [Login Throttle] 시도 횟수 확인 중 오류 발생 ({email}): {e}")
+        return None
+
+    if backoff_ttl > 0:
+        logger.warning(f"--- [Login Throttle] 계정 '{email}' (IP '{ip}')의 로그인 실패가 반복되어 {backoff_ttl}초 동안 재시도를 막습니다. ---")
+        return int(backoff_ttl)
+    if ip_attempts > settings.LOGIN_MAX_ATTEMPTS_PER_IP:
+        logger.warning(f"--- [Login Throttle] IP '{ip}'의 로그인 시도 횟수가 제한을 초과했습니다. ---")
+        return max(int(ip_ttl), 1)
+    return None
+
+
+async def record_login_failure(email: str, ip: Optional[str]) -> None:
+    """(계정, IP)의 로그인 실패 횟수를 1 증가시키고, 허용 횟수를 넘겼으면 재시도 대기 시간을 설정합니다."""
+    if not db.redis_client:
+        return
+    failures_key, backoff_key = _pair_keys(email, ip)
+    try:
+        async with db.redis_client.pipeline(transaction=False) as pipe:
+            pipe.set(failures_key, 0, ex=settings.LOGIN_THROTTLE_WINDOW_SECONDS, nx=True)
+            pipe.incr(failures_key)
+            _, failures = await pipe.execute()
+        backoff = _backoff_seconds(failures)
+        if backoff:
+            await db.redis_client.set(backoff_key, failures, ex=backoff)
+    except Exception as e:
+        logger.error(f"!!! [Login Throttle] 실패 횟수 기록 중 오류 발생 ({email}): {e}")
+
+
+async def reset_login_failures(email: str, ip: Optional[str]) -> None:
+    """로그인 성공 시 (계정, IP)의 실패 횟수와 재시도 대기 시간을 초기화합니다."""
+    if not db.redis_client:
+        return
+    try:
+        await db.redis_client.delete(*_pair_keys(email, ip))
+    except Exception as e:
+        logger.error(f"!!! [Login Throttle] 실패 횟수 초기화 중 오류 발생 ({email}): {e}")
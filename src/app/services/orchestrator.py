@@ -7,7 +7,7 @@ from typing import List, Dict, Tuple
 from fastapi import UploadFile
 
 from beanie.operators import In
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.services.llm_providers import get_chat_model
 from langchain_core.prompts import ChatPromptTemplate
 
 from app.core.config import settings, logger
@@ -22,9 +22,11 @@ from app.schemas.orchestration import (
     AgentDetail
 )
 
-from app.tools.search import perform_web_search_async
+from app.tools.registry import run_tool
 from app.services.document_processor import process_uploaded_file
 from app.services.summarizer import summarize_text
+from app.services.keyword_matcher import get_icon_for_agent
+from app.services.execution_profiles import ExecutionProfile
 from app import db
 
 # --- 역할 기반 상수 정의 ---
@@ -56,45 +58,6 @@ async def _update_progress(discussion_id: str, stage: str, message: str, progres
         # Redis 오류가 전체 프로세스를 중단시키지 않도록 로그만 남김
         logger.error(f"Failed to update progress for {discussion_id}: {e}")
 
-# --- 아이콘 생성을 위한 헬퍼 함수 및 상수 ---
-ICON_MAP = {
-    # 역할/직업
-    "재판관": "🧑", "분석가": "📊", "경제": "🌍", "산업": "🏭", "재무": "💹",
-    "트렌드": "📈", "비판": "🤔", "전문가": "🧑", "미시": "🛒", "미래학자": "🔭",
-    "물리학": "⚛️", "양자": "🌀", "의학": "⚕️", "심리학": "🧠", "뇌과학": "⚡️",
-    "문학": "✍️", "역사": "🏛️", "생물학": "🧬", "법의학": "🔬", "법률": "⚖️",
-    "회계": "🧾", "인사": "👥", "인류학": "🗿", "IT": "💻", "개발": "👨‍💻",
-    # 고유명사/인물
-    "버핏": "👴", "린치": "👨‍💼", "잡스": "💡", "머스크": "🚀", "베이조스": "📦",
-    "웰치": "🏆", "아인슈타인": "🌌",
-    # 기타 키워드
-    "선정": "📋", "분석": "🔎"
-}
-DEFAULT_ICON = "🧑"
-
-def _get_icon_for_agent(agent_data: dict) -> str:
-    """
-    에이전트의 이름과 프롬프트를 기반으로 가장 적합한 아이콘 '하나'를 반환합니다.
-    일치하는 키워드가 여러 개일 경우, 가장 긴 키워드를 우선합니다.
-    """
-    name = agent_data.get("name", "")
-    prompt = agent_data.get("prompt", "")
-
-    # 1순위: 이름에서 가장 길게 일치하는 키워드 찾기
-    name_matches = [keyword for keyword in ICON_MAP if keyword in name]
-    if name_matches:
-        best_match = max(name_matches, key=len)
-        return ICON_MAP[best_match]
-
-    # 2순위: 프롬프트에서 가장 길게 일치하는 키워드 찾기
-    prompt_matches = [keyword for keyword in ICON_MAP if keyword in prompt]
-    if prompt_matches:
-        best_match = max(prompt_matches, key=len)
-        return ICON_MAP[best_match]
-
-    # 3순위: 기본 아이콘 반환
-    return DEFAULT_ICON
-
 # --- DB에서 Active 상태의 에이전트를 조회하는 함수 ---
 async def get_active_agents_from_db() -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
     """
@@ -131,7 +94,7 @@ async def analyze_topic(topic: str, special_agents: Dict[str, Dict], discussion_
 
     logger.info(f"--- [DEBUG] Calling 'analyze_topic' LLM with model: '{analyst_config.get('model')}' ---")
 
-    llm = ChatGoogleGenerativeAI(
+    llm = get_chat_model(
         model=analyst_config["model"],
         temperature=analyst_config["temperature"],
         google_api_key=settings.GOOGLE_API_KEY
@@ -148,7 +111,7 @@ async def analyze_topic(topic: str, special_agents: Dict[str, Dict], discussion_
     # LLM 호출 시 config에 태그 추가
     report = await chain.ainvoke(
         {"topic": topic},
-        config={"tags": [f"discussion_id:{discussion_id}"]}
+        config={"tags": [f"discussion_id:{discussion_id}", f"agent_name:{TOPIC_ANALYST_NAME}"]}
     )
 
     await _update_progress(discussion_id, "주제 분석 완료", f"핵심 쟁점 {len(report.core_keywords)}개를 발견했습니다", 25)
@@ -198,7 +161,7 @@ async def _get_web_evidence(report: IssueAnalysisReport, topic: str, discussion_
     await _update_progress(discussion_id, "자료 수집", f"'{keywords_preview}' 키워드로 웹 검색 중...", 35)
 
     search_query = f"{topic}: {', '.join(report.core_keywords)}"
-    search_results = await perform_web_search_async(search_query) # 웹 검색 자체는 LLM 호출이 아님
+    search_results = await run_tool("web_search", query=search_query) # 웹 검색 자체는 LLM 호출이 아님
 
     if not search_results:
         await _update_progress(discussion_id, "자료 수집", "웹 검색 결과가 없습니다", 45)
@@ -270,9 +233,12 @@ def _load_available_agents() -> List[Dict[str, str]]:
     except FileNotFoundError:
         raise ValueError("에이전트 설정 파일(app/core/settings/agents.json)을 찾을 수 없습니다.")
 
-async def select_debate_team(report: IssueAnalysisReport, jury_pool: Dict, special_agents: Dict, discussion_id: str) -> DebateTeam:
+async def select_debate_team(
+    report: IssueAnalysisReport, jury_pool: Dict, special_agents: Dict, discussion_id: str, profile: ExecutionProfile
+) -> DebateTeam:
     """
     분석 보고서를 기반으로 AI 배심원단을 선정하고, 필요 시 새로운 에이전트를 생성한 후 재판관을 지정합니다.
+    배심원 수와 배심원 모델은 토론의 실행 프로필을 따릅니다.
     """
     print(f"--- [Orchestrator] 3단계: 배심원단 선정 시작 (ID: {discussion_id}) ---")
     await _update_progress(discussion_id, "전문가 선정", "토론에 적합한 AI 전문가를 선정하고 있습니다...", 75)
@@ -291,7 +257,7 @@ async def select_debate_team(report: IssueAnalysisReport, jury_pool: Dict, speci
     You are a master moderator and an expert talent scout assembling a panel of AI experts for a debate. Your primary goal is to create the most insightful and diverse debate panel possible for the given topic.
 
     **Your Tasks:**
-    1.  **Select from Existing Experts:** From the `Available Expert Agents Pool`, select the 4 to 6 most relevant experts.
+    1.  **Select from Existing Experts:** From the `Available Expert Agents Pool`, select the {profile.min_jurors} to {profile.max_jurors} most relevant experts.
     2.  **Propose New Experts:** Critically evaluate your selection. If you believe a crucial perspective is missing, propose 1 to 2 new, highly specific expert roles that do not exist in the current pool. The proposed role names must be in KOREAN. **The names should be concise and simple, without any parentheses or repeated phrases (e.g., use '여론조사 전문가', not '여론조사 전문가(여론조사 전문가)').**
     3.  **Provide Justification:** Write a concise reason explaining your selections and any new proposals, detailing why this specific combination of experts is optimal for the given debate topic. The justification must be written in KOREAN.
 
@@ -303,7 +269,7 @@ async def select_debate_team(report: IssueAnalysisReport, jury_pool: Dict, speci
 
     logger.info(f"--- [DEBUG] Calling 'select_debate_team' LLM with model: '{selector_config.get('model')}' ---")
 
-    llm = ChatGoogleGenerativeAI(
+    llm = get_chat_model(
         model=selector_config["model"],
         temperature=selector_config["temperature"],
         google_api_key=settings.GOOGLE_API_KEY
@@ -350,14 +316,17 @@ async def select_debate_team(report: IssueAnalysisReport, jury_pool: Dict, speci
         )
 
     newly_created_agents = []
-    if selected_jury.new_agent_proposals:
-        for agent_name in selected_jury.new_agent_proposals:
+    # 실행 프로필의 최대 배심원 수를 넘지 않도록 기존 전문가 선택 후 남는 자리만큼만 신규 에이전트를 만듭니다.
+    selected_agent_names = [name for name in selected_jury.selected_agents if name in jury_pool][:profile.max_jurors]
+    open_seats = profile.max_jurors - len(selected_agent_names)
+    if selected_jury.new_agent_proposals and open_seats > 0:
+        for agent_name in selected_jury.new_agent_proposals[:open_seats]:
             existing_agent = await AgentSettings.find_one(AgentSettings.name == agent_name)
             if not existing_agent:
                 agent_prompt = PROMPT_TEMPLATE.format(role=agent_name)
 
                 agent_info_for_icon = {"name": agent_name, "prompt": agent_prompt}
-                selected_icon = _get_icon_for_agent(agent_info_for_icon)
+                selected_icon = get_icon_for_agent(agent_info_for_icon)
 
                 # 신규 에이전트 설정에서 'tools' 필드 완전 삭제
                 new_agent_config = AgentConfig(
@@ -381,13 +350,20 @@ async def select_debate_team(report: IssueAnalysisReport, jury_pool: Dict, speci
 
                 newly_created_agents.append(AgentDetail(**{"name": agent_name, **new_agent_config.model_dump()}))
 
-    final_jury_details = [AgentDetail(**jury_pool[name]) for name in selected_jury.selected_agents if name in jury_pool]
+    final_jury_details = [AgentDetail(**jury_pool[name]) for name in selected_agent_names]
     final_jury_details.extend(newly_created_agents)
 
     if CRITICAL_AGENT_NAME in jury_pool and not any(agent.name == CRITICAL_AGENT_NAME for agent in final_jury_details):
         print(f"--- [규칙 적용] '{CRITICAL_AGENT_NAME}'이 누락되어 강제로 추가합니다. ---")
+        # 최대 배심원 수를 유지하기 위해 마지막 배심원과 교체합니다.
+        final_jury_details = final_jury_details[:profile.max_jurors - 1]
         final_jury_details.append(AgentDetail(**jury_pool[CRITICAL_AGENT_NAME]))
 
+    # 실행 프로필에 배심원 모델이 지정되어 있으면 모든 배심원에게 적용합니다. (턴 실행 시 사용자 모델 선택이 우선)
+    if profile.models.get("juror"):
+        for agent in final_jury_details:
+            agent.model = profile.models["juror"]
+
     final_jury_names = [agent.name for agent in final_jury_details]
     if final_jury_names:
         await AgentSettings.find_many(
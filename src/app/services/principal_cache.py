@@ -0,0 +1,154 @@
+# src/app/services/principal_cache.py
+
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app import db
+from app.core.config import settings, logger
+from app.core.metrics import CACHE_REQUESTS
+from app.schemas.user import Principal
+
+# --- 인증 주체(Principal) 캐시 ---
+# 인증이 필요한 모든 요청(진행 상황 폴링, SSE 포함)마다 MongoDB에서 사용자를 조회하지 않도록
+# 토큰의 subject(이메일)를 키로 사용자 정보를 2단계로 캐시합니다.
+#   1단계: 워커 프로세스 내 TTL LRU (짧은 TTL, 다른 워커의 무효화는 TTL 만료로 반영)
+#   2단계: Redis (`principal:{email}`), crud.user.update_user/delete_user 에서 즉시 삭제
+# 무효화할 때마다 사용자의 세대(`principal_generation:{email}`)를 올리고, 캐시 채우기는
+# DB 조회 전에 읽어 둔 세대가 그대로일 때만 기록합니다. 따라서 무효화 직전에 읽은 사용자 정보
+# (강등 전 권한, 삭제된 사용자)가 무효화 이후에 다시 캐시되지 않습니다.
+# 비밀번호 해시는 캐시하지 않습니다.
+PRINCIPAL_KEY = "principal:{email}"
+PRINCIPAL_GENERATION_KEY = "principal_generation:{email}"
+
+# 세대가 채우기 시작 시점과 같을 때만 캐시에 기록합니다. (세대 키가 없으면 "0")
+_CONDITIONAL_SET_SCRIPT = """
+if (redis.call('get', KEYS[2]) or '0') == ARGV[1] then
+    redis.call('set', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+class _LocalPrincipalCache:
+    """프로세스 내 TTL + LRU 캐시"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        # 이 프로세스에서 무효화가 일어날 때마다 증가합니다.
+        self.epoch = 0
+
+    def get(self, email: str) -> Optional[Principal]:
+        entry = self._entries.get(email)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(email, None)
+            return None
+        self._entries.move_to_end(email)
+        return principal
+
+    def set(self, email: str, principal: Principal) -> None:
+        self._entries[email] = (time.monotonic() + self.ttl_seconds, principal)
+        self._entries.move_to_end(email)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, email: str) -> None:
+        self._entries.pop(email, None)
+        # 진행 중인 채우기가 무효화 이전 정보를 다시 넣지 않도록 세대를 올립니다.
+        self.epoch += 1
+
+
+_local_cache = _LocalPrincipalCache(
+    max_size=settings.PRINCIPAL_LOCAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_LOCAL_CACHE_TTL_SECONDS,
+)
+
+
+async def get_cached_principal(email: str) -> Optional[Principal]:
+    """캐시된 인증 주체를 조회합니다. (프로세스 내 캐시 -> Redis 순)"""
+    principal = _local_cache.get(email)
+    if principal is not None:
+        CACHE_REQUESTS.labels(cache="principal_local", result="hit").inc()
+        return principal
+    CACHE_REQUESTS.labels(cache="principal_local", result="miss").inc()
+
+    if not db.redis_client:
+        return None
+    epoch = _local_cache.epoch
+    try:
+        cached = await db.redis_client.get(PRINCIPAL_KEY.format(email=email))
+    except Exception as e:
+        logger.error(f"!!! [Principal Cache] 캐시 조회 중 오류 발생 ({email}): {e}")
+        return None
+    if cached is None:
+        CACHE_REQUESTS.labels(cache="principal", result="miss").inc()
+        return None
+
+    CACHE_REQUESTS.labels(cache="principal", result="hit").inc()
+    principal = Principal.model_validate_json(cached)
+    if _local_cache.epoch == epoch:
+        _local_cache.set(email, principal)
+    return principal
+
+
+async def get_principal_generation(email: str) -> Tuple[int, Optional[str]]:
+    """
+    캐시를 채우기 전(DB 조회 전)에 호출합니다. 반환값을 cache_principal에 그대로 넘깁니다.
+    (프로세스 내 무효화 세대, Redis의 사용자 세대) 쌍이며, Redis를 사용할 수 없으면 두 번째 값은 None입니다.
+    """
+    epoch = _local_cache.epoch
+    if not db.redis_client:
+        return epoch, None
+    try:
+        generation = await db.redis_client.get(PRINCIPAL_GENERATION_KEY.format(email=email))
+    except Exception as e:
+        logger.error(f"!!! [Principal Cache] 세대 조회 중 오류 발생 ({email}): {e}")
+        return epoch, None
+    return epoch, generation or "0"
+
+
+async def cache_principal(principal: Principal, generation: Tuple[int, Optional[str]]) -> None:
+    """
+    인증 주체를 두 단계 캐시에 저장합니다.
+    generation(get_principal_generation의 반환값) 이후에 무효화가 있었으면 저장하지 않습니다.
+    """
+    epoch, redis_generation = generation
+    if redis_generation is not None:
+        try:
+            stored = await db.redis_client.eval(
+                _CONDITIONAL_SET_SCRIPT, 2,
+                PRINCIPAL_KEY.format(email=principal.email),
+                PRINCIPAL_GENERATION_KEY.format(email=principal.email),
+                redis_generation, principal.model_dump_json(), settings.PRINCIPAL_CACHE_TTL_SECONDS
+            )
+        except Exception as e:
+            logger.error(f"!!! [Principal Cache] 캐시 저장 중 오류 발생 ({principal.email}): {e}")
+            return
+        if not stored:
+            logger.info(f"--- [Principal Cache] 조회 중에 무효화되어 캐시하지 않습니다 ({principal.email}) ---")
+            return
+    if _local_cache.epoch == epoch:
+        _local_cache.set(principal.email, principal)
+
+
+async def invalidate_principal(email: str) -> None:
+    """사용자 정보가 바뀌거나 삭제되었을 때 캐시를 무효화하고, 진행 중인 채우기가 기록되지 않도록 세대를 올립니다."""
+    _local_cache.pop(email)
+    if not db.redis_client:
+        return
+    generation_key = PRINCIPAL_GENERATION_KEY.format(email=email)
+    try:
+        async with db.redis_client.pipeline(transaction=True) as pipe:
+            pipe.incr(generation_key)
+            # 채우기는 수 밀리초 안에 끝나므로 세대 키는 캐시 TTL 동안만 유지합니다.
+            pipe.expire(generation_key, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+            pipe.delete(PRINCIPAL_KEY.format(email=email))
+            await pipe.execute()
+    except Exception as e:
+        logger.error(f"!!! [Principal Cache] 캐시 무효화 중 오류 발생 ({email}): {e}")
@@ -0,0 +1,171 @@
+# src/app/services/profiling.py
+
+import asyncio
+import gzip
+import random
+import time
+import weakref
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pyinstrument import Profiler
+
+from app import db
+from app.core.config import settings, logger
+from app.models.discussion import DiscussionLog, ProfileReport
+
+# 현재 코루틴이 속한 프로파일링 세션. 태스크 생성 시 컨텍스트가 복사되므로
+# 파이프라인 안에서 만들어진 하위 태스크들도 같은 세션으로 집계됩니다.
+_current_session: ContextVar[Optional["TaskTimingRecorder"]] = ContextVar("ameet_profiling_session", default=None)
+
+# 프로파일링 HTML 출력을 저장하는 GridFS 버킷 이름
+PROFILE_HTML_BUCKET = "profile_reports"
+
+# task factory를 이미 설치한 이벤트 루프 (루프당 한 번만 설치)
+_instrumented_loops: "weakref.WeakSet[asyncio.AbstractEventLoop]" = weakref.WeakSet()
+
+
+class TaskTimingRecorder:
+    """프로파일링 세션 동안 생성된 asyncio 태스크의 생성~완료 시간을 코루틴 이름별로 모읍니다."""
+
+    def __init__(self):
+        self._timings: Dict[str, Dict[str, float]] = defaultdict(lambda: {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+
+    def track(self, task: asyncio.Task) -> None:
+        coro = task.get_coro()
+        name = getattr(coro, "__qualname__", None) or task.get_name()
+        started = time.perf_counter()
+
+        def _on_done(_: asyncio.Task) -> None:
+            elapsed = time.perf_counter() - started
+            timing = self._timings[name]
+            timing["count"] += 1
+            timing["total_seconds"] += elapsed
+            timing["max_seconds"] = max(timing["max_seconds"], elapsed)
+
+        task.add_done_callback(_on_done)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """총 소요 시간이 큰 순서로 정렬된 코루틴별 요약을 반환합니다."""
+        return sorted(
+            ({"coroutine": name, **timing} for name, timing in self._timings.items()),
+            key=lambda item: item["total_seconds"],
+            reverse=True
+        )
+
+
+def _install_task_factory(loop: asyncio.AbstractEventLoop) -> None:
+    """
+    태스크 생성 시점에 현재 프로파일링 세션이 있으면 해당 태스크를 기록하도록 task factory를 감쌉니다.
+    세션이 없는 태스크는 ContextVar 조회 한 번 외에는 추가 비용이 없습니다.
+    """
+    if loop in _instrumented_loops:
+        return
+    previous_factory = loop.get_task_factory()
+
+    def _factory(loop, coro, **kwargs):
+        if previous_factory is not None:
+            task = previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        recorder = _current_session.get()
+        if recorder is not None:
+            recorder.track(task)
+        return task
+
+    loop.set_task_factory(_factory)
+    _instrumented_loops.add(loop)
+
+
+async def _resolve_trigger(discussion_id: str, enabled: Optional[bool]) -> Optional[str]:
+    """이번 실행을 프로파일링할지 결정합니다. 토론별 설정이 샘플링보다 우선합니다."""
+    if enabled is None:
+        document = await DiscussionLog.get_motor_collection().find_one(
+            {"discussion_id": discussion_id}, {"profiling_enabled": 1}
+        )
+        enabled = bool(document and document.get("profiling_enabled"))
+    if enabled:
+        return "discussion"
+    if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+        return "sampling"
+    return None
+
+
+def _profile_bucket() -> AsyncIOMotorGridFSBucket:
+    db_name = settings.MONGO_DB_URL.split("/")[-1].split("?")[0]
+    return AsyncIOMotorGridFSBucket(db.mongo_client[db_name], bucket_name=PROFILE_HTML_BUCKET)
+
+
+async def _store_profile_html(filename: str, html_report: str) -> str:
+    """HTML 출력을 gzip으로 압축하여 GridFS에 저장하고 파일 ID를 반환합니다. (압축은 스레드에서 수행)"""
+    compressed = await asyncio.to_thread(gzip.compress, html_report.encode("utf-8"))
+    file_id = await _profile_bucket().upload_from_stream(
+        filename, compressed, metadata={"encoding": "gzip"}
+    )
+    return str(file_id)
+
+
+async def load_profile_html(report: ProfileReport) -> Optional[str]:
+    """프로파일링 결과의 HTML 출력을 GridFS에서 읽어 반환합니다. 저장된 파일이 없으면 None을 반환합니다."""
+    if not report.html_report_file_id:
+        return None
+    stream = await _profile_bucket().open_download_stream(ObjectId(report.html_report_file_id))
+    compressed = await stream.read()
+    return (await asyncio.to_thread(gzip.decompress, compressed)).decode("utf-8")
+
+
+@asynccontextmanager
+async def profile_pipeline(
+    discussion_id: str,
+    pipeline: str,
+    turn_number: Optional[int] = None,
+    enabled: Optional[bool] = None
+):
+    """
+    백그라운드 파이프라인을 pyinstrument로 프로파일링하고, 하위 asyncio 태스크 소요 시간과 함께
+    'profile_reports' 컬렉션에 저장합니다. 프로파일링 대상이 아니면 아무 것도 하지 않습니다.
+
+    enabled를 넘기지 않으면 DiscussionLog의 profiling_enabled 값을 조회합니다.
+    """
+    trigger = await _resolve_trigger(discussion_id, enabled)
+    if trigger is None:
+        yield
+        return
+
+    _install_task_factory(asyncio.get_running_loop())
+    recorder = TaskTimingRecorder()
+    session_token = _current_session.set(recorder)
+    profiler = Profiler(interval=settings.PROFILING_INTERVAL_SECONDS, async_mode="enabled")
+    started = time.perf_counter()
+    logger.info(f"--- [Profiling] {pipeline} 프로파일링 시작 (ID: {discussion_id}, trigger: {trigger}) ---")
+
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        _current_session.reset(session_token)
+        duration = time.perf_counter() - started
+        try:
+            # 출력 렌더링은 호출 트리 크기에 비례하는 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 수행합니다.
+            html_output = await asyncio.to_thread(profiler.output_html)
+            text_output = await asyncio.to_thread(profiler.output_text, unicode=True, color=False)
+            html_report_file_id = await _store_profile_html(f"profile_{discussion_id}_{pipeline}.html", html_output)
+            await ProfileReport(
+                discussion_id=discussion_id,
+                pipeline=pipeline,
+                turn_number=turn_number,
+                trigger=trigger,
+                duration_seconds=duration,
+                text_report=text_output,
+                html_report_file_id=html_report_file_id,
+                task_timings=recorder.summary()
+            ).insert()
+            logger.info(f"--- [Profiling] {pipeline} 프로파일링 결과 저장 완료 (ID: {discussion_id}, {duration:.2f}s) ---")
+        except Exception as e:
+            # 프로파일링 결과 저장 실패가 파이프라인 결과에 영향을 주지 않도록 로그만 남김
+            logger.error(f"!!! [Profiling] 프로파일링 결과 저장 중 오류 발생 ({discussion_id}): {e}", exc_info=True)
@@ -1,19 +1,24 @@
 # src/app/services/report_generator.py
 
 import asyncio
+import html
 import json
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import re
 
 from app.core.config import logger, settings
+from app.core.metrics import track_in_flight
+from app.core.tracing import start_span
+from app.services.profiling import profile_pipeline
+from app.services.execution_profiles import get_discussion_profile
+from app.services.job_cancellation import run_background_job
 from app.models.discussion import DiscussionLog, AgentSettings
-from app.tools.search import get_stock_price_async, get_economic_data_async
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.tools.registry import run_tool
+from app.services.llm_providers import get_chat_model
 from langchain_core.prompts import ChatPromptTemplate
-import weasyprint
-from google.cloud import storage
 from app.schemas.report import ReportStructure, ChartRequest, ResolverOutput, ReportOutline, ValidatedChartPlan
+from app.services.result_cache import build_cache_key, make_digest, get_cached_result, set_cached_result
 from pydantic import BaseModel, ValidationError
 
 class ChartRelevance(BaseModel):
@@ -129,29 +134,75 @@ async def _resolve_and_plan_chart(entity: str) -> Optional[ChartRequest]:
 
 # --- AI 에이전트 호출을 위한 보조 함수 ---
 
-async def _run_llm_agent(agent_name: str, prompt_text: str, input_data: Dict, output_schema=None) -> Any:
-    """ 특정 AI 에이전트를 호출하는 범용 함수"""
+async def _run_llm_agent(
+    agent_name: str,
+    prompt_text: str,
+    input_data: Dict,
+    output_schema=None,
+    cache_ttl: Optional[int] = None,
+    discussion_id: Optional[str] = None,
+    model: Optional[str] = None
+) -> Any:
+    """
+    특정 AI 에이전트를 호출하는 범용 함수.
+    cache_ttl이 주어지면 (에이전트 버전, 프롬프트, 모델, 입력 내용)의 해시를 키로 결과를 캐시하여,
+    재시도나 재생성 시 동일한 입력에 대해 LLM을 다시 호출하지 않습니다.
+    model이 주어지면 에이전트 설정의 모델 대신 사용합니다. (실행 프로필의 보고서 모델)
+    """
     agent_setting = await AgentSettings.find_one(
-        AgentSettings.name == agent_name, 
+        AgentSettings.name == agent_name,
         AgentSettings.status == "active"
     )
     if not agent_setting:
         raise ValueError(f"'{agent_name}' 에이전트를 DB에서 찾을 수 없습니다.")
+    model_name = model or agent_setting.config.model
+
+    formatted_input = prompt_text.format(**input_data)
+
+    cache_key = None
+    if cache_ttl:
+        cache_key = build_cache_key(
+            "llm_agent",
+            agent_name,
+            agent_setting.version,
+            model_name,
+            agent_setting.config.temperature,
+            make_digest(agent_setting.config.prompt),
+            output_schema.__name__ if output_schema else "text",
+            make_digest(formatted_input)
+        )
+        cached = await get_cached_result(cache_key)
+        if cached is not None:
+            logger.info(f"--- [Report-Cache] Reusing cached result for agent '{agent_name}' ---")
+            return output_schema.model_validate(cached) if output_schema else cached
 
     # llm 인스턴스 생성을 한번만 하도록 단순화
-    llm = ChatGoogleGenerativeAI(
-        model=agent_setting.config.model,
+    llm = get_chat_model(
+        model=model_name,
         temperature=agent_setting.config.temperature
     )
-    
+
     chain = ChatPromptTemplate.from_messages([("system", agent_setting.config.prompt), ("human", "{input}")])
-    
+
     # output_schema가 제공되면 .with_structured_output()을 사용, 아니면 일반 LLM 호출
     try:
         final_chain = chain | llm.with_structured_output(output_schema) if output_schema else chain | llm
-        response = await final_chain.ainvoke({"input": prompt_text.format(**input_data)})
-        return response if output_schema else response.content
-        
+        # 사용량 기록(llm_usage)을 위해 토론 ID와 에이전트 이름을 태그로 전달합니다.
+        tags = [f"agent_name:{agent_name}", "task:report"]
+        if discussion_id:
+            tags.insert(0, f"discussion_id:{discussion_id}")
+        response = await final_chain.ainvoke({"input": formatted_input}, config={"tags": tags})
+        result = response if output_schema else response.content
+
+        # 정상적으로 생성된 결과만 캐시에 저장합니다.
+        if cache_key and result:
+            await set_cached_result(
+                cache_key,
+                result.model_dump() if output_schema else result,
+                cache_ttl
+            )
+        return result
+
     except ValidationError as e:
         # [핵심] 오류 발생 시, 어떤 에이전트에서 어떤 상세 오류가 났는지 명확하게 로깅합니다.
         logger.error(f"--- [Pydantic ValidationError] Agent '{agent_name}' failed validation. ---")
@@ -174,7 +225,12 @@ async def _plan_report_structure(discussion_log: DiscussionLog) -> ReportStructu
     input_data1 = {"topic": discussion_log.topic, "transcript": transcript_str}
     
     # 1. 창의적인 개요와 차트 '아이디어' 생성
-    outline_plan = await _run_llm_agent("Report Outline Generator", prompt1, input_data1, output_schema=ReportOutline)
+    outline_plan = await _run_llm_agent(
+        "Report Outline Generator", prompt1, input_data1,
+        output_schema=ReportOutline,
+        cache_ttl=settings.REPORT_CACHE_TTL_SECONDS,
+        discussion_id=discussion_log.discussion_id
+    )
 
     # 'chart_worthy_entities'를 사용하도록 변경
     logger.info(f"--- [Report-Debug] Outline Generator's Chart Entities: {outline_plan.chart_worthy_entities if outline_plan else 'None'} ---")
@@ -238,10 +294,8 @@ async def _create_charts_data(chart_requests: List[ChartRequest], discussion_id:
             raw_data = None
 
             # 1. 계획에 명시된 도구 실행
-            if tool_name == 'get_stock_price':
-                raw_data = await get_stock_price_async(**tool_args)
-            elif tool_name == 'get_economic_data':
-                raw_data = await get_economic_data_async(**tool_args)
+            if tool_name in ('get_stock_price', 'get_economic_data'):
+                raw_data = await run_tool(tool_name, **tool_args)
 
             # 2. 데이터 조회 결과 검증
             if not raw_data:
@@ -287,7 +341,7 @@ async def _create_charts_data(chart_requests: List[ChartRequest], discussion_id:
             
     return charts_data
 
-async def _generate_final_html(structured_data: Dict, discussion_id: str) -> str:
+async def _generate_final_html(structured_data: Dict, discussion_id: str, model: Optional[str] = None) -> str:
     """ Infographic Report Agent를 호출하여 최종 정적 HTML을 생성합니다."""
     logger.info(f"--- [Report-Step3] Running Infographic Report Agent for {discussion_id} ---")
 
@@ -296,15 +350,71 @@ async def _generate_final_html(structured_data: Dict, discussion_id: str) -> str
     input_data = {"json_data": json.dumps(structured_data, ensure_ascii=False, indent=2)}
     
     # LLM으로부터 순수 HTML 문자열을 받음
-    html_content = await _run_llm_agent("Infographic Report Agent", prompt, input_data)
+    # 동일한 구조화 데이터에 대해서는 캐시된 HTML을 재사용합니다.
+    html_content = await _run_llm_agent(
+        "Infographic Report Agent", prompt, input_data,
+        cache_ttl=settings.REPORT_CACHE_TTL_SECONDS,
+        discussion_id=discussion_id,
+        model=model
+    )
     
     # LLM 응답에 포함될 수 있는 마크다운 코드 블록 제거
     match = re.search(r"```(html)?\s*(<!DOCTYPE html>.*)```", html_content, re.DOTALL)
     return match.group(2).strip() if match else html_content.strip()
 
+def _render_summary_html(structured_data: Dict) -> str:
+    """
+    실행 프로필의 report_mode가 'summary'일 때 사용합니다.
+    Infographic Report Agent(LLM) 호출 없이 보고서 개요를 고정 템플릿으로 렌더링합니다.
+    """
+    def _list_section(title: str, items: List[str]) -> str:
+        if not items:
+            return ""
+        lis = "\n".join(f"<li>{html.escape(item)}</li>" for item in items)
+        return f"""
+        <section class="mb-8">
+            <div class="bg-white p-6 rounded-xl shadow-md">
+                <h2 class="text-2xl font-bold text-gray-800 mb-4">{title}</h2>
+                <ul class="list-disc pl-6 space-y-2 text-slate-700">{lis}</ul>
+            </div>
+        </section>"""
+
+    round_items = [
+        f"{'모두 변론' if summary.get('turn_number') == 0 else str(summary.get('turn_number')) + '차 토론'} - "
+        f"{summary['critical_utterance'].get('agent_name')}: {summary['critical_utterance'].get('message')}"
+        for summary in structured_data.get("round_summaries", []) if summary.get("critical_utterance")
+    ]
+    subtitle = structured_data.get("subtitle")
+    return f"""<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8">
+    <title>{html.escape(structured_data.get("title", ""))}</title>
+    <script src="https://cdn.tailwindcss.com"></script>
+</head>
+<body class="bg-slate-50 p-8 max-w-4xl mx-auto">
+    <header class="mb-10 text-center">
+        <h1 class="text-4xl font-bold text-gray-900">{html.escape(structured_data.get("title", ""))}</h1>
+        {f'<p class="mt-2 text-lg text-slate-600">{html.escape(subtitle)}</p>' if subtitle else ""}
+    </header>
+    {_list_section("I. 핵심 요약", [structured_data.get("executive_summary", "")])}
+    {_list_section("II. 주요 찬성 논거", structured_data.get("pro_arguments", []))}
+    {_list_section("III. 주요 반대 논거", structured_data.get("con_arguments", []))}
+    {_list_section("IV. 라운드별 결정적 발언", round_items)}
+    {_list_section("결론 및 제언", [structured_data.get("overall_conclusion", "")])}
+</body>
+</html>"""
+
+def _render_pdf(report_html: str) -> bytes:
+    """보고서 HTML을 PDF로 변환합니다. weasyprint(시스템 라이브러리 의존)는 PDF 생성 시점에만 import 합니다."""
+    import weasyprint
+    return weasyprint.HTML(string=report_html).write_pdf()
+
 async def _upload_to_gcs(pdf_bytes: bytes, discussion_id: str) -> str:
     """생성된 PDF를 Google Cloud Storage에 업로드하고 공개 URL을 반환합니다."""
     try:
+        # google-cloud-storage는 업로드 시점에만 필요하므로 여기서 import 합니다.
+        from google.cloud import storage
         storage_client = storage.Client()
         bucket = storage_client.bucket(settings.GCS_BUCKET_NAME)
         blob_name = f"reports/{discussion_id}.pdf"
@@ -319,14 +429,32 @@ async def _upload_to_gcs(pdf_bytes: bytes, discussion_id: str) -> str:
 
 # --- 메인 보고서 생성 파이프라인 ---
 
-async def generate_report_background(discussion_id: str):
-    """[메인 오케스트레이터] 새로운 파이프라인을 적용한 보고서 생성 전체 흐름"""
+async def generate_report_background(discussion_id: str, user_email: str):
+    """
+    [메인 오케스트레이터] 새로운 파이프라인을 적용한 보고서 생성 전체 흐름 (작업 슬롯을 얻은 뒤 실행, 취소 가능)
+    취소되더라도 이미 생성된 개요/본문은 결과 캐시에 남아 있으므로 다시 요청하면 재사용됩니다.
+    """
+    await run_background_job("report", discussion_id, user_email, _generate_report, discussion_id)
+
+@track_in_flight("report")
+async def _generate_report(discussion_id: str):
+    """generate_report_background의 본문. 작업 슬롯 대기 시간을 실행 중 작업 수에서 제외하기 위해 분리되어 있습니다."""
+    with start_span("discussion.report", discussion_id=discussion_id):
+        async with profile_pipeline(discussion_id, "report"):
+            await _generate_report_pipeline(discussion_id)
+
+async def _generate_report_pipeline(discussion_id: str):
+    """generate_report_background의 본문. 보고서 생성 전체를 하나의 span으로 묶기 위해 분리되어 있습니다."""
     logger.info(f"--- [Report BG Task] Started for Discussion ID: {discussion_id} ---")
     discussion_log = await DiscussionLog.find_one(DiscussionLog.discussion_id == discussion_id)
     if not discussion_log:
         logger.error(f"!!! DiscussionLog not found for ID: {discussion_id}")
         return
 
+    # 실행 프로필의 보고서 방식과 보고서 모델
+    profile = get_discussion_profile(discussion_log)
+    report_model = profile.models.get("report")
+
     try:
         # 1단계: 보고서 텍스트 개요 및 차트 대상 '개체' 목록 생성
         transcript_str = "\n".join([f"{t['agent_name']}: {t['message']}" for t in discussion_log.transcript])
@@ -334,7 +462,10 @@ async def generate_report_background(discussion_id: str):
             "Report Outline Generator",
             "Topic: {topic}\n\nFull Transcript:\n{transcript}",
             {"topic": discussion_log.topic, "transcript": transcript_str},
-            output_schema=ReportOutline
+            output_schema=ReportOutline,
+            cache_ttl=settings.REPORT_CACHE_TTL_SECONDS,
+            discussion_id=discussion_id,
+            model=report_model
         )
         if not outline_plan:
             raise ValueError("Report Outline Generator failed to produce an outline.")
@@ -356,8 +487,11 @@ async def generate_report_background(discussion_id: str):
         # charts_data = await _create_charts_data(chart_requests, discussion_id)
         # structured_data['charts_data'] = charts_data
 
-        # 4단계 : 최종 HTML 본문 생성
-        report_body_html = await _generate_final_html(structured_data, discussion_id)
+        # 4단계 : 최종 HTML 본문 생성 (summary 모드는 LLM 호출 없이 고정 템플릿으로 렌더링)
+        if profile.report_mode == "summary":
+            report_body_html = _render_summary_html(structured_data)
+        else:
+            report_body_html = await _generate_final_html(structured_data, discussion_id, report_model)
 
         # 5단계 : 참여자 발언 전문 HTML 섹션 생성
         participant_map = {p['name']: p for p in discussion_log.participants}
@@ -366,7 +500,7 @@ async def generate_report_background(discussion_id: str):
         
         for turn in discussion_log.transcript:
             agent_name = turn.get("agent_name")
-            if agent_name in ["SNR 전문가", "정보 검증부", "구분선", "사회자"]:
+            if agent_name in ["SNR 전문가", "정보 검증부", "팩트체커", "구분선", "사회자"]:
                 continue
 
             icon = participant_map.get(agent_name, {}).get('icon', '🤖')
@@ -397,7 +531,7 @@ async def generate_report_background(discussion_id: str):
         final_report_html = report_body_html.replace("</body>", f"{full_transcript_section}</body>") if "</body>" in report_body_html else report_body_html + full_transcript_section
         
         # 7단계 (기존): PDF 변환 및 GCS 업로드
-        #pdf_bytes = weasyprint.HTML(string=final_report_html).write_pdf()
+        #pdf_bytes = _render_pdf(final_report_html)
         #pdf_url = await _upload_to_gcs(pdf_bytes, discussion_id)
 
         # 8단계 (기존): DB 업데이트
@@ -405,11 +539,24 @@ async def generate_report_background(discussion_id: str):
         #discussion_log.pdf_url = pdf_url
         discussion_log.pdf_url = f"/api/v1/discussions/{discussion_id}/report/html"
         discussion_log.status = "completed"
-        await discussion_log.save()
+        # 보고서 생성 도중 토론이 취소되었으면('report_generating'이 아니면) 결과를 기록하지 않습니다.
+        result = await DiscussionLog.get_motor_collection().update_one(
+            {"discussion_id": discussion_id, "status": "report_generating"},
+            {"$set": {
+                "report_html": discussion_log.report_html,
+                "pdf_url": discussion_log.pdf_url,
+                "status": discussion_log.status
+            }}
+        )
+        if not result.matched_count:
+            logger.info(f"--- [Report BG Task] {discussion_id} was cancelled before the report could be saved. ---")
+            return
         logger.info(f"--- [Report BG Task] Successfully completed for {discussion_id} ---")
 
     except Exception as e:
         logger.error(f"!!! [Report BG Task] FAILED for ID: {discussion_id}. Error: {e}", exc_info=True)
         if discussion_log:
-            discussion_log.status = "failed"
-            await discussion_log.save()
\ No newline at end of file
+            await DiscussionLog.get_motor_collection().update_one(
+                {"discussion_id": discussion_id, "status": "report_generating"},
+                {"$set": {"status": "failed"}}
+            )
\ No newline at end of file
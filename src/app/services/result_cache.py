@@ -0,0 +1,59 @@
+# src/app/services/result_cache.py
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from app import db
+from app.core.config import logger
+from app.core.metrics import CACHE_REQUESTS
+
+# --- 콘텐츠 주소 기반(Content-addressed) 결과 캐시 ---
+# 입력값의 해시를 키로 사용하므로, 입력이 같으면 언제든 같은 결과를 재사용할 수 있습니다.
+CACHE_KEY_PREFIX = "result_cache"
+
+def make_digest(*parts: Any) -> str:
+    """주어진 값들을 안정적으로 직렬화한 뒤 SHA-256 해시(hex)를 반환합니다."""
+    hasher = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, ensure_ascii=False, sort_keys=True, default=str)
+        hasher.update(part.encode("utf-8"))
+        hasher.update(b"\x1f")  # 구분자: ('ab', 'c')와 ('a', 'bc')가 같은 해시가 되지 않도록 함
+    return hasher.hexdigest()
+
+def build_cache_key(namespace: str, *parts: Any) -> str:
+    """네임스페이스와 입력값의 해시로 Redis 캐시 키를 생성합니다."""
+    return f"{CACHE_KEY_PREFIX}:{namespace}:{make_digest(*parts)}"
+
+def _namespace_of(key: str) -> str:
+    """캐시 키에서 네임스페이스를 추출합니다. (지표 라벨용)"""
+    parts = key.split(":")
+    return parts[1] if len(parts) > 2 and parts[0] == CACHE_KEY_PREFIX else "other"
+
+async def get_cached_result(key: str) -> Optional[Any]:
+    """캐시된 결과를 조회합니다. 캐시가 없거나 Redis 오류 시 None을 반환합니다."""
+    if not db.redis_client:
+        return None
+    try:
+        cached = await db.redis_client.get(key)
+        if cached is None:
+            CACHE_REQUESTS.labels(cache=_namespace_of(key), result="miss").inc()
+            return None
+        CACHE_REQUESTS.labels(cache=_namespace_of(key), result="hit").inc()
+        logger.info(f"--- [Result Cache] HIT: {key} ---")
+        return json.loads(cached)
+    except Exception as e:
+        # 캐시 오류가 본 작업을 중단시키지 않도록 로그만 남김
+        logger.error(f"!!! [Result Cache] 캐시 조회 중 오류 발생 ({key}): {e}")
+        return None
+
+async def set_cached_result(key: str, value: Any, ttl_seconds: int) -> None:
+    """결과를 JSON으로 직렬화하여 TTL과 함께 캐시에 저장합니다."""
+    if not db.redis_client:
+        return
+    try:
+        await db.redis_client.set(key, json.dumps(value, ensure_ascii=False, default=str), ex=ttl_seconds)
+        logger.info(f"--- [Result Cache] STORE: {key} (TTL: {ttl_seconds}s) ---")
+    except Exception as e:
+        logger.error(f"!!! [Result Cache] 캐시 저장 중 오류 발생 ({key}): {e}")
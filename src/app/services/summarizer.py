@@ -1,6 +1,6 @@
 # src/app/services/summarizer.py
 
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.services.llm_providers import get_chat_model
 from langchain_core.prompts import ChatPromptTemplate
 from app.core.config import settings, logger
 
@@ -14,7 +14,7 @@ async def summarize_text(content: str, topic: str, discussion_id: str) -> str:
     
     logger.info(f"--- [DEBUG] Calling 'summarize_text' LLM with hardcoded model: 'gemini-2.5-flash' ---")
 
-    llm = ChatGoogleGenerativeAI(
+    llm = get_chat_model(
         model="gemini-2.5-flash", 
         temperature=0.0, 
         google_api_key=settings.GOOGLE_API_KEY
@@ -37,7 +37,7 @@ async def summarize_text(content: str, topic: str, discussion_id: str) -> str:
             "topic": topic,
             "content": content[:8000]
         },
-        config={"tags": [f"discussion_id:{discussion_id}"]}
+        config={"tags": [f"discussion_id:{discussion_id}", "task:summarize_evidence"]}
     )
 
     return summary_result.content
\ No newline at end of file
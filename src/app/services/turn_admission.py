@@ -0,0 +1,96 @@
+# src/app/services/turn_admission.py
+
+import json
+import uuid
+from typing import Any, Dict, Optional
+
+from app import db
+from app.core.config import settings, logger
+
+# --- 턴 실행 승인 (중복 실행 방지) ---
+# 턴 시작 요청은 다음 세 단계를 거쳐야 실행됩니다. (api/v1/discussions.py: execute_discussion_turn)
+#   1. Idempotency-Key: 같은 키로 재전송된 요청은 첫 요청의 응답을 그대로 돌려받고, 턴을 다시 시작하지 않습니다.
+#   2. 턴 lease: `turn_lease:{discussion_id}`를 SET NX로 잡은 요청만 진행합니다. 턴이 끝나면 execute_turn이 해제합니다.
+#   3. MongoDB 조건부 갱신: status와 turn_number가 읽은 값 그대로일 때만 turn_inprogress로 바꿉니다.
+# Redis를 사용할 수 없으면 1, 2단계는 건너뛰고 MongoDB 조건부 갱신만으로 중복을 막습니다.
+TURN_LEASE_KEY = "turn_lease:{discussion_id}"
+TURN_IDEMPOTENCY_KEY = "turn_idempotency:{discussion_id}:{key}"
+
+# lease를 잡은 요청의 토큰과 일치할 때만 삭제합니다. (만료 후 다른 요청이 잡은 lease를 지우지 않도록)
+_RELEASE_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+async def acquire_turn_lease(discussion_id: str) -> Optional[str]:
+    """
+    토론의 턴 lease를 획득하고 lease 토큰을 반환합니다.
+    이미 다른 턴이 lease를 잡고 있으면 None을 반환합니다. (Redis를 사용할 수 없으면 빈 문자열)
+    """
+    if not db.redis_client:
+        return ""
+    token = uuid.uuid4().hex
+    try:
+        acquired = await db.redis_client.set(
+            TURN_LEASE_KEY.format(discussion_id=discussion_id), token,
+            nx=True, ex=settings.TURN_LEASE_TTL_SECONDS
+        )
+    except Exception as e:
+        logger.error(f"!!! [Turn Admission] lease 획득 중 오류 발생 ({discussion_id}): {e}")
+        return ""
+    return token if acquired else None
+
+
+async def release_turn_lease(discussion_id: str, token: Optional[str]) -> None:
+    """acquire_turn_lease로 얻은 lease를 해제합니다."""
+    if not db.redis_client or not token:
+        return
+    try:
+        await db.redis_client.eval(_RELEASE_LEASE_SCRIPT, 1, TURN_LEASE_KEY.format(discussion_id=discussion_id), token)
+    except Exception as e:
+        logger.error(f"!!! [Turn Admission] lease 해제 중 오류 발생 ({discussion_id}): {e}")
+
+
+async def force_release_turn_lease(discussion_id: str) -> None:
+    """토큰과 관계없이 토론의 턴 lease를 해제합니다. (작업 취소 시, 다른 워커가 잡은 lease 포함)"""
+    if not db.redis_client:
+        return
+    try:
+        await db.redis_client.delete(TURN_LEASE_KEY.format(discussion_id=discussion_id))
+    except Exception as e:
+        logger.error(f"!!! [Turn Admission] lease 강제 해제 중 오류 발생 ({discussion_id}): {e}")
+
+
+async def claim_idempotency_key(discussion_id: str, key: Optional[str], response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Idempotency-Key에 이번 요청의 응답을 기록합니다.
+    같은 키로 먼저 처리된 요청이 있으면 그 응답을 반환하고, 처음 보는 키이면 None을 반환합니다.
+    """
+    if not db.redis_client or not key:
+        return None
+    redis_key = TURN_IDEMPOTENCY_KEY.format(discussion_id=discussion_id, key=key)
+    try:
+        claimed = await db.redis_client.set(
+            redis_key, json.dumps(response, ensure_ascii=False),
+            nx=True, ex=settings.TURN_IDEMPOTENCY_TTL_SECONDS
+        )
+        if claimed:
+            return None
+        previous = await db.redis_client.get(redis_key)
+    except Exception as e:
+        logger.error(f"!!! [Turn Admission] Idempotency-Key 처리 중 오류 발생 ({discussion_id}): {e}")
+        return None
+    return json.loads(previous) if previous else None
+
+
+async def forget_idempotency_key(discussion_id: str, key: Optional[str]) -> None:
+    """턴이 승인되지 않은 요청의 Idempotency-Key를 지워, 같은 키로 다시 시도할 수 있게 합니다."""
+    if not db.redis_client or not key:
+        return
+    try:
+        await db.redis_client.delete(TURN_IDEMPOTENCY_KEY.format(discussion_id=discussion_id, key=key))
+    except Exception as e:
+        logger.error(f"!!! [Turn Admission] Idempotency-Key 삭제 중 오류 발생 ({discussion_id}): {e}")
@@ -0,0 +1,223 @@
+# src/app/services/usage_tracker.py
+
+import asyncio
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+from app.core.config import logger
+from app.core.metrics import LLM_CALL_SECONDS, LLM_TOKENS
+from app.core.tracing import open_span, close_span
+from app.models.discussion import LLMUsage, LLMUsageDaily
+
+# --- 비용 계산을 위한 모델별 단가표 (USD per 1M tokens) ---
+TOKEN_PRICING_MAP = {
+    # Google (Gemini)
+    "gemini-2.5-pro": {"input": 1.25, "output": 10.0},       # 200K 초과시 input $2.50, output $15.0
+    "gemini-2.5-flash": {"input": 0.30, "output": 2.50},
+
+    # OpenAI (GPT)
+    "gpt-4o": {"input": 2.5, "output": 10.0},
+    "gpt-4o-mini": {"input": 0.15, "output": 0.6},
+    "gpt-4-turbo": {"input": 10.0, "output": 30.0},
+    "gpt-4": {"input": 30.0, "output": 60.0},
+    "gpt-3.5-turbo": {"input": 0.5, "output": 1.5},
+
+    # Anthropic (Claude)
+    "claude-opus-4-1-20250805": {"input": 15.0, "output": 75.0},
+    "claude-opus-4-20250514": {"input": 3.0, "output": 15.0},
+    "claude-3-5-haiku-20241022": {"input": 0.8, "output": 4.0},
+    "claude-3-7-sonnet-20250219": {"input": 3.0, "output": 15.0},
+    "claude-3-5-sonnet-20241022": {"input": 3.0, "output": 15.0},
+    "claude-3-haiku-20240307": {"input": 0.25, "output": 1.25}
+}
+
+def calculate_cost(model_name: str, input_tokens: int, output_tokens: int) -> float:
+    # 가장 길게 일치하는 접두어를 사용합니다. (예: 'gpt-4o-mini'가 'gpt-4o'나 'gpt-4'로 계산되지 않도록)
+    matches = [key for key in TOKEN_PRICING_MAP if model_name.startswith(key)]
+    if not matches: return 0.0
+    pricing = TOKEN_PRICING_MAP[max(matches, key=len)]
+    input_cost = (input_tokens / 1_000_000) * pricing["input"]
+    output_cost = (output_tokens / 1_000_000) * pricing["output"]
+    return input_cost + output_cost
+
+
+def _parse_tags(tags: Optional[List[str]]) -> Dict[str, str]:
+    """'discussion_id:...', 'agent_name:...', 'turn:...', 'task:...' 형식의 태그를 딕셔너리로 변환합니다."""
+    parsed = {}
+    for tag in tags or []:
+        key, sep, value = tag.partition(":")
+        if sep and key not in parsed:
+            parsed[key] = value
+    return parsed
+
+
+def _extract_token_usage(response: LLMResult) -> Dict[str, int]:
+    """
+    LLM 응답에서 입력/출력 토큰 수와 프롬프트 캐시 토큰 수를 추출합니다. (LangChain 표준 usage_metadata 우선)
+    cache_read: 공급자 프롬프트 캐시에서 읽은 입력 토큰, cache_creation: 캐시에 새로 기록된 입력 토큰 (Claude)
+    """
+    input_tokens = output_tokens = cache_read_tokens = cache_creation_tokens = 0
+    for generation_list in response.generations:
+        for generation in generation_list:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+                details = usage.get("input_token_details") or {}
+                cache_read_tokens += details.get("cache_read", 0) or 0
+                cache_creation_tokens += details.get("cache_creation", 0) or 0
+
+    # usage_metadata가 없는 모델은 llm_output의 token_usage를 사용합니다.
+    if not input_tokens and not output_tokens and response.llm_output:
+        token_usage = response.llm_output.get("token_usage") or response.llm_output.get("usage") or {}
+        input_tokens = token_usage.get("prompt_tokens", token_usage.get("input_tokens", 0)) or 0
+        output_tokens = token_usage.get("completion_tokens", token_usage.get("output_tokens", 0)) or 0
+
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cache_read_tokens": cache_read_tokens,
+        "cache_creation_tokens": cache_creation_tokens,
+    }
+
+
+async def record_usage(record: LLMUsage) -> None:
+    """사용량 원본 레코드를 저장하고, 일자/모델별 사전 집계(rollup)를 갱신합니다."""
+    try:
+        await LLMUsage.get_motor_collection().insert_one(record.model_dump(exclude={"id"}))
+        await LLMUsageDaily.get_motor_collection().update_one(
+            {"date": record.start_time.strftime("%Y-%m-%d"), "model_name": record.model_name},
+            {"$inc": {
+                "call_count": 1,
+                "input_tokens": record.input_tokens,
+                "output_tokens": record.output_tokens,
+                "cache_read_tokens": record.cache_read_tokens,
+                "total_cost_usd": record.cost_usd
+            }},
+            upsert=True
+        )
+    except Exception as e:
+        # 사용량 기록 실패가 토론 진행을 방해하지 않도록 로그만 남김
+        logger.error(f"!!! [Usage Tracker] 사용량 기록 중 오류 발생: {e}", exc_info=True)
+
+
+class UsageCallbackHandler(AsyncCallbackHandler):
+    """
+    모든 LLM 호출의 시작/종료 시점을 받아 토큰, 모델, 지연 시간, 토론 ID, 에이전트를
+    로컬 'llm_usage' 컬렉션에 기록하는 LangChain 콜백 핸들러.
+    DB 기록은 별도 태스크로 처리하여 LLM 호출 경로를 지연시키지 않습니다.
+    """
+
+    def __init__(self):
+        self._runs: Dict[UUID, Dict[str, Any]] = {}
+        self._pending_writes: Set[asyncio.Task] = set()
+
+    def _start_run(self, run_id: UUID, serialized: Optional[Dict[str, Any]], tags, metadata, invocation_params) -> None:
+        metadata = metadata or {}
+        invocation_params = invocation_params or {}
+        model_name = (
+            metadata.get("ls_model_name")
+            or invocation_params.get("model")
+            or invocation_params.get("model_name")
+            or (serialized or {}).get("kwargs", {}).get("model")
+            or "unknown"
+        )
+        parsed_tags = _parse_tags(tags)
+        model_name = str(model_name).removeprefix("models/")
+        self._runs[run_id] = {
+            "start_time": datetime.utcnow(),
+            "started": time.perf_counter(),
+            "tags": parsed_tags,
+            "model_name": model_name,
+            # 호출 시점의 현재 span(배심원 발언, 분석 작업 등) 아래에 LLM 호출 span을 엽니다.
+            "span": open_span(
+                "llm.call",
+                model=model_name,
+                discussion_id=parsed_tags.get("discussion_id"),
+                agent_name=parsed_tags.get("agent_name"),
+                task=parsed_tags.get("task")
+            )
+        }
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs) -> None:
+        self._start_run(run_id, serialized, tags, metadata, kwargs.get("invocation_params"))
+
+    async def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs) -> None:
+        self._start_run(run_id, serialized, tags, metadata, kwargs.get("invocation_params"))
+
+    async def on_llm_error(self, error, *, run_id, parent_run_id=None, tags=None, **kwargs) -> None:
+        run = self._runs.pop(run_id, None)
+        if run:
+            close_span(run["span"], error=error)
+
+    async def on_llm_end(self, response: LLMResult, *, run_id, parent_run_id=None, tags=None, **kwargs) -> None:
+        run = self._runs.pop(run_id, None)
+        if not run:
+            return
+
+        latency_ms = (time.perf_counter() - run["started"]) * 1000
+        run_tags = run["tags"]
+        usage = _extract_token_usage(response)
+
+        model_name = run["model_name"]
+        if model_name == "unknown" and response.llm_output:
+            model_name = response.llm_output.get("model_name") or response.llm_output.get("model") or model_name
+
+        close_span(
+            run["span"],
+            input_tokens=usage["input_tokens"],
+            output_tokens=usage["output_tokens"],
+            cache_read_tokens=usage["cache_read_tokens"]
+        )
+        LLM_CALL_SECONDS.labels(model=model_name).observe(latency_ms / 1000)
+        LLM_TOKENS.labels(model=model_name, direction="input").inc(usage["input_tokens"])
+        LLM_TOKENS.labels(model=model_name, direction="output").inc(usage["output_tokens"])
+        LLM_TOKENS.labels(model=model_name, direction="cache_read").inc(usage["cache_read_tokens"])
+        if usage["cache_read_tokens"] or usage["cache_creation_tokens"]:
+            logger.info(
+                f"--- [Usage Tracker] 프롬프트 캐시 ({model_name}, {run_tags.get('agent_name') or run_tags.get('task')}): "
+                f"입력 {usage['input_tokens']} 토큰 중 캐시 적중 {usage['cache_read_tokens']}, 캐시 기록 {usage['cache_creation_tokens']} ---"
+            )
+
+        turn = run_tags.get("turn")
+        record = LLMUsage(
+            discussion_id=run_tags.get("discussion_id"),
+            stage=run_tags.get("task") or run_tags.get("agent_name") or "unknown",
+            agent_name=run_tags.get("agent_name") or run_tags.get("task"),
+            turn_number=int(turn) if turn and turn.isdigit() else None,
+            model_name=model_name,
+            input_tokens=usage["input_tokens"],
+            output_tokens=usage["output_tokens"],
+            total_tokens=usage["input_tokens"] + usage["output_tokens"],
+            cache_read_tokens=usage["cache_read_tokens"],
+            cache_creation_tokens=usage["cache_creation_tokens"],
+            cost_usd=calculate_cost(model_name, usage["input_tokens"], usage["output_tokens"]),
+            latency_ms=latency_ms,
+            start_time=run["start_time"]
+        )
+
+        try:
+            task = asyncio.get_running_loop().create_task(record_usage(record))
+        except RuntimeError:
+            # 이벤트 루프 밖(동기 호출 경로)에서는 기록을 생략합니다.
+            logger.warning(f"--- [Usage Tracker] 실행 중인 이벤트 루프가 없어 사용량 기록을 건너뜁니다. (model: {model_name}) ---")
+            return
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+
+# --- 전역 등록 ---
+# LangChain의 configure hook에 등록하면, 각 호출부에서 callbacks를 넘기지 않아도
+# 모든 LLM/Chat 모델 호출에 이 핸들러가 자동으로 연결됩니다. (LangSmith 트레이서와 같은 방식)
+usage_callback_handler = UsageCallbackHandler()
+usage_handler_var: ContextVar[Optional[UsageCallbackHandler]] = ContextVar(
+    "ameet_usage_handler", default=usage_callback_handler
+)
+register_configure_hook(usage_handler_var, inheritable=True)
@@ -1,46 +1,212 @@
 # src/app/services/utility_agents.py
 
+import asyncio
 import json
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-def run_snr_agent(source_text: str) -> dict | None:
-    """
-    SNR 전문가 에이전트 (규칙 기반) - 특정 키워드가 있을 때만 작동하여 신호 대 잡음비를 평가합니다.
-    """
-    trigger_keywords = ["보고서", "데이터", "%", "달러", "만 명", "로이터", "블룸버그", "AP", "뉴스", "기사", "출처", "조선일보", "주간조선"]
-    if not any(keyword in source_text for keyword in trigger_keywords):
+from app.core.config import settings, logger
+from app.core.tracing import traced
+from app.models.discussion import AgentSettings
+from app.schemas.discussion import FactCheckResult
+from app.services.keyword_matcher import KeywordMatcher, load_keyword_rules
+
+
+@lru_cache(maxsize=1)
+def _get_staff_matcher() -> KeywordMatcher:
+    """SNR 전문가와 정보 검증부의 키워드를 모두 담은 매처 (최초 1회 빌드)"""
+    rules = load_keyword_rules()
+    keywords = list(rules["snr"]["trigger_keywords"])
+    for rule in rules["snr"]["rules"]:
+        keywords.extend(rule["keywords"])
+    keywords.extend(rules["verifier"]["strong_claims"])
+    return KeywordMatcher(keywords)
+
+
+def _evaluate_snr(matched: Set[str]) -> dict | None:
+    """메시지에서 찾은 키워드 집합으로 SNR 점수를 계산합니다."""
+    snr_rules = load_keyword_rules()["snr"]
+    if not matched.intersection(snr_rules["trigger_keywords"]):
         return None
-    
-    score = 50
+
+    score = snr_rules["base_score"]
     reasons = []
-    if "보고서에 따르면" in source_text or "데이터에 따르면" in source_text:
-        score += 25
-        reasons.append("명시적 데이터/보고서 인용")
-    if "%" in source_text or "달러" in source_text or "만 명" in source_text:
-        score = min(100, score + 25)
-        reasons.append("구체적 수치 포함")
-    if any(k in source_text for k in ["로이터", "블룸버그", "AP", "조선일보", "주간조선"]):
-        score = min(100, score + 30)
-        reasons.append("신뢰도 높은 언론사 인용")
-    
+    for rule in snr_rules["rules"]:
+        if matched.intersection(rule["keywords"]):
+            score += rule["score"]
+            if rule.get("cap") is not None:
+                score = min(rule["cap"], score)
+            reasons.append(rule["label"])
+
     if not reasons:
-        reasons.append("일반적 주장")
-        score -= 20
-        
+        reasons.append(snr_rules["no_reason_label"])
+        score -= snr_rules["no_reason_penalty"]
+
     return {"snr_score": max(0, score), "reason": ", ".join(reasons)}
 
-def run_verifier_agent(statement: str) -> dict | None:
-    """
-    정보 검증부 에이전트 (규칙 기반) - 모든 발언에 대해 작동하며, 단정적 표현 사용 여부를 평가합니다.
-    """
-    
+
+def _evaluate_verifier(matched: Set[str]) -> dict:
+    """메시지에서 찾은 키워드 집합으로 단정적 표현 사용 여부를 평가합니다."""
     # '기본 검증 완료' 상태를 기본값으로 설정
     status = "기본 검증 완료"
     reason = "발언에 특별한 주의가 필요한 내용은 발견되지 않았습니다."
 
     # 할루시네이션 가능성이 있는 단정적 표현은 여전히 탐지
-    strong_claims = [k for k in ["반드시", "무조건", "100%", "명백히", "확실히"] if k in statement]
+    strong_claims = [k for k in load_keyword_rules()["verifier"]["strong_claims"] if k in matched]
     if strong_claims:
         status = "주의 필요"
         reason = f"'{', '.join(strong_claims)}' 등 단정적인 표현이 사용되어 교차 검증이 필요합니다."
-        
-    return {"status": status, "reason": reason}
\ No newline at end of file
+
+    return {"status": status, "reason": reason}
+
+
+def run_snr_agent(source_text: str) -> dict | None:
+    """
+    SNR 전문가 에이전트 (규칙 기반) - 특정 키워드가 있을 때만 작동하여 신호 대 잡음비를 평가합니다.
+    """
+    return _evaluate_snr(set(_get_staff_matcher().find(source_text)))
+
+
+def run_verifier_agent(statement: str) -> dict | None:
+    """
+    정보 검증부 에이전트 (규칙 기반) - 모든 발언에 대해 작동하며, 단정적 표현 사용 여부를 평가합니다.
+    """
+    return _evaluate_verifier(set(_get_staff_matcher().find(statement)))
+
+
+def evaluate_round(messages: List[str]) -> List[Tuple[Optional[dict], Optional[dict]]]:
+    """
+    한 라운드의 발언 전체를 평가합니다.
+    메시지마다 오토마톤을 한 번만 통과시켜 (SNR 결과, 검증 결과) 쌍을 순서대로 반환합니다.
+    """
+    results = []
+    for matches in _get_staff_matcher().find_many(messages):
+        matched = set(matches)
+        results.append((_evaluate_snr(matched), _evaluate_verifier(matched)))
+    return results
+
+
+# --- Staff 에이전트 파이프라인 ---
+# 각 Staff 에이전트는 라운드의 발언 목록 전체를 한 번에 받아 평가합니다.
+# 반환값은 {transcript에 기록할 agent_name: 발언별 평가 결과 목록} 이며,
+# 목록의 i번째 항목은 i번째 발언에 대한 평가(없으면 None) 입니다.
+
+class StaffAgent(ABC):
+    """Staff 에이전트의 기본 클래스. 하위 클래스는 evaluate를 구현해야 인스턴스를 만들 수 있습니다."""
+    # 실행 프로필의 analyses에 이 이름이 있을 때만 실행됩니다. (None이면 항상 실행)
+    analysis_name: Optional[str] = None
+
+    @abstractmethod
+    async def evaluate(self, messages: List[str], discussion_id: str, turn_number: int) -> Dict[str, List[Optional[dict]]]:
+        """라운드 발언 목록을 평가하여 {agent_name: 발언별 평가 결과 목록}을 반환합니다."""
+
+
+class RuleBasedStaffAgent(StaffAgent):
+    """SNR 전문가와 정보 검증부 (규칙 기반). 한 번의 키워드 매칭으로 두 평가를 함께 수행합니다."""
+
+    async def evaluate(self, messages, discussion_id, turn_number):
+        results = evaluate_round(messages)
+        return {
+            "SNR 전문가": [snr for snr, _ in results],
+            "정보 검증부": [verifier for _, verifier in results],
+        }
+
+
+class LLMFactCheckStaffAgent(StaffAgent):
+    """
+    팩트체커 (LLM 기반) - DB에 'Fact Checker' 에이전트가 활성화되어 있을 때만 작동합니다.
+    라운드의 발언 전체를 한 번의 구조화된 호출로 검증합니다.
+    에이전트 설정 조회 결과(설정이 없는 경우 포함)는 FACT_CHECKER_SETTING_CACHE_SECONDS 동안 재사용합니다.
+    """
+    agent_name = "팩트체커"
+    setting_name = "Fact Checker"
+    analysis_name = "fact_check"
+
+    def __init__(self):
+        self._cached_setting: Optional[Tuple[float, Optional[AgentSettings]]] = None
+
+    async def _get_setting(self) -> Optional[AgentSettings]:
+        if self._cached_setting and self._cached_setting[0] > time.monotonic():
+            return self._cached_setting[1]
+        checker_setting = await AgentSettings.find_one(
+            AgentSettings.name == self.setting_name, AgentSettings.status == "active"
+        )
+        self._cached_setting = (time.monotonic() + settings.FACT_CHECKER_SETTING_CACHE_SECONDS, checker_setting)
+        return checker_setting
+
+    async def evaluate(self, messages, discussion_id, turn_number):
+        if not messages:
+            return {}
+        checker_setting = await self._get_setting()
+        if not checker_setting:
+            return {}
+
+        from langchain_core.prompts import ChatPromptTemplate
+        from app.services.llm_providers import get_chat_model
+
+        llm = get_chat_model(model=checker_setting.config.model, temperature=checker_setting.config.temperature)
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", checker_setting.config.prompt),
+            ("human", "다음 발언들을 각각 검증하십시오. 발언 번호(index)별로 결과를 반환하십시오.\n\n{statements}")
+        ])
+        statements = "\n\n".join(f"[{i}] {message}" for i, message in enumerate(messages))
+        result: FactCheckResult = await (prompt | llm.with_structured_output(FactCheckResult)).ainvoke(
+            {"statements": statements},
+            config={"tags": [f"discussion_id:{discussion_id}", f"turn:{turn_number}", "task:fact_check"]}
+        )
+
+        annotations: List[Optional[dict]] = [None] * len(messages)
+        for item in result.items:
+            if 0 <= item.index < len(messages):
+                annotations[item.index] = {"status": item.status, "reason": item.reason}
+        return {self.agent_name: annotations}
+
+
+# 등록 순서대로 transcript에 기록됩니다.
+STAFF_AGENTS: List[StaffAgent] = [
+    RuleBasedStaffAgent(),
+    LLMFactCheckStaffAgent(),
+]
+
+
+async def _run_staff_agent(agent: StaffAgent, messages: List[str], discussion_id: str, turn_number: int) -> Dict[str, List[Optional[dict]]]:
+    """Staff 에이전트 하나를 실행합니다. 실패하더라도 토론 진행에는 영향을 주지 않습니다."""
+    try:
+        return await agent.evaluate(messages, discussion_id, turn_number)
+    except Exception as e:
+        logger.error(f"!!! [Staff Agents] '{type(agent).__name__}' 평가 중 오류 발생 ({discussion_id}): {e}", exc_info=True)
+        return {}
+
+
+async def run_staff_pipeline(
+    messages: List[str], discussion_id: str, turn_number: int, analyses: Optional[List[str]] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    라운드 발언 전체에 대해 등록된 Staff 에이전트를 동시에 실행합니다.
+    analyses가 주어지면 analysis_name이 그 안에 있는 에이전트(와 항상 실행되는 에이전트)만 실행합니다.
+    발언별로 transcript에 추가할 항목 목록을 (발언 순서, 에이전트 등록 순서대로) 반환합니다.
+    """
+    agents = [
+        agent for agent in STAFF_AGENTS
+        if agent.analysis_name is None or analyses is None or agent.analysis_name in analyses
+    ]
+    agent_results = await asyncio.gather(*[
+        traced(f"staff.{type(agent).__name__}", _run_staff_agent(agent, messages, discussion_id, turn_number),
+               discussion_id=discussion_id, turn_number=turn_number)
+        for agent in agents
+    ])
+
+    entries: List[List[Dict[str, Any]]] = [[] for _ in messages]
+    for results in agent_results:
+        for agent_name, annotations in results.items():
+            for i, annotation in enumerate(annotations[:len(messages)]):
+                if annotation:
+                    entries[i].append({
+                        "agent_name": agent_name,
+                        "message": json.dumps(annotation, ensure_ascii=False), # 결과를 JSON 문자열로 저장
+                        "timestamp": datetime.utcnow()
+                    })
+    return entries
@@ -0,0 +1,85 @@
+# src/app/services/vote_prefetch.py
+
+import asyncio
+import json
+from typing import Any, Coroutine, Dict, List, Optional
+
+from app import db
+from app.core.config import settings, logger
+from app.core.metrics import CACHE_REQUESTS
+from app.services.result_cache import make_digest
+
+# --- 투표 선택지별 검색 결과 선행 조회(speculative prefetch) ---
+# 투표 대기(waiting_for_vote) 중에 선택지마다 검색어 생성과 웹 검색을 미리 수행해 두면,
+# 사용자가 투표한 뒤 턴이 시작될 때 두 단계의 직렬 호출 없이 바로 배심원 발언을 시작할 수 있습니다.
+# 결과는 (토론 ID, 다음 턴 번호, 선택지)별로 TTL과 함께 Redis에 저장됩니다.
+PREFETCH_KEY = "vote_prefetch:{discussion_id}:{turn_number}:{digest}"
+
+# 이 워커에서 진행 중인 선행 조회 작업 (턴 시작 시 아직 진행 중이면 잠시 기다립니다)
+_prefetch_tasks: Dict[str, asyncio.Task] = {}
+
+
+def _prefetch_key(discussion_id: str, turn_number: int, option: str) -> str:
+    return PREFETCH_KEY.format(discussion_id=discussion_id, turn_number=turn_number, digest=make_digest(option.strip()))
+
+
+async def store_prefetched_search(discussion_id: str, turn_number: int, option: str, query: str, results: List[Dict[str, Any]]) -> None:
+    """선택지에 대한 검색어와 검색 결과를 저장합니다."""
+    if not db.redis_client:
+        return
+    try:
+        await db.redis_client.set(
+            _prefetch_key(discussion_id, turn_number, option),
+            json.dumps({"query": query, "results": results}, ensure_ascii=False, default=str),
+            ex=settings.VOTE_PREFETCH_TTL_SECONDS
+        )
+    except Exception as e:
+        logger.error(f"!!! [Vote Prefetch] 선행 조회 결과 저장 중 오류 발생 ({discussion_id}): {e}")
+
+
+async def pop_prefetched_search(discussion_id: str, turn_number: int, option: str) -> Optional[Dict[str, Any]]:
+    """사용자가 선택한 선택지의 선행 조회 결과를 꺼냅니다. (없으면 None)"""
+    if not db.redis_client:
+        return None
+    try:
+        cached = await db.redis_client.getdel(_prefetch_key(discussion_id, turn_number, option))
+    except Exception as e:
+        logger.error(f"!!! [Vote Prefetch] 선행 조회 결과 조회 중 오류 발생 ({discussion_id}): {e}")
+        return None
+
+    CACHE_REQUESTS.labels(cache="vote_prefetch", result="hit" if cached else "miss").inc()
+    return json.loads(cached) if cached else None
+
+
+def schedule_prefetch(discussion_id: str, coro: Coroutine) -> None:
+    """선행 조회 작업을 백그라운드 태스크로 실행합니다. 같은 토론의 이전 작업은 취소합니다."""
+    if not settings.VOTE_PREFETCH_ENABLED:
+        coro.close()
+        return
+    previous = _prefetch_tasks.pop(discussion_id, None)
+    if previous and not previous.done():
+        previous.cancel()
+
+    task = asyncio.get_running_loop().create_task(coro)
+    _prefetch_tasks[discussion_id] = task
+
+    def _cleanup(finished: asyncio.Task) -> None:
+        if _prefetch_tasks.get(discussion_id) is finished:
+            _prefetch_tasks.pop(discussion_id, None)
+        if not finished.cancelled() and finished.exception():
+            logger.error(f"!!! [Vote Prefetch] 선행 조회 작업 실패 ({discussion_id}): {finished.exception()}")
+
+    task.add_done_callback(_cleanup)
+
+
+async def wait_for_prefetch(discussion_id: str) -> None:
+    """이 워커에서 선행 조회가 아직 진행 중이면 최대 VOTE_PREFETCH_WAIT_SECONDS 동안 기다립니다."""
+    task = _prefetch_tasks.get(discussion_id)
+    if not task or task.done():
+        return
+    try:
+        await asyncio.wait_for(asyncio.shield(task), timeout=settings.VOTE_PREFETCH_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.info(f"--- [Vote Prefetch] 선행 조회가 아직 끝나지 않아 직접 검색합니다. ({discussion_id}) ---")
+    except Exception:
+        pass
@@ -0,0 +1,36 @@
+# src/app/tools/http_client.py
+
+from typing import Optional
+
+import httpx
+
+from app.core.config import logger
+
+# 모든 도구가 공유하는 비동기 HTTP 클라이언트 (커넥션 풀 재사용)
+# 도구별 타임아웃은 요청마다 지정하며, 여기의 값은 기본값입니다.
+_http_client: Optional[httpx.AsyncClient] = None
+
+DEFAULT_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+POOL_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+USER_AGENT = "Mozilla/5.0 (compatible; AMEET/1.0)"
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """공유 httpx.AsyncClient를 반환합니다. (최초 호출 시 생성)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            limits=POOL_LIMITS,
+            headers={"User-Agent": USER_AGENT},
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """서버 종료 시 커넥션 풀을 정리합니다."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+        logger.info("Tool HTTP client closed.")
+    _http_client = None
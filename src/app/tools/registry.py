@@ -0,0 +1,175 @@
+# src/app/tools/registry.py
+
+import asyncio
+import functools
+import importlib
+import inspect
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from app.core.config import logger
+from app.services.result_cache import build_cache_key, get_cached_result, set_cached_result
+
+
+class ToolSpec(BaseModel):
+    """
+    에이전트가 사용할 수 있는 도구의 등록 정보.
+    구현 함수는 모듈 경로와 이름으로만 참조하며, 처음 사용할 때 import 합니다.
+    """
+    name: str
+    description: str
+    module: str
+    func: str
+    timeout_seconds: float = 20.0
+    # 0이면 캐시하지 않습니다. 같은 인자의 호출 결과를 result_cache에 이 시간(초) 동안 보관합니다.
+    cache_ttl_seconds: int = 0
+
+
+# --- 도구 레지스트리 ---
+TOOL_REGISTRY: Dict[str, ToolSpec] = {
+    spec.name: spec for spec in [
+        ToolSpec(
+            name="web_search",
+            description="최신 뉴스, 시장 동향, 특정 주제에 대한 최신 정보 등 실시간 정보가 필요할 때 사용하는 웹 검색 도구입니다.",
+            module="app.tools.search",
+            func="perform_web_search_async",
+            timeout_seconds=20.0,
+            cache_ttl_seconds=3600,  # 최신 정보가 중요하므로 1시간
+        ),
+        ToolSpec(
+            name="get_stock_price",
+            description="주식 티커(ticker)와 기간(start_date, end_date)을 사용하여 특정 종목의 과거 주가 데이터를 조회할 때 사용합니다. (예: 'TSLA', '2023-01-01', '2023-12-31')",
+            module="app.tools.search",
+            func="get_stock_price_async",
+            timeout_seconds=10.0,
+            cache_ttl_seconds=21600,  # 과거 시세는 거의 변하지 않으므로 6시간
+        ),
+        ToolSpec(
+            name="get_economic_data",
+            description="미국의 주요 거시 경제 지표(예: 소비자물가지수, 실업률, GDP, 기준금리)를 조회할 때 사용합니다. FRED 데이터베이스의 시리즈 ID를 인자로 받습니다. (예: 'CPIAUCSL', 'UNRATE', 'FEDFUNDS')",
+            module="app.tools.search",
+            func="get_economic_data_async",
+            timeout_seconds=10.0,
+            cache_ttl_seconds=86400,  # 경제 지표는 발표 주기가 길어 1일
+        ),
+    ]
+}
+
+_impl_cache: Dict[str, Callable] = {}
+_tool_cache: Dict[str, Any] = {}
+
+
+def _get_spec(name: str) -> ToolSpec:
+    spec = TOOL_REGISTRY.get(name)
+    if spec is None:
+        raise KeyError(f"등록되지 않은 도구입니다: '{name}'")
+    return spec
+
+
+def _load_impl(spec: ToolSpec) -> Callable:
+    """도구 구현 함수를 (최초 1회) import 하여 반환합니다."""
+    if spec.name not in _impl_cache:
+        _impl_cache[spec.name] = getattr(importlib.import_module(spec.module), spec.func)
+    return _impl_cache[spec.name]
+
+
+async def run_tool(name: str, **kwargs: Any) -> Any:
+    """
+    등록된 도구를 해당 도구의 타임아웃과 캐시 정책을 적용하여 실행합니다.
+    타임아웃 시 빈 리스트를 반환합니다. (도구 구현들도 오류 시 빈 리스트를 반환합니다.)
+    외부 API가 요청을 거부한 경우처럼 이유를 알려야 하는 오류는 ToolException으로 전달되며, 캐시하지 않습니다.
+    """
+    spec = _get_spec(name)
+    impl = _load_impl(spec)
+
+    cache_key = build_cache_key(f"tool:{name}", kwargs) if spec.cache_ttl_seconds else None
+    if cache_key:
+        cached = await get_cached_result(cache_key)
+        if cached is not None:
+            return cached
+
+    try:
+        async with asyncio.timeout(spec.timeout_seconds):
+            result = await impl(**kwargs)
+    except TimeoutError:
+        logger.error(f"--- [Tool Error] '{name}' 도구가 {spec.timeout_seconds}초 안에 응답하지 않았습니다. (args: {kwargs}) ---")
+        return []
+
+    # 빈 결과(오류 포함)는 캐시하지 않습니다.
+    if cache_key and result:
+        await set_cached_result(cache_key, result, spec.cache_ttl_seconds)
+    return result
+
+
+def get_tool(name: str):
+    """등록된 이름으로 LangChain 도구를 반환합니다. (최초 요청 시 생성)"""
+    if name not in _tool_cache:
+        spec = _get_spec(name)
+        impl = _load_impl(spec)
+
+        from langchain_core.tools import StructuredTool
+
+        # 인자 스키마는 구현 함수의 시그니처에서 그대로 가져오고, 실행은 run_tool을 거칩니다.
+        @functools.wraps(impl)
+        async def _coroutine(**kwargs):
+            return await run_tool(spec.name, **kwargs)
+
+        # @traceable이 덧붙이는 'config' 인자는 LLM에 노출하지 않습니다.
+        signature = inspect.signature(impl)
+        _coroutine.__signature__ = signature.replace(
+            parameters=[p for p in signature.parameters.values() if p.name != "config"]
+        )
+
+        _tool_cache[name] = StructuredTool.from_function(
+            coroutine=_coroutine,
+            name=spec.name,
+            description=spec.description,
+            # ToolException의 메시지를 도구 결과로 에이전트에게 돌려줍니다.
+            handle_tool_error=True,
+        )
+        logger.info(f"--- [Tool Registry] '{name}' 도구를 로드했습니다. ---")
+    return _tool_cache[name]
+
+
+# 모든 배심원에게 기본으로 제공하는 도구. 에이전트 설정(AgentConfig.tools)의 도구는 여기에 추가됩니다.
+# (기존 에이전트 데이터와 Jury Selector가 만드는 에이전트는 대부분 tools가 비어 있거나 None입니다.)
+DEFAULT_JUROR_TOOLS = ["web_search"]
+
+TOOL_BUDGET_EXHAUSTED_MESSAGE = "도구 사용 한도에 도달했습니다. 더 이상 도구를 호출하지 말고, 이미 확보한 정보로 답변을 작성하세요."
+
+
+def _with_call_budget(tools: List[Any], max_calls: int) -> List[Any]:
+    """
+    도구 목록의 사본을 만들어 전체 호출 횟수를 max_calls회로 제한합니다.
+    한도를 넘은 호출은 실행하지 않고 안내 문구를 반환하여 에이전트가 답변을 마무리하도록 합니다.
+    """
+    calls = 0
+
+    def _budgeted(tool):
+        async def _coroutine(**kwargs):
+            nonlocal calls
+            if calls >= max_calls:
+                logger.info(f"--- [Tool Registry] 도구 호출 한도({max_calls}회)를 초과하여 '{tool.name}' 호출을 건너뜁니다. ---")
+                return TOOL_BUDGET_EXHAUSTED_MESSAGE
+            calls += 1
+            return await tool.coroutine(**kwargs)
+        return tool.model_copy(update={"coroutine": _coroutine})
+
+    return [_budgeted(tool) for tool in tools]
+
+
+def get_tools(names: List[str], max_calls: Optional[int] = None) -> List[Any]:
+    """
+    여러 도구를 한 번에 조회합니다. 등록되지 않은 이름은 경고 후 건너뜁니다.
+    max_calls가 주어지면 반환된 도구들의 전체 호출 횟수를 제한합니다. (에이전트 실행 1회 단위로 새로 조회해야 합니다.)
+    """
+    tools = []
+    for name in names or []:
+        try:
+            tools.append(get_tool(name))
+        except KeyError as e:
+            logger.warning(f"--- [Tool Registry] {e.args[0]} ---")
+    if max_calls is not None:
+        return _with_call_budget(tools, max_calls)
+    return tools
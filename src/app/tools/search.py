@@ -1,155 +1,152 @@
 # src/app/tools/search.py
 
-import asyncio
+from datetime import datetime, timezone
 from typing import List, Dict, Any
 from urllib.parse import quote
 
-from langchain_community.utilities.tavily_search import TavilySearchAPIWrapper
 from app.core.config import settings, logger
-from langchain_core.tools import Tool
+from app.core.metrics import EXTERNAL_API_SECONDS, observe_duration
+from app.core.tracing import start_span
+from app.tools.http_client import get_http_client
+from langchain_core.tools import ToolException
 from langsmith import traceable
-import yfinance as yf
-from fredapi import Fred
-import pandas as pd
 
-# Tavily API 키가 설정되어 있는지 확인
-if not settings.TAVILY_API_KEY:
-    raise ValueError("TAVILY_API_KEY environment variable not set.")
+# --- 외부 API 엔드포인트 ---
+# SDK(동기 requests 기반)를 스레드에서 돌리는 대신, 공유 httpx 커넥션 풀로 REST API를 직접 호출합니다.
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+# Yahoo chart API가 요청을 거부할 때 도구 오류로 알려 줄 메시지 (빈 결과와 구분되도록)
+YAHOO_REJECTED_MESSAGES = {
+    401: "Yahoo Finance가 인증 쿠키/crumb 없이 보낸 주가 조회 요청을 거부했습니다 (HTTP 401). 지금은 주가 데이터를 조회할 수 없습니다.",
+    403: "Yahoo Finance가 주가 조회 요청을 거부했습니다 (HTTP 403). 지금은 주가 데이터를 조회할 수 없습니다.",
+    429: "Yahoo Finance 주가 조회 요청 한도를 초과했습니다 (HTTP 429). 잠시 후 다시 시도하거나 주가 데이터 없이 진행하세요.",
+}
+FRED_OBSERVATIONS_URL = "https://api.stlouisfed.org/fred/series/observations"
 
-if not settings.FRED_API_KEY:
-    raise ValueError("FRED_API_KEY environment variable not set.")
 
-# 검색 도구 인스턴스 생성 (k=5: 최대 5개의 결과 반환)
-# --- Tool 대신 API Wrapper 인스턴스를 생성합니다. ---
-tavily_api_wrapper = TavilySearchAPIWrapper(tavily_api_key=settings.TAVILY_API_KEY)
+def _to_epoch_seconds(date_str: str) -> int:
+    """'YYYY-MM-DD' 문자열을 UTC 기준 epoch 초로 변환합니다."""
+    return int(datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
 
-fred_client = Fred(api_key=settings.FRED_API_KEY)
 
-# --- 동기 실행용 함수 생성 ---
-@traceable
-def perform_web_search_sync(query: str) -> list:
-    """
-    Tavily API 래퍼를 사용하여 웹 검색을 동기적으로 수행하고 로그를 남깁니다.
-    """
-    print(f"--- [Tool] 웹 검색 수행 (Sync Wrapper 사용): {query} ---")
-    try:
-        results = tavily_api_wrapper.results(
-            query=query,
-            max_results=5
-        )
-        return results
-    except Exception as e:
-        print(f"--- [Tool Error] 웹 검색 중 오류 발생: {e} ---")
-        return []
-    
 @traceable
 async def perform_web_search_async(query: str) -> list:
-    """Tavily API 래퍼를 사용하여 웹 검색을 비동기적으로 수행합니다."""
-    print(f"--- [Tool] 웹 검색 수행 (Async): {query} ---")
+    """Tavily Search API를 비동기로 호출하여 웹 검색을 수행합니다. (최대 5개 결과)"""
+    logger.info(f"--- [Tool] 웹 검색 수행 (Async): {query} ---")
     try:
-        return await asyncio.to_thread(tavily_api_wrapper.results, query=query, max_results=5)
-    except Exception as e:
-        print(f"--- [Tool Error] 웹 검색 중 오류 발생: {e} ---")
-        return []
+        if not settings.TAVILY_API_KEY:
+            raise ValueError("TAVILY_API_KEY environment variable not set.")
 
-@traceable
-def get_stock_price_sync(ticker: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
-    """yfinance를 사용하여 특정 종목의 주가 데이터를 동기적으로 조회합니다."""
-    print(f"--- [Tool] 주가 데이터 조회 (Sync): {ticker} from {start_date} to {end_date} ---")
-    try:
-        stock = yf.Ticker(ticker)
-        history = stock.history(start=start_date, end=end_date)
-        history.reset_index(inplace=True)
-        history['Date'] = history['Date'].dt.strftime('%Y-%m-%d')
-        return history.to_dict('records')
+        payload = {
+            "api_key": settings.TAVILY_API_KEY,
+            "query": query,
+            "max_results": 5,
+            "search_depth": "advanced",
+            "include_answer": False,
+            "include_raw_content": False,
+            "include_images": False,
+        }
+        with start_span("tool.web_search", query=query), observe_duration(EXTERNAL_API_SECONDS, api="tavily"):
+            response = await get_http_client().post(
+                TAVILY_SEARCH_URL,
+                json=payload,
+                headers={"Authorization": f"Bearer {settings.TAVILY_API_KEY}"}
+            )
+        response.raise_for_status()
+
+        # 기존 TavilySearchAPIWrapper.results()와 동일한 형태로 정리합니다.
+        return [
+            {
+                "title": result.get("title", ""),
+                "url": result.get("url", ""),
+                "content": result.get("content", ""),
+                "score": result.get("score"),
+            }
+            for result in response.json().get("results", [])
+        ]
     except Exception as e:
-        print(f"--- [Tool Error] 주가 데이터 조회 중 오류 발생: {e} ---")
+        logger.error(f"--- [Tool Error] 웹 검색 중 오류 발생: {e} ---")
         return []
-    
+
+
 @traceable
-def get_stock_price_sync(ticker: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
-    """yfinance를 사용하여 특정 종목의 주가 데이터를 동기적으로 조회합니다."""
-    logger.info(f"--- [Tool] 주가 데이터 조회 (Sync): {ticker} from {start_date} to {end_date} ---")
+async def get_stock_price_async(ticker: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    """
+    Yahoo Finance chart API를 비동기로 호출하여 특정 종목의 일별 주가 데이터를 조회합니다.
+    Yahoo가 요청을 거부하면(401/403 인증 필요, 429 요청 한도 초과) 이유를 담은 ToolException을 발생시킵니다.
+    """
+    logger.info(f"--- [Tool] 주가 데이터 조회 (Async): {ticker} from {start_date} to {end_date} ---")
     try:
-        stock = yf.Ticker(ticker)
-        history = stock.history(start=start_date, end=end_date, repair=True)
-        
-        history.reset_index(inplace=True)
-        
-        # 'Date' 열이 확실하게 datetime 형식이 되도록 명시적으로 변환합니다.
-        history['Date'] = pd.to_datetime(history['Date']).dt.tz_localize(None)
-        
-        # 이제 .dt 접근자를 안전하게 사용할 수 있습니다.
-        history['Date'] = history['Date'].dt.strftime('%Y-%m-%d')
-        
-        if not history.empty:
-            return history.to_dict('records')
-        else:
-            logger.warning(f"--- [Tool Warning] yfinance에서 {ticker}에 대한 데이터를 반환하지 않았습니다.")
+        params = {
+            "period1": _to_epoch_seconds(start_date),
+            "period2": _to_epoch_seconds(end_date),
+            "interval": "1d",
+            "events": "div,splits",
+        }
+        with start_span("tool.get_stock_price", ticker=ticker), observe_duration(EXTERNAL_API_SECONDS, api="yfinance"):
+            response = await get_http_client().get(YAHOO_CHART_URL.format(ticker=quote(ticker)), params=params)
+        if response.status_code in YAHOO_REJECTED_MESSAGES:
+            raise ToolException(YAHOO_REJECTED_MESSAGES[response.status_code])
+        response.raise_for_status()
+
+        results = response.json().get("chart", {}).get("result") or []
+        if not results or not results[0].get("timestamp"):
+            logger.warning(f"--- [Tool Warning] Yahoo Finance에서 {ticker}에 대한 데이터를 반환하지 않았습니다.")
             return []
-            
+
+        chart = results[0]
+        quote_data = chart["indicators"]["quote"][0]
+        records = []
+        for i, timestamp in enumerate(chart["timestamp"]):
+            close = quote_data["close"][i]
+            if close is None:
+                continue  # 거래 정지 등으로 값이 비어 있는 날은 제외
+            records.append({
+                "Date": datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d"),
+                "Open": quote_data["open"][i],
+                "High": quote_data["high"][i],
+                "Low": quote_data["low"][i],
+                "Close": close,
+                "Volume": quote_data["volume"][i],
+            })
+        return records
+
+    except ToolException as e:
+        # 데이터가 없는 것과 구분할 수 있도록 호출한 쪽(에이전트/보고서)에 오류로 전달합니다.
+        logger.error(f"--- [Tool Error] 주가 데이터 조회 거부 ({ticker}): {e} ---")
+        raise
     except Exception as e:
         logger.error(f"--- [Tool Error] 주가 데이터 조회 중 오류 발생: {e} ---", exc_info=True)
         return []
-    
-@traceable
-async def get_stock_price_async(ticker: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
-    """yfinance를 사용하여 특정 종목의 주가 데이터를 비동기적으로 조회합니다."""
-    return await asyncio.to_thread(get_stock_price_sync, ticker, start_date, end_date)
+
 
 # --- 경제 데이터 조회 도구 ---
 @traceable
-def get_economic_data_sync(series_id: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
-    """ FRED API를 사용하여 특정 기간의 경제 지표 데이터를 동기적으로 조회합니다."""
-    logger.info(f"--- [Tool] 경제 데이터 조회 (Sync): {series_id} from {start_date} to {end_date} ---")
+async def get_economic_data_async(series_id: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    """FRED REST API를 비동기로 호출하여 특정 기간의 경제 지표 데이터를 조회합니다."""
+    logger.info(f"--- [Tool] 경제 데이터 조회 (Async): {series_id} from {start_date} to {end_date} ---")
     try:
-        # ID를 URL에 맞게 인코딩하는 로직 추가 ---
-        # 공백이나 특수문자가 포함된 ID가 생성되더라도 안전하게 처리합니다.
-        sanitized_series_id = quote(series_id)
-
-        # 수정된 sanitized_series_id를 사용하여 API를 호출합니다.
-        data = fred_client.get_series(sanitized_series_id, observation_start=start_date, observation_end=end_date)
-        
-        df = data.reset_index()
-        df.columns = ['Date', 'Value']
-        df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
-        df.dropna(inplace=True)
-        return df.to_dict('records')
+        if not settings.FRED_API_KEY:
+            raise ValueError("FRED_API_KEY environment variable not set.")
+
+        params = {
+            "series_id": series_id,
+            "api_key": settings.FRED_API_KEY,
+            "file_type": "json",
+            "observation_start": start_date,
+            "observation_end": end_date,
+        }
+        with start_span("tool.get_economic_data", series_id=series_id), observe_duration(EXTERNAL_API_SECONDS, api="fred"):
+            response = await get_http_client().get(FRED_OBSERVATIONS_URL, params=params)
+        response.raise_for_status()
+
+        # FRED는 결측값을 '.'로 반환하므로 제외합니다.
+        return [
+            {"Date": observation["date"], "Value": float(observation["value"])}
+            for observation in response.json().get("observations", [])
+            if observation.get("value") not in (None, ".")
+        ]
     except Exception as e:
         # 만약 'EV MKT SHAR'처럼 존재하지 않는 ID라면 여기서 예외가 발생합니다.
         logger.error(f"--- [Tool Error] 경제 데이터 조회 중 오류 발생 (ID: {series_id}): {e} ---")
         return [] # 빈 리스트를 반환하여 파이프라인이 중단되지 않도록 합니다.
-
-@traceable
-async def get_economic_data_async(series_id: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
-    """ FRED API를 사용하여 특정 기간의 경제 지표 데이터를 비동기적으로 조회합니다."""
-    return await asyncio.to_thread(get_economic_data_sync, series_id, start_date, end_date)
-    
-# perform_web_search 함수를 LangChain Tool로 포장합니다.
-web_search_tool = Tool(
-    name="web_search",
-    description="최신 뉴스, 시장 동향, 특정 주제에 대한 최신 정보 등 실시간 정보가 필요할 때 사용하는 웹 검색 도구입니다.",
-    func=perform_web_search_sync,
-    coroutine=perform_web_search_async
-)
-
-stock_price_tool = Tool(
-    name="get_stock_price",
-    description="주식 티커(ticker)와 기간(start_date, end_date)을 사용하여 특정 종목의 과거 주가 데이터를 조회할 때 사용합니다. (예: 'TSLA', '2023-01-01', '2023-12-31')",
-    func=get_stock_price_sync,
-    coroutine=get_stock_price_async
-)
-
-economic_data_tool = Tool(
-    name="get_economic_data",
-    description="미국의 주요 거시 경제 지표(예: 소비자물가지수, 실업률, GDP, 기준금리)를 조회할 때 사용합니다. FRED 데이터베이스의 시리즈 ID를 인자로 받습니다. (예: 'CPIAUCSL', 'UNRATE', 'FEDFUNDS')",
-    func=get_economic_data_sync,
-    coroutine=get_economic_data_async
-)
-
-# 사용 가능한 모든 도구를 딕셔너리 형태로 관리
-available_tools = {
-    "web_search": web_search_tool,
-    "get_stock_price": stock_price_tool,
-    "get_economic_data": economic_data_tool,
-}
\ No newline at end of file
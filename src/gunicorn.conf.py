@@ -0,0 +1,22 @@
+# src/gunicorn.conf.py
+
+import os
+import shutil
+
+# 프록시 헤더(X-Forwarded-For 등)를 신뢰할 주소. UvicornWorker가 이 값으로 클라이언트 IP를 결정합니다.
+# 앱의 설정(TRUSTED_PROXY_IPS)과 같은 환경 변수를 사용합니다.
+forwarded_allow_ips = os.environ.get("TRUSTED_PROXY_IPS", "127.0.0.1")
+
+
+def on_starting(server):
+    """마스터 프로세스 시작 시, 이전 실행에서 남은 Prometheus 멀티프로세스 지표 파일을 비웁니다."""
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """워커 종료 시, 해당 워커의 livesum 게이지 값이 /metrics 합산에서 빠지도록 정리합니다."""
+    from app.core.metrics import mark_worker_dead
+    mark_worker_dead(worker.pid)
@@ -30,6 +30,8 @@
         let scrollListenerAttached = false; // 스크롤 이벤트 리스너 중복 방지
         let discussionWorker; // 웹 워커 인스턴스를 저장할 변수
         let messageQueue = []; // [NEW] For Page Visibility API
+        const roundAnalyticsCache = new Map();      // 라운드 분석 API 응답 캐시 ("토론ID:라운드" -> 분석 결과)
+        const pendingRoundAnalytics = new Set();    // 조회 중인 라운드 분석 ("토론ID:라운드")
 
         document.addEventListener('visibilitychange', () => {
             if (!document.hidden) {
@@ -190,7 +192,7 @@
             const participantMap = getParticipantMap(data.participants);
             let html = '';
             let currentRegularCount = 0;
-            const systemAgents = ['SNR 전문가', '정보 검증부', '사회자', '구분선'];
+            const systemAgents = ['SNR 전문가', '정보 검증부', '팩트체커', '사회자', '구분선'];
 
             data.transcript.forEach(turn => {
                 if (systemAgents.includes(turn.agent_name)) {
@@ -230,7 +232,7 @@
 
         function createSystemMessageHtml(turn) {
             let contentHtml = '';
-            if (turn.agent_name === 'SNR 전문가' || turn.agent_name === '정보 검증부') {
+            if (turn.agent_name === 'SNR 전문가' || turn.agent_name === '정보 검증부' || turn.agent_name === '팩트체커') {
                 const data = JSON.parse(turn.message);
                 let icon = '';
                 let colorClass = '';
@@ -244,6 +246,9 @@
                     if (data.status === '주의 필요') {
                         icon = '⚠️';
                         colorClass = 'text-orange-600';
+                    } else if (data.status === '사실과 다름') { // 팩트체커
+                        icon = '❌';
+                        colorClass = 'text-red-600';
                     }
                     contentHtml = `<strong>검증 상태:</strong> ${data.reason}`;
                 }
@@ -1110,12 +1115,53 @@
          * 모든 UX 패널의 렌더링을 관리하는 함수!
          */
         function renderUxPanels(data) {
-            if (data.round_summary) {
-                renderCriticalUtterance(data.round_summary.critical_utterance);
-                renderStanceChanges(data.round_summary.stance_changes, data.participants);
+            let roundSummary = data.round_summary;
+            let flowData = data.flow_data;
+            if (roundSummary) {
+                // 실행 프로필의 analytics_mode가 lazy이면 입장 변화/상호작용 분석이 비어 있으므로 라운드 분석 API로 불러옵니다.
+                const analytics = roundAnalyticsCache.get(`${data.discussion_id}:${roundSummary.turn_number}`);
+                if (analytics) {
+                    roundSummary = {
+                        ...roundSummary,
+                        critical_utterance: analytics.critical_utterance || roundSummary.critical_utterance,
+                        stance_changes: analytics.stance_changes || roundSummary.stance_changes
+                    };
+                    flowData = analytics.flow_data || flowData;
+                } else if (!flowData || !roundSummary.stance_changes) {
+                    loadRoundAnalytics(data, roundSummary.turn_number);
+                }
+                renderCriticalUtterance(roundSummary.critical_utterance);
+                renderStanceChanges(roundSummary.stance_changes, data.participants);
+            }
+            if (flowData) {
+                renderFlowDiagram(flowData.interactions, data.participants);
             }
-            if (data.flow_data) {
-                renderFlowDiagram(data.flow_data.interactions, data.participants);
+        }
+
+        /**
+         * 라운드 분석(결정적 발언, 입장 변화, 상호작용)을 조회하여 캐시한 뒤 UX 패널을 다시 렌더링하는 함수
+         * 아직 계산되지 않은 분석은 서버에서 최초 조회 시 계산됩니다.
+         */
+        async function loadRoundAnalytics(data, turnNumber) {
+            const key = `${data.discussion_id}:${turnNumber}`;
+            if (pendingRoundAnalytics.has(key)) return;
+            pendingRoundAnalytics.add(key);
+
+            const token = localStorage.getItem('accessToken');
+            try {
+                const response = await authenticatedFetch(`/api/v1/discussions/${data.discussion_id}/rounds/${turnNumber}/analytics`, {
+                    headers: { 'Authorization': `Bearer ${token}` }
+                });
+                if (!response.ok) throw new Error(`Failed to fetch round analytics (status: ${response.status}).`);
+                roundAnalyticsCache.set(key, await response.json());
+                // 그 사이 다른 토론으로 이동했다면 패널을 덮어쓰지 않습니다.
+                if (data.discussion_id === currentDiscussionId) {
+                    renderUxPanels(data);
+                }
+            } catch (error) {
+                console.error('[Round Analytics] 라운드 분석을 불러오지 못했습니다:', error);
+            } finally {
+                pendingRoundAnalytics.delete(key);
             }
         }
 
@@ -1588,7 +1634,7 @@
 
             let contentHtml = '';
             
-            if (turn.agent_name === 'SNR 전문가' || turn.agent_name === '정보 검증부') {
+            if (turn.agent_name === 'SNR 전문가' || turn.agent_name === '정보 검증부' || turn.agent_name === '팩트체커') {
                 const data = JSON.parse(turn.message);
                 let icon = '';
                 let colorClass = '';
@@ -1597,12 +1643,15 @@
                     icon = '📈';
                     colorClass = 'text-blue-600';
                     contentHtml = `<strong>SNR Score:</strong> ${data.snr_score} - ${data.reason}`;
-                } else { // 정보 검증부
+                } else { // 정보 검증부, 팩트체커
                     icon = '✅';
                     colorClass = 'text-green-600';
                     if (data.status === '주의 필요') {
                         icon = '⚠️';
                         colorClass = 'text-orange-600';
+                    } else if (data.status === '사실과 다름') { // 팩트체커
+                        icon = '❌';
+                        colorClass = 'text-red-600';
                     }
                     contentHtml = `<strong>검증 상태:</strong> ${data.reason}`;
                 }
@@ -1645,7 +1694,7 @@
             const participantMap = getParticipantMap(data.participants);
 
             for (const turn of newMessages) {
-                const systemAgents = ['SNR 전문가', '정보 검증부', '사회자', '구분선'];
+                const systemAgents = ['SNR 전문가', '정보 검증부', '팩트체커', '사회자', '구분선'];
 
                 if (systemAgents.includes(turn.agent_name)) {
                     appendSystemMessage(turn);
@@ -1691,12 +1740,15 @@
                 icon = '📈';
                 colorClass = 'text-blue-600';
                 contentHtml = `<strong>SNR Score:</strong> ${data.snr_score} - ${data.reason}`;
-            } else { // 정보 검증부
+            } else { // 정보 검증부, 팩트체커
                 icon = '✅';
                 colorClass = 'text-green-600';
                 if (data.status === '주의 필요') {
                     icon = '⚠️';
                     colorClass = 'text-orange-600';
+                } else if (data.status === '사실과 다름') { // 팩트체커
+                    icon = '❌';
+                    colorClass = 'text-red-600';
                 }
                 contentHtml = `<strong>검증 상태:</strong> ${data.reason}`;
             }
@@ -0,0 +1,116 @@
+# src/tests/test_discussion_flow.py
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import discussion_flow
+
+
+class FakeState:
+    """TurnStateSession 대신 사용하는 세션. commit 결과를 지정할 수 있습니다."""
+
+    def __init__(self, discussion_log, committed: bool):
+        self.discussion_log = discussion_log
+        self.committed = committed
+        self.commits = []
+
+    async def append(self, entry):
+        self.discussion_log.transcript.append(entry)
+
+    async def extend(self, entries):
+        self.discussion_log.transcript.extend(entries)
+
+    async def commit(self, fields, expected_status=None):
+        self.commits.append((fields, expected_status))
+        if self.committed:
+            for field_name, value in fields.items():
+                setattr(self.discussion_log, field_name, value)
+        return self.committed
+
+
+async def _async_value(value):
+    return value
+
+
+@pytest.fixture
+def prefetches(monkeypatch):
+    """턴 실행에 필요한 LLM/검색 호출을 고정된 값으로 바꾸고, 예약된 선행 조회를 기록합니다."""
+    scheduled = []
+    profile = SimpleNamespace(
+        models={}, central_search=True, history_compaction="full", tool_budget=None,
+        analyses=[], analytics_mode="lazy", round_analysis_mode="separate"
+    )
+    monkeypatch.setattr(discussion_flow, "get_discussion_profile", lambda log: profile)
+    monkeypatch.setattr(discussion_flow, "get_vote_history", lambda log: _async_value([]))
+    monkeypatch.setattr(discussion_flow, "load_evidence_index", lambda discussion_id: _async_value(None))
+    monkeypatch.setattr(discussion_flow, "build_evidence_index", lambda briefing: _async_value({}))
+    monkeypatch.setattr(discussion_flow, "save_evidence_index", lambda discussion_id, index: _async_value(None))
+    monkeypatch.setattr(discussion_flow, "retrieve_for_queries", lambda index, queries, k: _async_value([[] for _ in queries]))
+    monkeypatch.setattr(discussion_flow, "format_evidence", lambda evidence: "")
+    monkeypatch.setattr(discussion_flow, "_build_history_context", lambda log, compaction: "")
+    monkeypatch.setattr(discussion_flow, "_run_single_agent_turn", lambda config, *args: _async_value(f"{config['name']} 발언"))
+    monkeypatch.setattr(discussion_flow, "run_staff_pipeline", lambda messages, *args: _async_value([[] for _ in messages]))
+    monkeypatch.setattr(
+        discussion_flow, "_generate_vote_options",
+        lambda *args: _async_value({"topic": "다음 논점", "options": ["A", "B"]})
+    )
+    monkeypatch.setattr(discussion_flow, "_prefetch_vote_searches", lambda log: "prefetch-job")
+    monkeypatch.setattr(discussion_flow, "schedule_prefetch", lambda discussion_id, job: scheduled.append((discussion_id, job)))
+    return scheduled
+
+
+def _make_log():
+    return SimpleNamespace(
+        discussion_id="d-1", topic="주제", status="turn_inprogress", turn_number=0,
+        participants=[{"name": "재판관"}, {"name": "경제학자"}, {"name": "법률가"}],
+        transcript=[], round_summaries=[], current_vote=None,
+        evidence_briefing=None
+    )
+
+
+def test_committed_turn_schedules_vote_prefetch(prefetches):
+    log = _make_log()
+    state = FakeState(log, committed=True)
+
+    asyncio.run(discussion_flow._execute_turn_with_state(log, state, None, None))
+
+    assert state.commits[-1][1] == "turn_inprogress"
+    assert log.status == "waiting_for_vote"
+    assert prefetches == [("d-1", "prefetch-job")]
+
+
+def test_cancelled_turn_does_not_schedule_vote_prefetch(prefetches):
+    log = _make_log()
+    state = FakeState(log, committed=False)
+
+    asyncio.run(discussion_flow._execute_turn_with_state(log, state, None, None))
+
+    assert log.status == "turn_inprogress"
+    assert prefetches == []
+
+
+def test_round_summary_uses_only_jury_messages(prefetches, monkeypatch):
+    captured = []
+    profile = SimpleNamespace(
+        models={}, central_search=False, history_compaction="full", tool_budget=None,
+        analyses=["round_summary"], analytics_mode="lazy", round_analysis_mode="separate"
+    )
+    monkeypatch.setattr(discussion_flow, "get_discussion_profile", lambda log: profile)
+    # 발언마다 Staff 평가(팩트체커 등)가 뒤따르는 라운드
+    monkeypatch.setattr(
+        discussion_flow, "run_staff_pipeline",
+        lambda messages, *args: _async_value([[{"agent_name": "팩트체커", "message": "{}"}] for _ in messages])
+    )
+
+    async def fake_round_summary(transcript_str, *args):
+        captured.append(transcript_str)
+        return None
+
+    monkeypatch.setattr(discussion_flow, "_get_round_summary", fake_round_summary)
+    log = _make_log()
+
+    asyncio.run(discussion_flow._execute_turn_with_state(log, FakeState(log, committed=True), None, None))
+
+    assert captured == ["경제학자: 경제학자 발언\n\n법률가: 법률가 발언"]
@@ -0,0 +1,56 @@
+# src/tests/test_discussion_state.py
+
+import asyncio
+from types import SimpleNamespace
+
+from app import db
+from app.services import discussion_state
+from app.services.discussion_state import TurnStateSession
+
+
+class FakeCollection:
+    """update_one 호출을 기록하고, 지정된 matched_count를 돌려주는 컬렉션."""
+
+    def __init__(self, matched_count: int):
+        self.matched_count = matched_count
+        self.calls = []
+
+    async def update_one(self, query, update):
+        self.calls.append((query, update))
+        return SimpleNamespace(matched_count=self.matched_count)
+
+
+def _make_session(monkeypatch, matched_count: int):
+    collection = FakeCollection(matched_count)
+    monkeypatch.setattr(db, "redis_client", None)
+    monkeypatch.setattr(
+        discussion_state, "DiscussionLog",
+        SimpleNamespace(get_motor_collection=lambda: collection)
+    )
+    log = SimpleNamespace(discussion_id="d-1", status="turn_inprogress", turn_number=0, transcript=[])
+    return TurnStateSession(log), log, collection
+
+
+def test_commit_returns_true_when_document_matches(monkeypatch):
+    session, log, collection = _make_session(monkeypatch, matched_count=1)
+
+    committed = asyncio.run(session.commit(
+        {"status": "waiting_for_vote", "turn_number": 1}, expected_status="turn_inprogress"
+    ))
+
+    assert committed is True
+    assert collection.calls[-1][0] == {"discussion_id": "d-1", "status": "turn_inprogress"}
+    assert log.status == "waiting_for_vote"
+    assert log.turn_number == 1
+
+
+def test_commit_returns_false_when_status_changed(monkeypatch):
+    session, log, _ = _make_session(monkeypatch, matched_count=0)
+
+    committed = asyncio.run(session.commit(
+        {"status": "waiting_for_vote", "turn_number": 1}, expected_status="turn_inprogress"
+    ))
+
+    assert committed is False
+    assert log.status == "turn_inprogress"
+    assert log.turn_number == 0
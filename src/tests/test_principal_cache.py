@@ -0,0 +1,36 @@
+# src/tests/test_principal_cache.py
+
+import asyncio
+
+from app import db
+from app.schemas.user import Principal
+from app.services import principal_cache
+
+
+def _principal(role: str) -> Principal:
+    return Principal(id="u-1", email="user@example.com", name="사용자", role=role, token_version=0)
+
+
+def test_fill_started_before_invalidation_is_not_cached(monkeypatch):
+    monkeypatch.setattr(db, "redis_client", None)
+
+    async def scenario():
+        generation = await principal_cache.get_principal_generation("user@example.com")
+        # DB에서 강등 전 정보를 읽는 동안 권한이 바뀌어 무효화됩니다.
+        await principal_cache.invalidate_principal("user@example.com")
+        await principal_cache.cache_principal(_principal("admin"), generation)
+        return await principal_cache.get_cached_principal("user@example.com")
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_fill_without_invalidation_is_cached(monkeypatch):
+    monkeypatch.setattr(db, "redis_client", None)
+
+    async def scenario():
+        await principal_cache.invalidate_principal("user@example.com")
+        generation = await principal_cache.get_principal_generation("user@example.com")
+        await principal_cache.cache_principal(_principal("user"), generation)
+        return await principal_cache.get_cached_principal("user@example.com")
+
+    assert asyncio.run(scenario()).role == "user"